@@ -0,0 +1,87 @@
+"""
+Débit de simulation, en ticks par seconde : la boucle du jeu (Snake MEGA
+Ultimate, Game.update_game() sans dessin), une partie SnakeEngine seule et
+BatchSnakeEnv. Le gain est donné face à chacune des deux premières.
+
+    python benchmarks/bench_batch.py [nombre_de_parties]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import snake_mega_ultimate as mega
+from snake_batch import BatchSnakeEnv
+from snake_engine import SnakeEngine, Action, DIRECTIONS, MODE_CLASSIC, MODE_PORTAL, MODE_OBSTACLES
+
+DURATION = 1.0  # Secondes de mesure par configuration
+
+
+def game_ticks_per_second(game, mode):
+    # Un tick du jeu : file des virages, moteur, traînées, sons et particules
+    game.start_game(mode, False, False)
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        for _ in range(100):
+            if random.random() < 0.2:
+                game.queue_direction(1, random.choice(DIRECTIONS))
+            if not game.update_game():
+                game.start_game(mode, False, False)
+            game.update_effects()
+            ticks += 1
+    return ticks / (time.perf_counter() - start)
+
+
+def single_ticks_per_second(mode):
+    engine = SnakeEngine(mode)
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        for _ in range(1000):
+            action = Action(random.choice(DIRECTIONS)) if random.random() < 0.2 else None
+            if not engine.step({1: action} if action else None):
+                engine = SnakeEngine(mode)
+            ticks += 1
+    return ticks / (time.perf_counter() - start)
+
+
+def batch_ticks_per_second(mode, num_games):
+    env = BatchSnakeEnv(num_games, mode, seed=0)
+    rng = np.random.default_rng(1)
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        actions = np.where(rng.random(num_games) < 0.2, rng.integers(0, 4, num_games), -1)
+        alive = env.step(actions)
+        ticks += num_games
+        env.reset(~alive)
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    num_games = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    # Le jeu crée ses fichiers (statistiques, cache des sons) dans le dossier courant
+    os.chdir(tempfile.mkdtemp())
+    game = mega.Game(seed=0)
+    game.recording = False
+    print(f"{'mode':>10} {'jeu':>12} {'moteur':>12} {f'{num_games} parties':>16} {'gain/jeu':>9} {'gain/moteur':>12}")
+    for name, mode in [("classique", MODE_CLASSIC), ("portails", MODE_PORTAL), ("obstacles", MODE_OBSTACLES)]:
+        loop = game_ticks_per_second(game, mode)
+        single = single_ticks_per_second(mode)
+        batch = batch_ticks_per_second(mode, num_games)
+        print(f"{name:>10} {loop:>8.0f} t/s {single:>8.0f} t/s {batch:>12.0f} t/s "
+              f"{batch / loop:>8.0f}x {batch / single:>11.0f}x")
+    if game.stats:
+        game.stats.close()
+
+
+if __name__ == "__main__":
+    main()
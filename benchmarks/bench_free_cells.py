@@ -0,0 +1,69 @@
+"""
+Coût d'apparition d'un fruit : ancien balayage complet de la grille contre
+l'index incrémental des cases libres (free_cells.FreeCellIndex), à plusieurs
+taux de remplissage. Un plateau presque plein est le cas difficile : un index
+qui retombe sur un parcours de la grille y devient proportionnel à sa surface.
+
+    python benchmarks/bench_free_cells.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from free_cells import FreeCellIndex
+
+GRIDS = [(60, 40), (1000, 1000)]
+FILLS = [0.2, 0.9, 0.99]  # Part de la grille occupée par le snake
+
+
+def legacy_spawn(width, height, occupied):
+    # Ancienne version de maintain_foods() : liste complète des cases libres
+    free_positions = []
+    for x in range(width):
+        for y in range(height):
+            if (x, y) not in occupied:
+                free_positions.append((x, y))
+    return random.choice(free_positions)
+
+
+def indexed_spawn(cells):
+    pos = cells.random_free()
+    cells.occupy(pos)
+    cells.release(pos)
+    return pos
+
+
+def measure(func, *args, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    # Coût par fruit ; la dernière colonne rapporte l'index à celui de la plus
+    # petite grille au même remplissage : il doit rester proche de 1x
+    print(f"{'grille':>12} {'cases':>9} {'rempli':>7} {'balayage':>14} {'index':>12} {'gain':>8} {'index/petite':>13}")
+    smallest = {}
+    for width, height in GRIDS:
+        for fill in FILLS:
+            body = [(i % width, i // width) for i in range(int(width * height * fill))]
+            occupied = set(body)
+            cells = FreeCellIndex(width, height)
+            for pos in body:
+                cells.occupy(pos)
+
+            legacy_repeat = 50 if width * height < 100000 else 2
+            legacy = measure(legacy_spawn, width, height, occupied, repeat=legacy_repeat)
+            indexed = measure(indexed_spawn, cells, repeat=100000)
+            smallest.setdefault(fill, indexed)
+            label = f"{width}x{height}"
+            print(f"{label:>12} {width * height:>9} {fill:>7.0%} {legacy * 1e6:>11.1f} us "
+                  f"{indexed * 1e6:>9.2f} us {legacy / indexed:>7.0f}x {indexed / smallest[fill]:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
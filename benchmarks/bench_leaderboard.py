@@ -0,0 +1,64 @@
+"""
+Temps des requêtes de classement (stats_store) sur une base remplie de parties
+fictives : meilleurs scores d'un classement et rang d'un score, sur une base
+temporaire de N parties réparties entre les six classements du menu.
+
+    python benchmarks/bench_leaderboard.py [nombre de parties]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stats_store import StatsStore, INSERT_GAME, connect, game_score
+
+CATEGORIES = [(0, 1, False), (1, 1, False), (2, 1, False), (3, 1, False), (0, 2, False), (4, 2, True)]
+GAMES = 1000000
+RUNS = 200
+
+
+def fill(path, count):
+    rng = random.Random(1)
+    connection = connect(path)
+    with connection:
+        rows = []
+        for _ in range(count):
+            mode, players, cooperative = rng.choice(CATEGORIES)
+            score1 = int(rng.expovariate(1 / 40))
+            score2 = int(rng.expovariate(1 / 40)) if players == 2 else 0
+            rows.append((time.time(), mode, players, int(cooperative), score1, score2, 1 + score1 // 15,
+                         rng.randrange(600), 0, None, "[]", game_score(players, cooperative, score1, score2)))
+        connection.executemany(INSERT_GAME, rows)
+    connection.close()
+
+
+def mean_ms(function):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        function()
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    path = os.path.join(tempfile.mkdtemp(), "game_stats.db")
+    store = StatsStore(path, legacy_path=os.path.join(os.path.dirname(path), "absent.json"))
+
+    start = time.perf_counter()
+    fill(path, count)
+    print(f"{count} parties insérées en {time.perf_counter() - start:.1f} s")
+
+    for mode, players, cooperative in CATEGORIES:
+        top = mean_ms(lambda: store.top_scores(mode, players, cooperative))
+        low = mean_ms(lambda: store.rank(mode, players, cooperative, 0))
+        high = mean_ms(lambda: store.rank(mode, players, cooperative, 200))
+        print(f"mode {mode} joueurs {players} coop {int(cooperative)} :"
+              f"  top 10 {top:.3f} ms  rang (score 0) {low:.3f} ms  rang (score 200) {high:.3f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Coût par image des particules : anciens objets Particle/Explosion en liste
+(retrait par list.remove) contre particles.ParticleSystem (tableaux NumPy).
+
+    python benchmarks/bench_particles.py
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from particles import ParticleSystem
+
+BURSTS = [1, 10, 30, 100]  # Gerbes de fruits et explosions lancées à chaque image
+FRAMES = 120
+COLORS = [(255, 0, 0), (255, 165, 0), (255, 255, 0)]
+
+
+class LegacyParticle:
+    # Ancienne version : un objet par particule
+    def __init__(self, x, y, color, rng):
+        self.x = x
+        self.y = y
+        self.vx = rng.uniform(-2, 2)
+        self.vy = rng.uniform(-2, 2)
+        self.color = color
+        self.life = 30
+
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        self.life -= 1
+
+
+class LegacyExplosion:
+    # Ancienne version : un dict par particule
+    def __init__(self, x, y, rng):
+        self.particles = []
+        for _ in range(20):
+            self.particles.append({'x': x, 'y': y, 'vx': rng.uniform(-5, 5), 'vy': rng.uniform(-5, 5),
+                                   'life': 60, 'color': rng.choice(COLORS)})
+
+    def update(self):
+        for particle in self.particles[:]:
+            particle['x'] += particle['vx']
+            particle['y'] += particle['vy']
+            particle['vx'] *= 0.98
+            particle['vy'] *= 0.98
+            particle['life'] -= 1
+            if particle['life'] <= 0:
+                self.particles.remove(particle)
+
+
+def legacy_frames(surface, bursts, rng):
+    # Renvoie (mise à jour, dessin) en secondes par image
+    particles, explosions = [], []
+    update = draw = 0.0
+    for _ in range(FRAMES):
+        for _ in range(bursts):
+            x, y = rng.randrange(1200), rng.randrange(800)
+            for _ in range(15):
+                particles.append(LegacyParticle(x, y, COLORS[0], rng))
+            explosions.append(LegacyExplosion(x, y, rng))
+        start = time.perf_counter()
+        for particle in particles[:]:
+            particle.update()
+            if particle.life <= 0:
+                particles.remove(particle)
+        for explosion in explosions[:]:
+            explosion.update()
+            if not explosion.particles:
+                explosions.remove(explosion)
+        middle = time.perf_counter()
+        for particle in particles:
+            pygame.draw.circle(surface, particle.color, (int(particle.x), int(particle.y)), 3)
+        for explosion in explosions:
+            for particle in explosion.particles:
+                size = int(5 * particle['life'] / 60)
+                if size > 0:
+                    pygame.draw.circle(surface, particle['color'], (int(particle['x']), int(particle['y'])), size)
+        end = time.perf_counter()
+        update += middle - start
+        draw += end - middle
+    return update / FRAMES, draw / FRAMES
+
+
+def system_frames(surface, bursts, rng):
+    system = ParticleSystem(capacity=1 << 19)
+    update = draw = 0.0
+    for _ in range(FRAMES):
+        for _ in range(bursts):
+            x, y = rng.randrange(1200), rng.randrange(800)
+            system.emit(x, y, 15, 2, 30, COLORS[0], rng)
+            system.emit(x, y, 20, 5, 60, COLORS, rng, damping=0.98, radius=5, shrink=True)
+        start = time.perf_counter()
+        system.update()
+        middle = time.perf_counter()
+        system.draw(surface)
+        end = time.perf_counter()
+        update += middle - start
+        draw += end - middle
+    return update / FRAMES, draw / FRAMES
+
+
+def main():
+    pygame.init()
+    surface = pygame.Surface((1200, 800))
+    print(f"{'gerbes/image':>13} {'particules':>11} {'màj objets':>12} {'màj NumPy':>12} "
+          f"{'dessin objets':>14} {'dessin NumPy':>13}")
+    for bursts in BURSTS:
+        legacy_update, legacy_draw = legacy_frames(surface, bursts, random.Random(0))
+        system_update, system_draw = system_frames(surface, bursts, random.Random(0))
+        alive = bursts * (15 * 30 + 20 * 60)
+        print(f"{bursts:>13} {alive:>11} {legacy_update * 1000:>9.2f} ms {system_update * 1000:>9.2f} ms "
+              f"{legacy_draw * 1000:>11.2f} ms {system_draw * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
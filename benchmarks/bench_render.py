@@ -0,0 +1,85 @@
+"""
+Temps d'une image de Snake MEGA Ultimate selon la longueur du snake :
+redessin complet + flip() contre plateau persistant + rectangles modifiés.
+
+    python benchmarks/bench_render.py
+
+Sans affichage (SDL_VIDEODRIVER=dummy), la mesure couvre le dessin et la
+préparation des rectangles, pas la copie vers la carte graphique.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import deque
+
+import snake_mega_ultimate as mega
+from snake_engine import Action, MODE_CLASSIC, GRID_WIDTH, GRID_HEIGHT
+
+LENGTHS = [10, 100, 500, 1000, 2000]
+FRAMES = 300
+
+
+def hamiltonian_cycle():
+    # Colonne 0 pour remonter, zigzag sur les colonnes 1 à GRID_WIDTH-1
+    cycle = [(0, y) for y in range(GRID_HEIGHT - 1, -1, -1)]
+    for y in range(GRID_HEIGHT):
+        xs = range(1, GRID_WIDTH) if y % 2 == 0 else range(GRID_WIDTH - 1, 0, -1)
+        cycle.extend((x, y) for x in xs)
+    return cycle
+
+
+def setup(game, cycle, length):
+    game.start_game(MODE_CLASSIC, False, False)
+    engine = game.engine
+    snake = engine.snake1
+    for pos in list(snake.body):
+        snake.remove_cell(pos)
+    # Tête en cycle[length - 1], corps derrière elle le long du cycle
+    snake.body = deque(reversed(cycle[:length]))
+    for pos in snake.body:
+        snake.add_cell(pos)
+    nxt = cycle[length]
+    snake.direction = (nxt[0] - snake.body[0][0], nxt[1] - snake.body[0][1])
+
+
+def frame_time(game, cycle, length):
+    setup(game, cycle, length)
+    engine = game.engine
+    index = {pos: i for i, pos in enumerate(cycle)}
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        head = engine.snake1.body[0]
+        nxt = cycle[(index[head] + 1) % len(cycle)]
+        engine.step({1: Action((nxt[0] - head[0], nxt[1] - head[1]))})
+        # Longueur constante malgré les fruits mangés
+        while len(engine.snake1.body) > length:
+            engine.snake1.pop_tail()
+        game.handle_engine_events()
+        game.update_effects()
+        game.draw_game()
+        game.present()
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    cycle = hamiltonian_cycle()
+    full = mega.Game(seed=0, dirty_rendering=False)
+    full.recording = False
+    dirty = mega.Game(seed=0)
+    dirty.recording = False
+
+    print(f"{'longueur':>9} {'complet':>12} {'modifiés':>12} {'gain':>8}")
+    for length in LENGTHS:
+        full_time = frame_time(full, cycle, length)
+        dirty_time = frame_time(dirty, cycle, length)
+        print(f"{length:>9} {full_time * 1000:>9.2f} ms {dirty_time * 1000:>9.2f} ms "
+              f"{full_time / dirty_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
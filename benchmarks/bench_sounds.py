@@ -0,0 +1,78 @@
+"""
+Temps de création des sons au démarrage (les six effets de Mega Ultimate) :
+anciennes boucles Python échantillon par échantillon, synthèse vectorisée
+(synth.synthesize), puis premier et second lancement avec synth.ToneCache
+(cache disque vide, puis rempli).
+
+    python benchmarks/bench_sounds.py
+"""
+import math
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from synth import ToneCache, synthesize
+
+SOUNDS = [([800], 0.1, 2048), ([1200], 0.2, 2048), ([200], 0.5, 2048),
+          ([440, 554, 659], 0.3, 1024), ([1500], 0.15, 2048), ([600], 0.1, 2048)]
+RUNS = 5
+
+
+def legacy_samples(frequencies, duration, amplitude, sample_rate):
+    # Ancienne version : une liste [gauche, droite] par échantillon
+    arr = []
+    for i in range(int(duration * sample_rate)):
+        wave = 0
+        for freq in frequencies:
+            wave += amplitude * math.sin(freq * 2 * math.pi * i / sample_rate)
+        arr.append([int(wave), int(wave)])
+    return pygame.sndarray.array(arr)
+
+
+def best_of(function):
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    pygame.mixer.init()
+    sample_rate, _, channels = pygame.mixer.get_init()
+    path = os.path.join(tempfile.mkdtemp(), "tone_cache.npz")
+
+    def legacy():
+        for frequencies, duration, amplitude in SOUNDS:
+            legacy_samples(frequencies, duration, amplitude, sample_rate)
+
+    def vectorized():
+        for frequencies, duration, amplitude in SOUNDS:
+            pygame.mixer.Sound(buffer=synthesize(frequencies, duration, amplitude, sample_rate, channels))
+
+    def launch():
+        tones = ToneCache(path)
+        for frequencies, duration, amplitude in SOUNDS:
+            tones.sound(frequencies, duration, amplitude)
+        tones.save()
+
+    def first_launch():
+        if os.path.exists(path):
+            os.remove(path)
+        launch()
+
+    print(f"mixer : {sample_rate} Hz, {channels} canaux, {len(SOUNDS)} sons")
+    for label, function in [("boucles Python", legacy), ("NumPy", vectorized),
+                            ("1er lancement (cache vide)", first_launch), ("lancement suivant (cache disque)", launch)]:
+        print(f"{label:>34} {best_of(function) * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
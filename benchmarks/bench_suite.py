@@ -0,0 +1,311 @@
+"""
+Suite de benchmarks des chemins critiques du moteur et du rendu, sans
+affichage (pilotes SDL "dummy") :
+
+- maintain_foods() : réapparition de tous les fruits ;
+- Snake.check_collision() : murs, obstacles, portails ;
+- déplacement d'un tick (move_snake() puis check_snake() pour chaque snake,
+  l'ancien update_snake()) ;
+- draw_game() et draw_game_ui() de Snake MEGA Ultimate.
+
+Le moteur est mesuré sur plusieurs tailles de grille (60x40 à 1000x1000), le
+rendu sur le plateau du jeu et sur un monde plus grand que la fenêtre, vu par
+la caméra ; chaque cas pour 1 et 2 joueurs et des snakes
+d'une case à 90 % du plateau (répartis entre les joueurs). Les snakes suivent
+un cycle hamiltonien à longueur constante : ils ne meurent jamais.
+
+    python benchmarks/bench_suite.py [--quick] [--output resultats.json]
+                                     [--baseline benchmarks/baseline.json]
+
+Chaque résultat est le meilleur temps moyen par appel (µs) sur REPEATS
+séries. Avec --baseline, tout cas plus lent que la référence de plus de
+--threshold (25 % par défaut) est signalé et le code de sortie vaut 1. Une
+référence n'a de sens que sur la machine qui l'a produite : la régénérer avec
+--output benchmarks/baseline.json.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from collections import deque
+
+import pygame
+
+import snake_mega_ultimate as mega
+from snake_engine import SnakeEngine, Action, MODE_CLASSIC, MODE_OBSTACLES
+
+ENGINE_GRIDS = [(60, 40), (200, 200), (1000, 1000)]
+QUICK_GRIDS = [(60, 40), (200, 200)]
+DRAW_GRIDS = [(60, 40), (1000, 1000)]
+QUICK_DRAW_GRIDS = [(60, 40), (200, 200)]
+FILLS = [0.0, 0.1, 0.5, 0.9]  # 0 % = snake d'une case
+PLAYERS = [1, 2]
+REPEATS = 5
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def next_cell(pos, width, height):
+    # Cycle hamiltonien : colonne 0 vers le haut, zigzag sur les colonnes 1 à width-1
+    # (height doit être pair)
+    x, y = pos
+    if x == 0:
+        return (0, y - 1) if y > 0 else (1, 0)
+    if y % 2 == 0:
+        return (x + 1, y) if x < width - 1 else (x, y + 1)
+    if x > 1:
+        return (x - 1, y)
+    return (0, y) if y == height - 1 else (x, y + 1)
+
+
+def cycle_cells(start, count, width, height):
+    cells = [start]
+    for _ in range(count - 1):
+        cells.append(next_cell(cells[-1], width, height))
+    return cells
+
+
+def walk(pos, steps, width, height):
+    for _ in range(steps):
+        pos = next_cell(pos, width, height)
+    return pos
+
+
+def lengths(width, height, fill, players):
+    total = max(players, int(width * height * fill))
+    return [max(1, total // players)] * players
+
+
+def place_snakes(engine, width, height, fill):
+    # Snakes posés sur le cycle, à égale distance, tête vers la suite du cycle
+    players = engine.players()
+    for food in engine.foods:
+        engine.free_cells.release(food.pos)
+    engine.foods = []
+    start = (0, height - 1)
+    spacing = width * height // len(players)
+    for player_num, length in zip(players, lengths(width, height, fill, len(players))):
+        snake = engine.get_snake(player_num)
+        for pos in list(snake.body):
+            snake.remove_cell(pos)
+        cells = cycle_cells(start, length + 1, width, height)
+        snake.body = deque(reversed(cells[:length]))
+        for pos in snake.body:
+            snake.add_cell(pos)
+        head, ahead = cells[length - 1], cells[length]
+        snake.direction = snake.heading = (ahead[0] - head[0], ahead[1] - head[1])
+        start = walk(start, spacing, width, height)
+    engine.maintain_foods()
+
+
+def steer(engine, width, height):
+    actions = {}
+    for player_num in engine.players():
+        head = engine.get_snake(player_num).body[0]
+        ahead = next_cell(head, width, height)
+        actions[player_num] = Action((ahead[0] - head[0], ahead[1] - head[1]))
+    return actions
+
+
+def trim(engine, targets):
+    # Longueur constante malgré les fruits mangés
+    for player_num, length in zip(engine.players(), targets):
+        snake = engine.get_snake(player_num)
+        while len(snake.body) > length:
+            snake.pop_tail()
+
+
+def best_mean(function, calls, repeats=REPEATS):
+    # Meilleur temps moyen par appel, en µs ; function(calls) renvoie le temps mesuré
+    return round(min(function(calls) for _ in range(repeats)) / calls * 1e6, 3)
+
+
+def bench_maintain_foods(engine):
+    def run(calls):
+        elapsed = 0.0
+        for _ in range(calls):
+            for food in engine.foods:
+                engine.free_cells.release(food.pos)
+            engine.foods = []
+            start = time.perf_counter()
+            engine.maintain_foods()
+            elapsed += time.perf_counter() - start
+        return elapsed
+    return run
+
+
+def bench_check_collision(snake, obstacles, portal_mode):
+    def run(calls):
+        check = snake.check_collision
+        start = time.perf_counter()
+        for _ in range(calls):
+            check(obstacles, portal_mode)
+        return time.perf_counter() - start
+    return run
+
+
+def bench_update_snake(engine, width, height, targets):
+    def run(calls):
+        elapsed = 0.0
+        players = engine.players()
+        for _ in range(calls):
+            for player_num, action in steer(engine, width, height).items():
+                engine.get_snake(player_num).direction = action.direction
+            start = time.perf_counter()
+            for player_num in players:
+                engine.move_snake(engine.get_snake(player_num), player_num)
+            elapsed += time.perf_counter() - start
+            trim(engine, targets)
+            start = time.perf_counter()
+            for player_num in players:
+                engine.check_snake(engine.get_snake(player_num), player_num)
+            elapsed += time.perf_counter() - start
+            engine.events = []
+        return elapsed
+    return run
+
+
+def engine_cases(grids, quick):
+    results = {}
+    for width, height in grids:
+        for players in PLAYERS:
+            for fill in FILLS:
+                label = f"{width}x{height}/remplissage={int(fill * 100)}%/joueurs={players}"
+                targets = lengths(width, height, fill, players)
+                calls = 50 if quick else 200
+
+                engine = SnakeEngine(MODE_CLASSIC, players == 2, False, 0, width, height)
+                place_snakes(engine, width, height, fill)
+                results[f"maintain_foods/{label}"] = best_mean(bench_maintain_foods(engine), calls)
+
+                snake = engine.snake1
+                results[f"check_collision/murs/{label}"] = best_mean(
+                    bench_check_collision(snake, None, False), calls * 50)
+                results[f"check_collision/portails/{label}"] = best_mean(
+                    bench_check_collision(snake, None, True), calls * 50)
+                # Obstacles posés par le moteur sur le plateau vide, avant les snakes
+                obstacles_engine = SnakeEngine(MODE_OBSTACLES, players == 2, False, 0, width, height)
+                place_snakes(obstacles_engine, width, height, fill)
+                results[f"check_collision/obstacles/{label}"] = best_mean(
+                    bench_check_collision(obstacles_engine.snake1, obstacles_engine.obstacles, False), calls * 50)
+
+                results[f"update_snake/{label}"] = best_mean(
+                    bench_update_snake(engine, width, height, targets), calls * 5)
+                print(f"  moteur {label}", file=sys.stderr)
+    return results
+
+
+def draw_cases(grids, quick):
+    frames = 60 if quick else 240
+    results = {}
+    for width, height in grids:
+        results.update(draw_grid_cases(width, height, frames))
+    return results
+
+
+def draw_grid_cases(width, height, frames):
+    # Au-delà de la fenêtre, seule la vue de la caméra est dessinée
+    game = mega.Game(seed=0, grid_width=width, grid_height=height)
+    game.recording = False
+    results = {}
+    for players in PLAYERS:
+        for fill in FILLS:
+            label = f"{width}x{height}/remplissage={int(fill * 100)}%/joueurs={players}"
+            targets = lengths(width, height, fill, players)
+            game.start_game(MODE_CLASSIC, players == 2, False)
+            place_snakes(game.engine, width, height, fill)
+            game.clear_effects()
+            game.draw_game()
+
+            def run(calls, measure_ui):
+                elapsed = 0.0
+                for _ in range(calls):
+                    game.engine.step(steer(game.engine, width, height))
+                    trim(game.engine, targets)
+                    game.handle_engine_events()
+                    game.update_effects()
+                    start = time.perf_counter()
+                    if measure_ui:
+                        game.draw_game_ui()
+                    else:
+                        game.draw_game()
+                    elapsed += time.perf_counter() - start
+                    if measure_ui:
+                        game.draw_game()
+                return elapsed
+
+            results[f"draw_game/{label}"] = best_mean(lambda calls: run(calls, False), frames)
+            results[f"draw_game_ui/{label}"] = best_mean(lambda calls: run(calls, True), frames)
+            print(f"  rendu {label}", file=sys.stderr)
+    if game.stats:
+        game.stats.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Affiche chaque cas face à la référence ; renvoie les régressions
+    regressions = []
+    print(f"{'cas':<62} {'µs':>10} {'référence':>10} {'rapport':>8}")
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<62} {value:>10.2f} {'-':>10} {'-':>8}")
+            continue
+        ratio = value / reference if reference else float("inf")
+        flag = "  RÉGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:<62} {value:>10.2f} {reference:>10.2f} {ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du moteur et du rendu (sans affichage)")
+    parser.add_argument("--quick", action="store_true", help="grilles jusqu'à 200x200 et moins d'itérations")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="résultats de référence (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="ralentissement toléré avant de signaler une régression (0.25 = 25 %%)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline)
+
+    # Le jeu crée ses fichiers (statistiques, cache des sons) dans le dossier courant
+    os.chdir(tempfile.mkdtemp())
+    results = engine_cases(QUICK_GRIDS if args.quick else ENGINE_GRIDS, args.quick)
+    results.update(draw_cases(QUICK_DRAW_GRIDS if args.quick else DRAW_GRIDS, args.quick))
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": platform.platform(),
+            "quick": args.quick
+        },
+        "results": results
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    baseline = {}
+    if os.path.exists(baseline_path) and baseline_path != output:
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
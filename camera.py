@@ -0,0 +1,79 @@
+"""
+Caméra du plateau : partie visible du monde, en cases entières.
+
+Un plateau qui tient dans la fenêtre est affiché en entier (origine en 0, 0).
+Sinon la caméra suit le centre de ses cibles (la tête du joueur, ou le milieu
+des deux têtes) : elle ne bouge que lorsque ce centre sort de la zone centrale
+de la vue, et jamais au-delà des bords du monde. Elle avance d'une case
+entière à la fois, pour que les tuiles restent alignées sur la grille de
+l'écran.
+
+Tout ce qui se dessine est filtré par la caméra (visible(), cells) : le coût
+du rendu dépend de la taille de la fenêtre et non de celle du monde.
+"""
+
+MARGIN = 0.25  # Fraction de la vue, de chaque côté, où la cible fait défiler la caméra
+
+
+class Camera:
+    def __init__(self, view_size, margin=MARGIN):
+        self.view_size = view_size  # Fenêtre en pixels
+        self.margin = margin
+        self.configure((1, 1), 1)
+
+    def configure(self, world_size, cell_size):
+        # Nouveau monde ou nouveau zoom : la caméra repart du coin du plateau
+        self.world_size = world_size
+        self.cell_size = cell_size
+        # Cases touchées par la fenêtre, la dernière éventuellement coupée
+        self.span = tuple(-(-view // cell_size) for view in self.view_size)
+        # Monde entier à l'écran : rien à filtrer
+        self.whole = all(world <= span for world, span in zip(world_size, self.span))
+        self.origin = (0, 0)
+        self.cells = self.visible_cells()
+
+    def visible_cells(self):
+        ox, oy = self.origin
+        columns = range(ox, min(ox + self.span[0], self.world_size[0]))
+        rows = range(oy, min(oy + self.span[1], self.world_size[1]))
+        return {(x, y) for x in columns for y in rows}
+
+    def follow_axis(self, origin, center, span, world):
+        if world <= span:
+            return 0
+        margin = int(span * self.margin)
+        if center < origin + margin:
+            origin = center - margin
+        elif center > origin + span - 1 - margin:
+            origin = center - (span - 1 - margin)
+        return min(max(origin, 0), world - span)
+
+    def follow(self, targets):
+        # Recentre sur les cases cibles ; renvoie True si la vue a bougé
+        xs = [x for x, y in targets]
+        ys = [y for x, y in targets]
+        center = ((min(xs) + max(xs)) // 2, (min(ys) + max(ys)) // 2)
+        origin = tuple(self.follow_axis(*axis) for axis in
+                       zip(self.origin, center, self.span, self.world_size))
+        if origin == self.origin:
+            return False
+        self.origin = origin
+        self.cells = self.visible_cells()
+        return True
+
+    def exposed_cells(self, old_origin):
+        # Cases de la vue qui n'étaient pas entièrement à l'écran avec
+        # l'ancienne origine : à repeindre une fois l'image décalée
+        ox, oy = self.origin
+        columns = range(ox, min(ox + self.span[0], self.world_size[0]))
+        rows = range(oy, min(oy + self.span[1], self.world_size[1]))
+        shown_columns = range(old_origin[0], old_origin[0] + self.view_size[0] // self.cell_size)
+        shown_rows = range(old_origin[1], old_origin[1] + self.view_size[1] // self.cell_size)
+        cells = {(x, y) for x in columns if x not in shown_columns for y in rows}
+        cells.update((x, y) for y in rows if y not in shown_rows for x in columns)
+        return cells
+
+    def visible(self, pos, border=0):
+        # border : cases de plus autour de la vue (débordements d'un dessin)
+        x, y = pos[0] - self.origin[0], pos[1] - self.origin[1]
+        return -border <= x < self.span[0] + border and -border <= y < self.span[1] + border
@@ -0,0 +1,132 @@
+"""
+Captures d'écran et enregistrement d'images sans bloquer la boucle de jeu.
+
+Le jeu ne fait que copier l'image affichée (pygame.image.tobytes, au format
+RGBX du plateau, sans conversion) ; la conversion en RGB et la compression
+PNG se font dans des processus séparés. Ils sont créés par fork quand le
+système le permet : ils n'importent ni ne réinitialisent pygame, l'encodeur
+PNG n'utilise que zlib. Ailleurs, des threads prennent le relais (zlib
+libère le GIL pendant la compression).
+
+L'enregistrement écrit une image sur RECORD_EVERY dans une séquence
+numérotée (frame_000000.png, ...). Au plus MAX_PENDING images attendent
+l'encodage : au-delà, les images enregistrées sont abandonnées (et comptées)
+plutôt que de ralentir le jeu. Les captures d'écran ne sont jamais
+abandonnées.
+"""
+import multiprocessing
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pygame
+
+CAPTURE_DIR = "captures"
+WORKERS = 2
+MAX_PENDING = 8
+RECORD_EVERY = 2  # 30 images/s à 60 FPS
+COMPRESSION = 6
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(data, size, path):
+    # Exécuté dans un processus de l'encodeur : pixels RGBX bruts -> fichier PNG
+    width, height = size
+    rgb = bytearray(width * height * 3)
+    for channel in range(3):
+        rgb[channel::3] = data[channel::4]
+    data = bytes(rgb)
+    stride = width * 3
+    rows = b"".join(b"\x00" + data[y * stride:(y + 1) * stride] for y in range(height))
+    png = (b"\x89PNG\r\n\x1a\n"
+           + png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+           + png_chunk(b"IDAT", zlib.compress(rows, COMPRESSION))
+           + png_chunk(b"IEND", b""))
+    # Fichier complet ou absent, jamais une image à moitié écrite
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(png)
+    os.replace(temp_path, path)
+    return path
+
+
+class FrameCapture:
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING, every=RECORD_EVERY):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.every = max(1, every)
+        self.executor = None  # Créé à la première capture
+        self.pending = set()
+        self.dropped = 0
+        self.directory = None  # Dossier de l'enregistrement en cours
+        self.frame = 0
+        self.saved = 0
+
+    @property
+    def recording(self):
+        return self.directory is not None
+
+    def start_executor(self):
+        if "fork" in multiprocessing.get_all_start_methods():
+            return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"))
+        return ThreadPoolExecutor(self.workers)
+
+    def collect(self):
+        # Oublie les encodages terminés et signale ceux qui ont échoué
+        done = {future for future in self.pending if future.done()}
+        for future in done:
+            if future.exception():
+                print(f"Capture non enregistrée: {future.exception()}")
+        self.pending -= done
+
+    def submit(self, surface, path, droppable):
+        self.collect()
+        if droppable and len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        if self.executor is None:
+            self.executor = self.start_executor()
+        data = pygame.image.tobytes(surface, "RGBX")
+        self.pending.add(self.executor.submit(encode_png, data, surface.get_size(), path))
+        return True
+
+    def screenshot(self, surface, path):
+        self.submit(surface, path, droppable=False)
+        return path
+
+    def start_recording(self, root=CAPTURE_DIR):
+        directory = os.path.join(root, time.strftime("rec_%Y%m%d_%H%M%S"))
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.frame = 0
+        self.saved = 0
+        self.dropped = 0
+        return self.directory
+
+    def stop_recording(self):
+        # Renvoie (dossier, images enregistrées, images abandonnées)
+        result = (self.directory, self.saved, self.dropped)
+        self.directory = None
+        return result
+
+    def capture(self, surface):
+        # À appeler une fois par image affichée
+        if not self.recording:
+            return
+        if self.frame % self.every == 0:
+            path = os.path.join(self.directory, f"frame_{self.saved:06d}.png")
+            if self.submit(surface, path, droppable=True):
+                self.saved += 1
+        self.frame += 1
+
+    def close(self):
+        # Termine les encodages en attente
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self.collect()
@@ -0,0 +1,94 @@
+"""
+Index incrémental des cases libres de la grille.
+
+self.counts compte les occupants de chaque case ; un arbre de Fenwick
+(self.tree) compte les cases libres par préfixe de la grille, dans l'ordre
+des lignes. Occuper, libérer ou tirer une case libre au hasard coûte
+O(log surface). Une case peut être occupée plusieurs fois (corps qui se
+chevauche en mode fantôme, obstacle qui passe sur un snake...) : elle ne
+redevient libre qu'au dernier release().
+
+random_free() prend la k-ième case libre dans l'ordre des lignes : le tirage
+ne dépend que du contenu de la grille, pas de l'ordre des occupations passées.
+L'index se reconstruit donc à partir des snakes, fruits et obstacles, et une
+keyframe de replay n'a pas à le stocker.
+"""
+import random
+from array import array
+
+
+class FreeCellIndex:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.clear()
+
+    def clear(self):
+        # Toutes les cases libres. Sur une grille pleine de cases libres, le
+        # noeud i de l'arbre vaut i & -i : rempli par tranches, sans boucle Python
+        area = self.width * self.height
+        self.counts = array('i', [0]) * area
+        self.tree = array('i', [1]) * (area + 1)
+        self.tree[0] = 0
+        step = 2
+        while step <= area:
+            slots = range(step, area + 1, 2 * step)
+            self.tree[step::2 * step] = array('i', [step]) * len(slots)
+            step *= 2
+        self.top = step // 2  # Plus grande puissance de 2 <= surface
+        self.size = area
+
+    def __len__(self):
+        return self.size
+
+    def cell_of(self, pos):
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return -1
+
+    def is_free(self, pos):
+        cell = self.cell_of(pos)
+        return cell >= 0 and self.counts[cell] == 0
+
+    def update(self, cell, delta):
+        tree = self.tree
+        area = len(tree) - 1
+        i = cell + 1
+        while i <= area:
+            tree[i] += delta
+            i += i & -i
+        self.size += delta
+
+    def occupy(self, pos):
+        cell = self.cell_of(pos)
+        if cell < 0:
+            return
+        self.counts[cell] += 1
+        if self.counts[cell] == 1:
+            self.update(cell, -1)
+
+    def release(self, pos):
+        cell = self.cell_of(pos)
+        if cell < 0 or self.counts[cell] == 0:
+            return
+        self.counts[cell] -= 1
+        if self.counts[cell] == 0:
+            self.update(cell, 1)
+
+    def random_free(self, rng=random):
+        if self.size == 0:
+            return None
+        # Descente dans l'arbre jusqu'à la case libre de rang tiré
+        rank = rng.randrange(self.size)
+        tree = self.tree
+        area = len(tree) - 1
+        cell = 0
+        step = self.top
+        while step:
+            node = cell + step
+            if node <= area and tree[node] <= rank:
+                cell = node
+                rank -= tree[node]
+            step //= 2
+        return (cell % self.width, cell // self.width)
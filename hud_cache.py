@@ -0,0 +1,40 @@
+"""
+Cache de l'interface (HUD) : textes rendus mémorisés et panneaux statiques.
+
+font.render() est coûteux et la plupart des textes du HUD ne changent pas
+d'une image à l'autre. Hud.render() mémorise chaque surface par
+(police, texte, couleur) dans un cache LRU borné : un score ou un chrono
+n'est donc re-rendu que lorsque sa valeur change. Hud.panel() assemble une
+seule fois un bloc de lignes fixes (légende, aide des contrôles...) en une
+surface unique, à copier d'un seul blit.
+"""
+import pygame
+
+from sprite_cache import SpriteCache
+
+
+class Hud:
+    def __init__(self, maxsize=256):
+        self.texts = SpriteCache(maxsize)
+        self.panels = {}
+
+    def render(self, font, text, color):
+        return self.texts.get((font, text, color), font.render, text, True, color)
+
+    def panel(self, key, build):
+        # build() renvoie [(police, texte, couleur, (x, y))], positions relatives
+        # au panneau ; il n'est appelé qu'à la première demande de cette clé
+        panel = self.panels.get(key)
+        if panel is None:
+            rendered = [(self.render(font, text, color), pos) for font, text, color, pos in build()]
+            width = max(surface.get_width() + x for surface, (x, y) in rendered)
+            height = max(surface.get_height() + y for surface, (x, y) in rendered)
+            panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            # Copie exacte des pixels (alpha compris) sur le panneau transparent
+            panel.blits([(surface, pos, None, pygame.BLEND_RGBA_MAX) for surface, pos in rendered], False)
+            self.panels[key] = panel
+        return panel
+
+    def clear(self):
+        self.texts.clear()
+        self.panels.clear()
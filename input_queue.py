@@ -0,0 +1,55 @@
+"""
+File d'entrées bornée par joueur, consommée une entrée par déplacement.
+
+Deux touches pressées entre deux déplacements du snake (haut puis gauche à
+8 ticks/s) ne s'écrasent plus : elles sont jouées l'une après l'autre, aux
+deux déplacements suivants. Chaque direction est validée à l'entrée contre
+celle qui sera réellement en vigueur à ce moment-là (la dernière de la file,
+ou la direction actuelle si la file est vide), ce qui écarte les demi-tours
+et les doublons. Le délai entre l'appui et le déplacement qui l'applique est
+mesuré pour chaque tick.
+"""
+from collections import deque
+
+from snake_engine import is_valid_turn
+
+QUEUE_SIZE = 3
+LATENCY_SAMPLES = 600
+
+
+class InputQueue:
+    def __init__(self, size=QUEUE_SIZE):
+        self.size = size
+        self.entries = deque()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)  # (tick, délai en ms)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.latencies.clear()
+
+    def push(self, direction, current, now):
+        # Renvoie False si l'entrée est refusée (demi-tour, doublon, file pleine)
+        last = self.entries[-1][0] if self.entries else current
+        if direction == last or not is_valid_turn(last, direction) or len(self.entries) >= self.size:
+            return False
+        self.entries.append((direction, now))
+        return True
+
+    def pop(self, heading, tick, now):
+        # Direction à appliquer au déplacement de ce tick (None si aucune)
+        while self.entries:
+            direction, pressed = self.entries.popleft()
+            if is_valid_turn(heading, direction):
+                self.latencies.append((tick, (now - pressed) * 1000))
+                return direction
+        return None
+
+    def latency_stats(self):
+        # (moyenne, maximum) en ms sur les derniers échantillons, ou None
+        if not self.latencies:
+            return None
+        delays = [delay for tick, delay in self.latencies]
+        return sum(delays) / len(delays), max(delays)
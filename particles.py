@@ -0,0 +1,122 @@
+"""
+Système de particules en tableaux NumPy (structure de tableaux).
+
+Toutes les particules vivent dans des tableaux préalloués de capacité fixe :
+positions, vitesses, amortissement, durée de vie, rayon et couleur. update()
+intègre, amortit et vieillit toutes les particules en quelques opérations
+vectorisées, puis bouche les trous laissés par les particules mortes avec les
+dernières vivantes (compaction par échange, sans décaler le reste). draw()
+dessine d'un seul Surface.blits(), à partir de disques pré-rendus, les
+particules qui touchent la surface (décalée de la position de la caméra).
+"""
+import random
+
+import numpy as np
+import pygame
+
+COLORKEY = (255, 0, 255)
+
+
+class ParticleSystem:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.damping = np.ones(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.max_life = np.ones(capacity, dtype=np.int32)
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.shrink = np.zeros(capacity, dtype=bool)  # Rayon proportionnel à la vie restante
+        self.color = np.zeros(capacity, dtype=np.int32)  # Indice dans self.colors
+        self.colors = []
+        self.color_index = {}
+        self.discs = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, count, speed, life, colors, rng=random, damping=1.0, radius=3, shrink=False):
+        # Une couleur (tuple) ou une liste tirée au hasard pour chaque particule.
+        # Au-delà de la capacité, les particules en trop sont ignorées.
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        for i in range(start, end):
+            self.vx[i] = rng.uniform(-speed, speed)
+            self.vy[i] = rng.uniform(-speed, speed)
+            color = rng.choice(colors) if isinstance(colors, list) else colors
+            self.color[i] = self.color_id(color)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.damping[start:end] = damping
+        self.life[start:end] = life
+        self.max_life[start:end] = life
+        self.radius[start:end] = radius
+        self.shrink[start:end] = shrink
+        self.count = end
+
+    def color_id(self, color):
+        index = self.color_index.get(color)
+        if index is None:
+            index = self.color_index[color] = len(self.colors)
+            self.colors.append(color)
+        return index
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vx[:n] *= self.damping[:n]
+        self.vy[:n] *= self.damping[:n]
+        self.life[:n] -= 1
+
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if len(dead) == 0:
+            return
+        # Les survivantes situées après la nouvelle fin remplissent les trous d'avant
+        alive = n - len(dead)
+        holes = dead[dead < alive]
+        movers = np.flatnonzero(self.life[alive:n] > 0) + alive
+        for array in (self.x, self.y, self.vx, self.vy, self.damping, self.life,
+                      self.max_life, self.radius, self.shrink, self.color):
+            array[holes] = array[movers]
+        self.count = alive
+
+    def disc(self, color_id, radius):
+        # Disque pré-rendu identique à pygame.draw.circle(surface, couleur, centre, rayon)
+        key = (color_id, radius)
+        disc = self.discs.get(key)
+        if disc is None:
+            disc = pygame.Surface((2 * radius, 2 * radius))
+            disc.fill(COLORKEY)
+            pygame.draw.circle(disc, self.colors[color_id], (radius, radius), radius)
+            disc.set_colorkey(COLORKEY)
+            self.discs[key] = disc
+        return disc
+
+    def draw(self, surface, origin=(0, 0)):
+        # origin : position des particules au coin de la surface. Renvoie les rectangles dessinés
+        n = self.count
+        if n == 0:
+            return []
+        radius = self.radius[:n]
+        radius = np.where(self.shrink[:n], radius * self.life[:n] // self.max_life[:n], radius)
+        xs = self.x[:n].astype(np.int32) - origin[0] - radius
+        ys = self.y[:n].astype(np.int32) - origin[1] - radius
+        width, height = surface.get_size()
+        visible = np.flatnonzero((radius > 0) & (xs < width) & (ys < height) &
+                                 (xs + 2 * radius > 0) & (ys + 2 * radius > 0))
+        xs = xs[visible]
+        ys = ys[visible]
+        sprites = [(self.disc(color_id, r), (x, y)) for color_id, r, x, y in
+                   zip(self.color[visible].tolist(), radius[visible].tolist(), xs.tolist(), ys.tolist())]
+        return surface.blits(sprites)
@@ -0,0 +1,190 @@
+"""
+Profileur des phases d'une image (overlay F3 du Snake MEGA Ultimate).
+
+Chaque phase mesurée s'écrit `with profiler.phase("nom"):` ; les phases
+imbriquées sont affichées en retrait sous leur parente et une phase traversée
+plusieurs fois dans l'image (un tick par snake, par exemple) est cumulée.
+end_frame() clôt l'image : les durées de chaque phase et le temps total de
+l'image sont conservés sur les SAMPLES dernières images pour la moyenne et les
+centiles 95 et 99.
+
+Avec start_trace(), chaque phase devient aussi un span et chaque image un
+span "frame" ; instant() ajoute un événement ponctuel (fruit mangé,
+collision...) et les passages du ramasse-miettes sont enregistrés comme
+spans "gc". save_trace() écrit le tout au format Chrome trace-event (JSON),
+lisible dans chrome://tracing ou Perfetto.
+
+Désactivé, phase() renvoie un contexte vide partagé, sans lecture d'horloge
+ni allocation. Le moteur utilise NULL_PROFILER tant que le jeu ne lui en
+donne pas un autre.
+"""
+import gc
+import json
+import os
+import threading
+import time
+from collections import deque
+
+SAMPLES = 240  # 4 secondes à 60 images/s
+MAX_TRACE_EVENTS = 2000000  # Au-delà, la trace n'enregistre plus rien
+
+
+class NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class Phase:
+    def __init__(self, profiler, name, depth):
+        self.profiler = profiler
+        self.name = name
+        self.depth = depth
+        self.start = 0.0
+
+    def __enter__(self):
+        self.profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler.current[self.name] = profiler.current.get(self.name, 0.0) + elapsed
+        profiler.depth -= 1
+        if profiler.trace is not None:
+            profiler.record(("X", self.name, self.start, elapsed, None))
+        return False
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class FrameProfiler:
+    def __init__(self, samples=SAMPLES):
+        self.samples = samples
+        self.enabled = False  # Overlay affiché
+        self.active = False  # Phases mesurées : overlay ou trace en cours
+        self.trace = None  # Événements (type, nom, début, durée, args) de la trace
+        self.gc_start = None
+        # Imbrication et images en cours : F3 peut être pressé au milieu d'une
+        # phase, clear() n'y touche donc pas
+        self.depth = 0
+        self.frame_start = None
+        self.frames = 0
+        self.clear()
+
+    def clear(self):
+        # Remet à zéro les statistiques de l'overlay
+        self.phases = {}  # Nom -> Phase, dans l'ordre de première apparition
+        self.current = {}  # Nom -> secondes passées dans la phase pendant l'image
+        self.history = {}  # Nom -> durées des dernières images, en ms
+        self.frame_times = deque(maxlen=self.samples)
+
+    def resume(self):
+        # Mesures reprises après une pause : l'image en cours n'a pas de début
+        if not self.active:
+            self.frame_start = None
+        self.active = True
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled or self.trace is not None:
+            self.resume()
+        else:
+            self.active = False
+        self.clear()
+
+    def phase(self, name):
+        if not self.active:
+            return NULL_PHASE
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name, self.depth)
+            self.history[name] = deque(maxlen=self.samples)
+        return phase
+
+    def end_frame(self):
+        if not self.active:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.append((now - self.frame_start) * 1000)
+            if self.trace is not None:
+                self.record(("X", "frame", self.frame_start, now - self.frame_start, {"frame": self.frames}))
+        self.frame_start = now
+        for name, history in self.history.items():
+            history.append(self.current.get(name, 0.0) * 1000)
+        self.current = {}
+        self.frames += 1
+
+    def stats(self, values):
+        # (moyenne, p95, p99) en ms, ou None sans échantillon
+        if not values:
+            return None
+        ordered = sorted(values)
+        return sum(ordered) / len(ordered), percentile(ordered, 0.95), percentile(ordered, 0.99)
+
+    def report(self):
+        # [(nom, profondeur, (moyenne, p95, p99))] dans l'ordre des phases
+        return [(name, phase.depth, self.stats(self.history[name]))
+                for name, phase in self.phases.items() if self.history[name]]
+
+    def start_trace(self):
+        self.trace = []
+        self.trace_start = time.perf_counter()
+        self.resume()
+        gc.callbacks.append(self.gc_callback)
+
+    def record(self, event):
+        if len(self.trace) < MAX_TRACE_EVENTS:
+            self.trace.append(event)
+
+    def instant(self, name, args=None):
+        # Événement ponctuel, sans durée (fruit mangé, collision...)
+        if self.trace is not None:
+            self.record(("i", name, time.perf_counter(), 0.0, args))
+
+    def gc_callback(self, phase, info):
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            args = {"generation": info["generation"], "collected": info["collected"]}
+            self.record(("X", "gc", self.gc_start, time.perf_counter() - self.gc_start, args))
+            self.gc_start = None
+
+    def trace_events(self):
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": "boucle de jeu"}}]
+        for kind, name, start, duration, args in self.trace:
+            event = {"ph": kind, "name": name, "pid": pid, "tid": tid,
+                     "ts": (start - self.trace_start) * 1e6}
+            if kind == "X":
+                event["dur"] = duration * 1e6
+            else:
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            events.append(event)
+        return events
+
+    def save_trace(self, path):
+        # Arrête la trace et l'écrit ; renvoie le nombre d'événements
+        if self.trace is None:
+            return 0
+        gc.callbacks.remove(self.gc_callback)
+        events = self.trace_events()
+        self.trace = None
+        self.active = self.enabled
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+NULL_PROFILER = FrameProfiler()
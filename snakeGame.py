@@ -1,6 +1,8 @@
 import pygame
 import random
 import sys
+import argparse
+from free_cells import FreeCellIndex
 
 # Initialisation
 pygame.init()
@@ -16,19 +18,22 @@ RED = (255, 0, 0)
 WHITE = (255, 255, 255)
 
 class Snake:
-    def __init__(self):
+    def __init__(self, cells):
         self.body = [(GRID_WIDTH//2, GRID_HEIGHT//2)]
         self.direction = (1, 0)
+        self.cells = cells
+        cells.occupy(self.body[0])
         
     def move(self):
         head = (self.body[0][0] + self.direction[0], self.body[0][1] + self.direction[1])
         self.body.insert(0, head)
+        self.cells.occupy(head)
         
     def grow(self):
         pass  # Ne pas supprimer la queue
         
     def shrink(self):
-        self.body.pop()
+        self.cells.release(self.body.pop())
         
     def check_collision(self):
         head = self.body[0]
@@ -39,11 +44,15 @@ class Snake:
         return head in self.body[1:]
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Snake Game")
         self.clock = pygame.time.Clock()
-        self.snake = Snake()
+        # Avec une graine fixe, chaque partie se rejoue à l'identique
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+        self.snake = Snake(self.free_cells)
         self.foods = []
         self.score = 0
         self.font = pygame.font.Font(None, 36)
@@ -54,22 +63,15 @@ class Game:
     def maintain_foods(self):
         # Maintenir 10 fruits en permanence
         while len(self.foods) < 10:
-            # Créer une liste de toutes les positions libres
-            occupied = set(self.snake.body) | set(self.foods)
-            free_positions = []
-            
-            for x in range(GRID_WIDTH):
-                for y in range(GRID_HEIGHT):
-                    if (x, y) not in occupied:
-                        free_positions.append((x, y))
+            # Choisir une position aléatoire parmi les cases libres
+            pos = self.free_cells.random_free(self.rng)
             
             # Si aucune position libre, arrêter (grille pleine)
-            if not free_positions:
+            if pos is None:
                 break
                 
-            # Choisir une position aléatoire parmi les libres
-            pos = random.choice(free_positions)
             self.foods.append(pos)
+            self.free_cells.occupy(pos)
                 
     def handle_events(self):
         keys = pygame.key.get_pressed()
@@ -100,6 +102,7 @@ class Game:
         if head in self.foods:
             self.snake.grow()
             self.foods.remove(head)
+            self.free_cells.release(head)
             self.score += 1
         else:
             self.snake.shrink()
@@ -160,7 +163,9 @@ class Game:
                 if not self.game_over():
                     break
                 # Redémarrer le jeu
-                self.snake = Snake()
+                self.rng = random.Random(self.seed)
+                self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+                self.snake = Snake(self.free_cells)
                 self.foods = []
                 self.score = 0
                 self.sprinting = False
@@ -173,5 +178,10 @@ class Game:
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="graine du générateur aléatoire (parties reproductibles)")
+    args = parser.parse_args()
+    
+    game = Game(seed=args.seed)
     game.run()
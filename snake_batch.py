@@ -0,0 +1,392 @@
+"""
+Environnement vectorisé : N parties solo indépendantes avancées ensemble.
+
+Chaque partie suit les règles de snake_engine.SnakeEngine (un seul snake,
+modes classique, portails, obstacles et survie), mais tout l'état est rangé
+dans des tableaux NumPy indexés par partie et chaque tick est calculé par
+opérations vectorisées sur toutes les parties encore en vie :
+
+    env = BatchSnakeEnv(4096, MODE_PORTAL, seed=1)
+    alive = env.step(actions)      # actions[i] : indice dans DIRECTIONS, -1 = inchangé
+    env.reset(~alive)              # relancer les parties terminées
+
+Les grilles sont aplaties (case = y * width + x). Le corps de chaque snake
+est un tampon circulaire de `capacity` cases : tête en head_ptr, queue en
+head_ptr + length - 1 (modulo capacity). Un snake qui atteint la capacité ne
+grandit plus.
+"""
+import numpy as np
+
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, DIRECTIONS, FRUIT_POINTS,
+    FRUIT_SLOW, FRUIT_SHRINK, FRUIT_GHOST, FRUIT_SPEED, FRUIT_TELEPORT, FRUIT_INVINCIBLE,
+    MODE_CLASSIC, MODE_PORTAL, MODE_OBSTACLES, MODE_SURVIVAL, inner_range
+)
+
+DIR_X = np.array([d[0] for d in DIRECTIONS], dtype=np.int32)
+DIR_Y = np.array([d[1] for d in DIRECTIONS], dtype=np.int32)
+
+# Seuils de roll_fruit_type() : type = nombre de seuils <= tirage
+FRUIT_THRESHOLDS = np.array([0.4, 0.55, 0.68, 0.78, 0.86, 0.92, 0.97])
+POINTS = np.array([FRUIT_POINTS[t] for t in range(len(FRUIT_POINTS))], dtype=np.int32)
+
+SPAWN_ATTEMPTS = 8  # Tirages aléatoires avant le repli sur une recherche exacte
+
+
+class BatchSnakeEnv:
+    def __init__(self, num_games, mode=MODE_CLASSIC, width=GRID_WIDTH, height=GRID_HEIGHT,
+                 capacity=None, seed=None):
+        if mode not in (MODE_CLASSIC, MODE_PORTAL, MODE_OBSTACLES, MODE_SURVIVAL):
+            raise ValueError("BatchSnakeEnv ne gère que les modes solo")
+        if min(width, height) < 4:
+            raise ValueError("plateau trop petit (4x4 cases minimum)")
+
+        self.num_games = num_games
+        self.mode = mode
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.inner_x, self.inner_y = inner_range(width), inner_range(height)
+        self.capacity = capacity or self.cells
+        self.rng = np.random.default_rng(seed)
+
+        self.fruit_target = 20 if mode == MODE_SURVIVAL else 10
+        self.num_obstacles = 5 if mode == MODE_OBSTACLES else 0
+
+        n = num_games
+        # Occupation des grilles. Chaque ligne a une case de plus (indice
+        # self.cells) où tombent toutes les positions hors de la grille, ce qui
+        # évite de filtrer les têtes sorties du plateau.
+        self.stride = self.cells + 1
+        self.snake_counts = np.zeros((n, self.stride), dtype=np.int16)
+        self.fruit_grid = np.zeros((n, self.stride), dtype=np.int8)  # type de fruit + 1, 0 = vide
+        self.fruit_count = np.zeros(n, dtype=np.int32)
+
+        # Corps en tampon circulaire
+        self.body_x = np.zeros((n, self.capacity), dtype=np.int32)
+        self.body_y = np.zeros((n, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.dir_x = np.zeros(n, dtype=np.int32)
+        self.dir_y = np.zeros(n, dtype=np.int32)
+
+        # Vues à plat pour l'indexation vectorisée
+        self.snake_flat = self.snake_counts.reshape(-1)
+        self.fruit_flat = self.fruit_grid.reshape(-1)
+        self.body_x_flat = self.body_x.reshape(-1)
+        self.body_y_flat = self.body_y.reshape(-1)
+
+        # Timers d'effets
+        self.ghost_timer = np.zeros(n, dtype=np.int32)
+        self.speed_boost_timer = np.zeros(n, dtype=np.int32)
+        self.invincible_timer = np.zeros(n, dtype=np.int32)
+        self.teleport_charges = np.zeros(n, dtype=np.int32)
+        self.slow_timer = np.zeros(n, dtype=np.int32)
+        self.auto_boost_timer = np.zeros(n, dtype=np.int32)
+        self.survival_timer = np.zeros(n, dtype=np.int32)
+
+        # Obstacles (toujours dans la grille, comparés directement à la tête)
+        k = self.num_obstacles
+        self.obs_x = np.zeros((n, k), dtype=np.int32)
+        self.obs_y = np.zeros((n, k), dtype=np.int32)
+        self.obs_dx = np.zeros((n, k), dtype=np.int32)
+        self.obs_dy = np.zeros((n, k), dtype=np.int32)
+        self.obs_timer = np.zeros((n, k), dtype=np.int32)
+        self.obs_moving = np.zeros((n, k), dtype=bool)
+
+        # Résultats
+        self.score = np.zeros(n, dtype=np.int32)
+        self.level = np.ones(n, dtype=np.int32)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.eaten = np.full(n, -1, dtype=np.int8)  # fruit mangé au dernier tick, -1 sinon
+        self.done = np.zeros(n, dtype=bool)
+        self.victory = np.zeros(n, dtype=bool)
+
+        self.reset()
+
+    @property
+    def slow_effect(self):
+        return self.slow_timer > 0
+
+    @property
+    def board(self):
+        # Grille (partie, y, x) : segments de snake, fruits et obstacles par case
+        board = self.snake_counts[:, :self.cells] + (self.fruit_grid[:, :self.cells] > 0)
+        rows = np.repeat(np.arange(self.num_games), self.num_obstacles)
+        np.add.at(board, (rows, (self.obs_y * self.width + self.obs_x).ravel()), 1)
+        return board.reshape(self.num_games, self.height, self.width)
+
+    def head_positions(self):
+        rows = np.arange(self.num_games)
+        return np.stack([self.body_x[rows, self.head_ptr], self.body_y[rows, self.head_ptr]], axis=1)
+
+    def reset(self, mask=None):
+        if mask is None:
+            games = np.arange(self.num_games)
+        else:
+            games = np.flatnonzero(mask)
+        if games.size == 0:
+            return
+
+        self.snake_counts[games] = 0
+        self.fruit_grid[games] = 0
+        self.fruit_count[games] = 0
+
+        start_x, start_y = self.width // 2, self.height // 2
+        self.head_ptr[games] = 0
+        self.length[games] = 1
+        self.body_x[games, 0] = start_x
+        self.body_y[games, 0] = start_y
+        self.snake_counts[games, start_y * self.width + start_x] = 1
+        self.dir_x[games] = 1
+        self.dir_y[games] = 0
+
+        for timer in (self.ghost_timer, self.speed_boost_timer, self.invincible_timer,
+                      self.teleport_charges, self.slow_timer, self.auto_boost_timer):
+            timer[games] = 0
+        self.survival_timer[games] = 120 * 60 if self.mode == MODE_SURVIVAL else 0
+
+        self.score[games] = 0
+        self.level[games] = 1
+        self.ticks[games] = 0
+        self.eaten[games] = -1
+        self.done[games] = False
+        self.victory[games] = False
+
+        if self.num_obstacles:
+            self.create_obstacles(games)
+
+    def inner_positions(self, size):
+        # Cases tirées comme inner_range() dans le moteur : loin des bords,
+        # ou sur tout un petit plateau
+        (x0, x1), (y0, y1) = self.inner_x, self.inner_y
+        return self.rng.integers(x0, x1 + 1, size=size), self.rng.integers(y0, y1 + 1, size=size)
+
+    def create_obstacles(self, games):
+        shape = (games.size, self.num_obstacles)
+        x, y = self.inner_positions(shape)
+        # Pas d'obstacle sur la case de départ du snake
+        on_snake = (x == self.width // 2) & (y == self.height // 2)
+        while on_snake.any():
+            x[on_snake], y[on_snake] = self.inner_positions(on_snake.sum())
+            on_snake = (x == self.width // 2) & (y == self.height // 2)
+
+        d = self.rng.integers(0, len(DIRECTIONS), size=shape)
+        self.obs_x[games] = x
+        self.obs_y[games] = y
+        self.obs_dx[games] = DIR_X[d]
+        self.obs_dy[games] = DIR_Y[d]
+        self.obs_timer[games] = 0
+        self.obs_moving[games] = self.rng.random(shape) < 0.3
+
+    def step(self, actions=None, teleport=None):
+        active = ~self.done
+        games = np.flatnonzero(active)
+        self.eaten[:] = -1
+        if games.size == 0:
+            return ~self.done
+
+        if actions is not None:
+            self.apply_directions(games, np.asarray(actions)[games])
+        if teleport is not None:
+            wants = np.asarray(teleport, dtype=bool)[games] & (self.teleport_charges[games] > 0)
+            self.teleport(games[wants])
+
+        if self.num_obstacles:
+            self.update_obstacles(active)
+
+        self.maintain_foods(games)
+
+        # Timers globaux
+        self.slow_timer[games] = np.maximum(self.slow_timer[games] - 1, 0)
+        boost_timer = self.auto_boost_timer[games] + 1
+        boost = boost_timer > 1800
+        boost_timer[boost] = 0
+        self.auto_boost_timer[games] = boost_timer
+        self.speed_boost_timer[games[boost]] = 180
+
+        # Mode survie : temps écoulé = victoire
+        if self.mode == MODE_SURVIVAL:
+            self.survival_timer[games] -= 1
+            finished = self.survival_timer[games] <= 0
+            self.victory[games[finished]] = True
+            self.done[games[finished]] = True
+            games = games[~finished]
+
+        self.update_snakes(games)
+        return ~self.done
+
+    def apply_directions(self, games, actions):
+        has_action = actions >= 0
+        games, actions = games[has_action], actions[has_action]
+        new_x, new_y = DIR_X[actions], DIR_Y[actions]
+        # Interdire le demi-tour direct
+        valid = ~((new_x == -self.dir_x[games]) & (new_y == -self.dir_y[games]))
+        self.dir_x[games[valid]] = new_x[valid]
+        self.dir_y[games[valid]] = new_y[valid]
+
+    def cell_index(self, games, x, y):
+        # Indice à plat dans snake_flat / fruit_flat (case sentinelle hors grille)
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        return games * self.stride + np.where(inside, y * self.width + x, self.cells), inside
+
+    def teleport(self, games):
+        # Jusqu'à 100 tirages par partie, comme Snake.teleport()
+        for _ in range(100):
+            if games.size == 0:
+                break
+            x, y = self.inner_positions(games.size)
+            ok = self.snake_flat[games * self.stride + y * self.width + x] == 0
+            self.set_heads(games[ok], x[ok], y[ok])
+            self.teleport_charges[games[ok]] -= 1
+            games = games[~ok]
+
+    def set_heads(self, games, x, y):
+        if games.size == 0:
+            return
+        slot = games * self.capacity + self.head_ptr[games]
+        old_cell, _ = self.cell_index(games, self.body_x_flat[slot], self.body_y_flat[slot])
+        self.snake_flat[old_cell] -= 1
+        self.body_x_flat[slot] = x
+        self.body_y_flat[slot] = y
+        cell, _ = self.cell_index(games, x, y)
+        self.snake_flat[cell] += 1
+
+    def pop_tails(self, games):
+        if games.size == 0:
+            return
+        tail = self.head_ptr[games] + self.length[games] - 1
+        tail[tail >= self.capacity] -= self.capacity
+        slot = games * self.capacity + tail
+        cell, _ = self.cell_index(games, self.body_x_flat[slot], self.body_y_flat[slot])
+        self.snake_flat[cell] -= 1
+        self.length[games] -= 1
+
+    def update_obstacles(self, active):
+        # Tableaux (parties, obstacles) complets : moins coûteux qu'une sélection de lignes
+        moving = self.obs_moving & active[:, None]
+        self.obs_timer += moving
+        change = moving & (self.obs_timer > 60)
+        if change.any():
+            self.obs_timer[change] = 0
+            d = self.rng.integers(0, len(DIRECTIONS), size=change.sum())
+            self.obs_dx[change] = DIR_X[d]
+            self.obs_dy[change] = DIR_Y[d]
+
+        new_x = self.obs_x + self.obs_dx
+        new_y = self.obs_y + self.obs_dy
+        moved = moving & (new_x >= 0) & (new_x < self.width) & (new_y >= 0) & (new_y < self.height)
+        np.copyto(self.obs_x, new_x, where=moved)
+        np.copyto(self.obs_y, new_y, where=moved)
+
+    def hits_obstacle(self, games, x, y):
+        return ((self.obs_x[games] == x[:, None]) & (self.obs_y[games] == y[:, None])).any(axis=1)
+
+    def is_free(self, games, cells):
+        flat = games * self.stride + cells
+        free = (self.snake_flat[flat] == 0) & (self.fruit_flat[flat] == 0)
+        if self.num_obstacles:
+            free &= ~self.hits_obstacle(games, cells % self.width, cells // self.width)
+        return free
+
+    def place_fruits(self, games, cells):
+        types = np.searchsorted(FRUIT_THRESHOLDS, self.rng.random(games.size), side='right')
+        self.fruit_flat[games * self.stride + cells] = types + 1
+        self.fruit_count[games] += 1
+
+    def maintain_foods(self, games):
+        missing = games[self.fruit_count[games] < self.fruit_target]
+        failures = np.zeros(missing.size, dtype=np.int32)
+        stuck = []
+        while missing.size:
+            cells = self.rng.integers(0, self.cells, size=missing.size)
+            ok = self.is_free(missing, cells)
+            self.place_fruits(missing[ok], cells[ok])
+            failures += ~ok
+            needs_more = self.fruit_count[missing] < self.fruit_target
+            stuck.extend(missing[needs_more & (failures >= SPAWN_ATTEMPTS)])
+            keep = needs_more & (failures < SPAWN_ATTEMPTS)
+            missing, failures = missing[keep], failures[keep]
+
+        # Grille presque pleine : recherche exacte, partie par partie
+        all_cells = np.arange(self.cells)
+        for game in stuck:
+            while self.fruit_count[game] < self.fruit_target:
+                free = all_cells[self.is_free(np.full(self.cells, game), all_cells)]
+                if free.size == 0:
+                    break
+                self.place_fruits(np.array([game]), np.array([self.rng.choice(free)]))
+
+    def update_snakes(self, games):
+        if games.size == 0:
+            return
+        ring = games * self.capacity
+
+        # Tampon plein : la queue avance d'abord pour libérer une place
+        full = self.length[games] >= self.capacity
+        self.pop_tails(games[full])
+
+        # Déplacement de la tête
+        ptr = self.head_ptr[games]
+        new_ptr = ptr - 1
+        new_ptr[new_ptr < 0] = self.capacity - 1
+        head_x = self.body_x_flat[ring + ptr] + self.dir_x[games]
+        head_y = self.body_y_flat[ring + ptr] + self.dir_y[games]
+        self.body_x_flat[ring + new_ptr] = head_x
+        self.body_y_flat[ring + new_ptr] = head_y
+        self.head_ptr[games] = new_ptr
+        self.length[games] += 1
+        cell, inside = self.cell_index(games, head_x, head_y)
+        self.snake_flat[cell] += 1
+        self.ticks[games] += 1
+
+        # Timers d'effets
+        for timer in (self.ghost_timer, self.speed_boost_timer, self.invincible_timer):
+            values = timer[games]
+            values[values > 0] -= 1
+            timer[games] = values
+
+        # Consommation de nourriture (tête avant passage de portail)
+        fruit = self.fruit_flat[cell]
+        ate = fruit > 0
+        if ate.any():
+            eaters, eaten = games[ate], fruit[ate].astype(np.int32) - 1
+            self.fruit_flat[cell[ate]] = 0
+            self.fruit_count[eaters] -= 1
+            self.score[eaters] += POINTS[eaten]
+            self.eaten[eaters] = eaten
+
+            # Effets spéciaux
+            slow = eaters[eaten == FRUIT_SLOW]
+            self.slow_timer[slow] = np.maximum(self.slow_timer[slow], 300)
+            self.ghost_timer[eaters[eaten == FRUIT_GHOST]] = 180
+            self.speed_boost_timer[eaters[eaten == FRUIT_SPEED]] = 300
+            self.teleport_charges[eaters[eaten == FRUIT_TELEPORT]] += 3
+            self.invincible_timer[eaters[eaten == FRUIT_INVINCIBLE]] = 600
+            shrinking = eaters[eaten == FRUIT_SHRINK]
+            for _ in range(3):
+                shrinking = shrinking[self.length[shrinking] > 1]
+                self.pop_tails(shrinking)
+            self.level[eaters] = np.maximum(self.level[eaters], self.score[eaters] // 15 + 1)
+
+        # Pas de fruit : la queue suit
+        self.pop_tails(games[~ate & ~full])
+
+        # Collisions
+        vulnerable = self.invincible_timer[games] <= 0
+        if self.mode == MODE_PORTAL:
+            wrap = ~inside
+            head_x, head_y = head_x % self.width, head_y % self.height
+            self.set_heads(games[wrap], head_x[wrap], head_y[wrap])
+            cell, inside = self.cell_index(games, head_x, head_y)
+            dead = np.zeros(games.size, dtype=bool)
+        else:
+            dead = ~inside & vulnerable
+
+        # Collision avec soi-même (la case sentinelle n'est jamais testée)
+        dead |= inside & (self.ghost_timer[games] <= 0) & vulnerable & (self.snake_flat[cell] > 1)
+
+        if self.num_obstacles:
+            dead |= vulnerable & self.hits_obstacle(games, head_x, head_y)
+
+        self.done[games[dead]] = True
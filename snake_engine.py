@@ -0,0 +1,675 @@
+"""
+Moteur de simulation du Snake MEGA Ultimate, sans dépendance à pygame.
+
+SnakeEngine contient tout l'état d'une partie (snakes, fruits, obstacles,
+scores, niveau, timers) et step() la fait avancer d'un tick. Le rendu, le son
+et la lecture du clavier restent dans snake_mega_ultimate.Game, qui lit
+engine.events après chaque tick pour déclencher particules, explosions et sons.
+
+Chaque snake a sa propre horloge, réglée par get_current_speed() (sprint,
+boost, ralentissement), et le monde (obstacles, fruits, timers globaux) suit
+celle du snake le plus rapide. Un tick fait avancer tout ce qui est dû au
+prochain instant de TickScheduler ; en solo, snake et monde avancent ensemble
+à chaque tick. Snakes et scores sont rangés par numéro de joueur (1 à
+MAX_PLAYERS) : le moteur ne suppose pas deux joueurs.
+
+Les dimensions du plateau (width, height) sont propres à chaque partie. Un
+tick ne coûte rien de proportionnel à la surface : fruits et obstacles sont
+placés via l'index des cases libres, téléportation et portails ne font que
+des calculs sur la case de la tête.
+
+Tout l'aléatoire du gameplay passe par engine.rng, initialisé avec engine.seed :
+la même graine et la même suite d'actions redonnent exactement le même état
+(voir state_digest()).
+"""
+import hashlib
+import heapq
+import random
+from collections import deque
+from free_cells import FreeCellIndex
+from profiler import NULL_PROFILER
+
+GRID_WIDTH = 60  # Plateau par défaut ; chaque SnakeEngine a ses propres dimensions
+GRID_HEIGHT = 40
+PLACEMENT_ATTEMPTS = 100  # Tirages d'une case au hasard avant le repli sur l'index des cases libres
+
+# Types de fruits et power-ups
+FRUIT_NORMAL = 0
+FRUIT_BONUS = 1
+FRUIT_SLOW = 2
+FRUIT_SHRINK = 3
+FRUIT_GHOST = 4
+FRUIT_SPEED = 5
+FRUIT_TELEPORT = 6
+FRUIT_INVINCIBLE = 7
+
+# Modes de jeu
+MODE_CLASSIC = 0
+MODE_PORTAL = 1
+MODE_OBSTACLES = 2
+MODE_SURVIVAL = 3
+MODE_COOPERATIVE = 4
+
+# Événements émis pendant un tick (premier élément du tuple)
+EVENT_MOVE = 0        # (EVENT_MOVE, joueur, case de queue après le déplacement)
+EVENT_EAT = 1         # (EVENT_EAT, joueur, type de fruit, position)
+EVENT_LEVEL_UP = 2    # (EVENT_LEVEL_UP, nouveau niveau)
+EVENT_TELEPORT = 3    # (EVENT_TELEPORT, joueur)
+EVENT_COLLISION = 4   # (EVENT_COLLISION, joueur, tête)
+
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+TIME_UNIT = 1000000  # Unités de temps du planificateur par seconde (entiers : déterministe)
+WORLD = 0  # Horloge du monde ; les joueurs sont numérotés à partir de 1
+
+# Case de départ de chaque joueur, en quarts du plateau : centre, puis
+# gauche et droite du centre, puis au-dessus et en dessous, puis les coins
+START_QUARTERS = [(2, 2), (1, 2), (3, 2), (2, 1), (2, 3), (1, 1), (3, 1), (1, 3), (3, 3)]
+MAX_PLAYERS = len(START_QUARTERS)
+
+FRUIT_POINTS = {
+    FRUIT_NORMAL: 1,
+    FRUIT_BONUS: 5,
+    FRUIT_SLOW: 2,
+    FRUIT_SHRINK: 3,
+    FRUIT_GHOST: 4,
+    FRUIT_SPEED: 3,
+    FRUIT_TELEPORT: 6,
+    FRUIT_INVINCIBLE: 8
+}
+
+
+def start_position(player_num, width, height):
+    qx, qy = START_QUARTERS[player_num - 1]
+    return (width * qx // 4, height * qy // 4)
+
+
+def roll_fruit_type(rand):
+    # Probabilités étendues avec nouveaux fruits
+    if rand < 0.4:  # 40% fruits normaux
+        return FRUIT_NORMAL
+    elif rand < 0.55:  # 15% fruits bonus
+        return FRUIT_BONUS
+    elif rand < 0.68:  # 13% fruits slow
+        return FRUIT_SLOW
+    elif rand < 0.78:  # 10% fruits shrink
+        return FRUIT_SHRINK
+    elif rand < 0.86:  # 8% fruits ghost
+        return FRUIT_GHOST
+    elif rand < 0.92:  # 6% fruits speed
+        return FRUIT_SPEED
+    elif rand < 0.97:  # 5% fruits teleport
+        return FRUIT_TELEPORT
+    else:  # 3% fruits invincible
+        return FRUIT_INVINCIBLE
+
+
+def inner_range(size):
+    # Coordonnées tirées à 5 cases des bords, ou sur tout un petit plateau
+    return (5, size - 5) if size > 10 else (0, size - 1)
+
+
+def is_valid_turn(current, new):
+    # Interdit le demi-tour direct
+    return new != (-current[0], -current[1])
+
+
+class Obstacle:
+    def __init__(self, x, y, moving=False, rng=random, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.x = x
+        self.y = y
+        self.moving = moving
+        self.rng = rng
+        self.width = width
+        self.height = height
+        self.direction = rng.choice(DIRECTIONS)
+        self.move_timer = 0
+
+    def update(self):
+        if self.moving:
+            self.move_timer += 1
+            if self.move_timer > 60:
+                self.direction = self.rng.choice(DIRECTIONS)
+                self.move_timer = 0
+
+            new_x = self.x + self.direction[0]
+            new_y = self.y + self.direction[1]
+
+            if 0 <= new_x < self.width and 0 <= new_y < self.height:
+                self.x = new_x
+                self.y = new_y
+
+
+class PowerUp:
+    def __init__(self, pos, fruit_type):
+        self.pos = pos
+        self.type = fruit_type
+        self.timer = 0
+        self.animation_timer = 0
+
+    def get_points(self):
+        return FRUIT_POINTS[self.type]
+
+
+class Snake:
+    def __init__(self, start_pos=None, cells=None, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        if start_pos is None:
+            start_pos = (width//2, height//2)
+        # Corps en deque (tête à gauche) + nombre de segments par case,
+        # pour des déplacements et des tests de collision en O(1)
+        self.body = deque([start_pos])
+        self.counts = {start_pos: 1}
+        self.direction = (1, 0)
+        self.heading = self.direction  # Direction du dernier déplacement
+        self.sprinting = False
+        self.ghost_timer = 0
+        self.speed_boost_timer = 0
+        self.invincible_timer = 0
+        self.teleport_charges = 0
+
+        # Index des cases libres partagé avec la partie (optionnel)
+        self.cells = cells
+        if cells is not None:
+            cells.occupy(start_pos)
+
+    def occupies(self, pos):
+        return pos in self.counts
+
+    def add_cell(self, pos):
+        self.counts[pos] = self.counts.get(pos, 0) + 1
+        if self.cells is not None:
+            self.cells.occupy(pos)
+
+    def remove_cell(self, pos):
+        count = self.counts[pos]
+        if count == 1:
+            del self.counts[pos]
+        else:
+            self.counts[pos] = count - 1
+        if self.cells is not None:
+            self.cells.release(pos)
+
+    def move(self):
+        self.heading = self.direction
+        head = (self.body[0][0] + self.direction[0], self.body[0][1] + self.direction[1])
+        self.body.appendleft(head)
+        self.add_cell(head)
+
+    def grow(self):
+        pass
+
+    def pop_tail(self):
+        self.remove_cell(self.body.pop())
+
+    def set_head(self, pos):
+        self.remove_cell(self.body[0])
+        self.body[0] = pos
+        self.add_cell(pos)
+
+    def shrink(self):
+        if len(self.body) > 1:
+            self.pop_tail()
+
+    def apply_shrink(self):
+        for _ in range(3):
+            if len(self.body) > 1:
+                self.pop_tail()
+
+    def teleport(self, rng=random):
+        if self.teleport_charges > 0:
+            # Téléporter à une position aléatoire
+            xs, ys = inner_range(self.width), inner_range(self.height)
+            for _ in range(PLACEMENT_ATTEMPTS):
+                new_x = rng.randint(*xs)
+                new_y = rng.randint(*ys)
+                if not self.occupies((new_x, new_y)):
+                    self.set_head((new_x, new_y))
+                    self.teleport_charges -= 1
+                    return True
+        return False
+
+    def check_collision(self, obstacles=None, portal_mode=False):
+        head = self.body[0]
+
+        # Mode portail : téléportation
+        if portal_mode:
+            new_head = list(head)
+            if head[0] < 0:
+                new_head[0] = self.width - 1
+            elif head[0] >= self.width:
+                new_head[0] = 0
+            if head[1] < 0:
+                new_head[1] = self.height - 1
+            elif head[1] >= self.height:
+                new_head[1] = 0
+            self.set_head(tuple(new_head))
+            head = self.body[0]
+        else:
+            # Collision avec les bords (sauf si invincible)
+            if self.invincible_timer <= 0:
+                if head[0] < 0 or head[0] >= self.width or head[1] < 0 or head[1] >= self.height:
+                    return True
+
+        # Collision avec soi-même (sauf en mode fantôme ou invincible)
+        if self.ghost_timer <= 0 and self.invincible_timer <= 0 and self.counts[head] > 1:
+            return True
+
+        # Collision avec obstacles (sauf si invincible)
+        if obstacles and self.invincible_timer <= 0:
+            for obstacle in obstacles:
+                if head == (obstacle.x, obstacle.y):
+                    return True
+
+        return False
+
+
+class Action:
+    def __init__(self, direction=None, teleport=False, sprinting=False):
+        self.direction = direction
+        self.teleport = teleport
+        self.sprinting = sprinting
+
+
+class TickScheduler:
+    # Une horloge par clé (monde, joueurs). pop_due() renvoie toutes les clés
+    # dues au prochain instant, par clé croissante : les snakes qui bougent en
+    # même temps sont traités ensemble, toujours dans le même ordre.
+    def __init__(self, keys):
+        self.time = 0
+        self.next = {key: 0 for key in keys}
+        self.previous = dict(self.next)
+        self.queue = [(0, key) for key in sorted(keys)]
+
+    def next_time(self):
+        return self.queue[0][0]
+
+    def is_due(self, key):
+        # Vrai si key avance au prochain pop_due()
+        return self.next[key] == self.queue[0][0]
+
+    def pop_due(self):
+        self.time = self.queue[0][0]
+        due = []
+        while self.queue and self.queue[0][0] == self.time:
+            due.append(heapq.heappop(self.queue)[1])
+        return due
+
+    def schedule(self, key, interval):
+        self.previous[key] = self.time
+        self.next[key] = self.time + interval
+        heapq.heappush(self.queue, (self.next[key], key))
+
+    def progress(self, key, time):
+        # Fraction écoulée (0 à 1) entre le dernier et le prochain pas de key
+        previous, next_time = self.previous[key], self.next[key]
+        if next_time <= previous:
+            return 1.0
+        return min(max((time - previous) / (next_time - previous), 0.0), 1.0)
+
+    def getstate(self):
+        return self.time, tuple(sorted(self.next.items())), tuple(sorted(self.previous.items()))
+
+    def setstate(self, state):
+        self.time, next_times, previous = state
+        self.next = dict(next_times)
+        self.previous = dict(previous)
+        self.queue = sorted((time, key) for key, time in self.next.items())
+
+
+class SnakeEngine:
+    def __init__(self, mode=MODE_CLASSIC, multiplayer=False, cooperative=False, seed=None,
+                 width=GRID_WIDTH, height=GRID_HEIGHT, num_players=None):
+        if min(width, height) < 4:
+            raise ValueError("plateau trop petit (4x4 cases minimum)")
+        # Deux joueurs par défaut en multijoueur
+        if num_players is None:
+            num_players = 2 if multiplayer else 1
+        if not 1 <= num_players <= MAX_PLAYERS:
+            raise ValueError(f"de 1 à {MAX_PLAYERS} joueurs")
+        # Graine tirée au hasard si absente, mais toujours connue pour rejouer la partie
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Mesure des phases d'un tick (voir profiler.py), sans effet sur la partie
+        self.profiler = NULL_PROFILER
+
+        self.game_mode = mode
+        self.multiplayer = num_players > 1
+        self.cooperative_mode = cooperative
+        self.width = width
+        self.height = height
+
+        # Cases libres (hors snakes, fruits et obstacles) pour l'apparition des fruits
+        self.free_cells = FreeCellIndex(width, height)
+        # Snakes et scores par numéro de joueur
+        self.snakes = {}
+        for player_num in range(1, num_players + 1):
+            self.snakes[player_num] = Snake(start_position(player_num, width, height), cells=self.free_cells,
+                                            width=width, height=height)
+
+        self.foods = []
+        self.obstacles = []
+
+        # Scores et progression
+        self.scores = {player_num: 0 for player_num in self.snakes}
+        self.level = 1
+        self.base_speed = 8
+        self.sprint_multiplier = 2
+
+        # Timers globaux
+        self.slow_effect = False
+        self.slow_timer = 0
+        self.auto_boost_timer = 0
+
+        # Mode survie
+        self.survival_time = 120  # 2 minutes
+        self.survival_timer = 0
+
+        self.tick = 0
+        self.events = []
+        self.scheduler = TickScheduler([WORLD] + self.players())
+
+        if mode == MODE_OBSTACLES:
+            self.create_obstacles()
+        elif mode == MODE_SURVIVAL:
+            self.survival_timer = self.survival_time * 60  # Convertir en ticks
+
+    def get_snake(self, player_num):
+        return self.snakes[player_num]
+
+    def players(self):
+        return list(self.snakes)
+
+    # Accès directs des deux premiers joueurs (interface à deux joueurs du jeu)
+    @property
+    def snake1(self):
+        return self.snakes[1]
+
+    @property
+    def snake2(self):
+        return self.snakes.get(2)
+
+    @property
+    def score1(self):
+        return self.scores[1]
+
+    @property
+    def score2(self):
+        return self.scores.get(2, 0)
+
+    def create_obstacles(self, count=5):
+        # Tirages au hasard loin des bords ; si les snakes couvrent la zone,
+        # repli sur une case libre de l'index, en temps constant
+        self.obstacles = []
+        xs, ys = inner_range(self.width), inner_range(self.height)
+        for _ in range(count):
+            for _ in range(PLACEMENT_ATTEMPTS):
+                x = self.rng.randint(*xs)
+                y = self.rng.randint(*ys)
+                if not any(snake.occupies((x, y)) for snake in self.snakes.values()):
+                    break
+            else:
+                pos = self.free_cells.random_free(self.rng)
+                if pos is None:
+                    return
+                x, y = pos
+            moving = self.rng.random() < 0.3
+            self.obstacles.append(Obstacle(x, y, moving, self.rng, self.width, self.height))
+            self.free_cells.occupy((x, y))
+
+    def maintain_foods(self):
+        target_count = 15 if self.multiplayer else 10
+        if self.game_mode == MODE_SURVIVAL:
+            target_count = 20  # Plus de nourriture en mode survie
+
+        while len(self.foods) < target_count:
+            pos = self.free_cells.random_free(self.rng)
+            if pos is None:
+                break
+
+            self.foods.append(PowerUp(pos, roll_fruit_type(self.rng.random())))
+            self.free_cells.occupy(pos)
+
+    def apply_actions(self, actions):
+        for player_num, action in sorted(actions.items()):
+            if player_num not in self.snakes:
+                continue
+            snake = self.get_snake(player_num)
+            # Un snake peut recevoir plusieurs actions avant de bouger : le
+            # demi-tour se juge sur son dernier déplacement
+            if action.direction is not None and is_valid_turn(snake.heading, action.direction):
+                snake.direction = action.direction
+            snake.sprinting = action.sprinting
+            if action.teleport and snake.teleport(self.rng):
+                self.events.append((EVENT_TELEPORT, player_num))
+
+    def move_snake(self, snake, player_num):
+        snake.move()
+        self.events.append((EVENT_MOVE, player_num, snake.body[-1]))
+
+        # Mettre à jour les timers d'effets
+        if snake.ghost_timer > 0:
+            snake.ghost_timer -= 1
+        if snake.speed_boost_timer > 0:
+            snake.speed_boost_timer -= 1
+        if snake.invincible_timer > 0:
+            snake.invincible_timer -= 1
+
+        # Vérifier consommation de nourriture
+        head = snake.body[0]
+        for food in self.foods[:]:
+            if head == food.pos:
+                snake.grow()
+                self.foods.remove(food)
+                self.free_cells.release(food.pos)
+
+                self.scores[player_num] += food.get_points()
+
+                self.events.append((EVENT_EAT, player_num, food.type, head))
+
+                # Effets spéciaux
+                if food.type == FRUIT_SLOW:
+                    self.slow_effect = True
+                    self.slow_timer = max(self.slow_timer, 300)
+                elif food.type == FRUIT_SHRINK:
+                    snake.apply_shrink()
+                elif food.type == FRUIT_GHOST:
+                    snake.ghost_timer = 180
+                elif food.type == FRUIT_SPEED:
+                    snake.speed_boost_timer = 300
+                elif food.type == FRUIT_TELEPORT:
+                    snake.teleport_charges += 3
+                elif food.type == FRUIT_INVINCIBLE:
+                    snake.invincible_timer = 600  # 10 secondes
+
+                # Calculer le niveau sur le total des joueurs
+                new_level = (sum(self.scores.values()) // 15) + 1
+                if new_level > self.level:
+                    self.level = new_level
+                    self.events.append((EVENT_LEVEL_UP, self.level))
+                break
+        else:
+            snake.shrink()
+
+    def check_snake(self, snake, player_num):
+        # Après les déplacements du tick : tous les snakes sont à leur nouvelle place
+        portal_mode = (self.game_mode == MODE_PORTAL)
+        obstacles = self.obstacles if self.game_mode == MODE_OBSTACLES else None
+
+        if snake.check_collision(obstacles, portal_mode):
+            self.events.append((EVENT_COLLISION, player_num, snake.body[0]))
+            return False
+
+        # Collision entre snakes en multijoueur (sauf en coopératif). Deux
+        # têtes arrivées sur la même case au même tick se percutent toutes deux.
+        head = snake.body[0]
+        if self.multiplayer and not self.cooperative_mode:
+            if snake.ghost_timer <= 0 and snake.invincible_timer <= 0:
+                for other in self.players():
+                    if other != player_num and self.get_snake(other).occupies(head):
+                        return False
+
+        return True
+
+    def tick_speed(self, key):
+        # Le monde suit le snake le plus rapide
+        if key == WORLD:
+            return max(self.tick_speed(player_num) for player_num in self.players())
+        snake = self.get_snake(key)
+        return self.get_current_speed(snake, snake.sprinting)
+
+    def next_time(self):
+        return self.scheduler.next_time()
+
+    def step(self, actions=None):
+        self.events = []
+        if actions:
+            self.apply_actions(actions)
+
+        due = self.scheduler.pop_due()
+        if WORLD in due and not self.update_world():
+            return False  # Temps écoulé = victoire
+
+        # Déplacer d'abord tous les snakes dus, puis vérifier leurs collisions
+        movers = [key for key in due if key != WORLD]
+        alive = True
+        with self.profiler.phase("snakes"):
+            for player_num in movers:
+                self.move_snake(self.get_snake(player_num), player_num)
+            for player_num in movers:
+                if not self.check_snake(self.get_snake(player_num), player_num):
+                    alive = False
+
+        for key in due:
+            self.scheduler.schedule(key, TIME_UNIT // self.tick_speed(key))
+        self.tick += 1
+        return alive
+
+    def update_world(self):
+        # Mettre à jour les obstacles mobiles
+        with self.profiler.phase("obstacles"):
+            for obstacle in self.obstacles:
+                old_pos = (obstacle.x, obstacle.y)
+                obstacle.update()
+                if (obstacle.x, obstacle.y) != old_pos:
+                    self.free_cells.release(old_pos)
+                    self.free_cells.occupy((obstacle.x, obstacle.y))
+
+        # Maintenir la nourriture
+        with self.profiler.phase("fruits"):
+            self.maintain_foods()
+
+        # Mettre à jour les timers globaux
+        if self.slow_timer > 0:
+            self.slow_timer -= 1
+            if self.slow_timer == 0:
+                self.slow_effect = False
+
+        # Auto-boost périodique
+        self.auto_boost_timer += 1
+        if self.auto_boost_timer > 1800:  # Toutes les 30 secondes
+            if not self.multiplayer:
+                self.snake1.speed_boost_timer = 180  # 3 secondes
+            self.auto_boost_timer = 0
+
+        # Mode survie
+        if self.game_mode == MODE_SURVIVAL:
+            self.survival_timer -= 1
+            if self.survival_timer <= 0:
+                return False
+        return True
+
+    def state_digest(self):
+        # Empreinte de tout l'état de jeu, pour vérifier qu'une partie rejouée
+        # (replay, score soumis, partie en réseau) est restée identique
+        snakes = []
+        for snake in self.snakes.values():
+            snakes.append((list(snake.body), snake.direction, snake.heading, snake.sprinting,
+                           snake.ghost_timer, snake.speed_boost_timer, snake.invincible_timer,
+                           snake.teleport_charges))
+        state = (
+            self.tick, self.scheduler.getstate(), self.game_mode, self.multiplayer, self.cooperative_mode, snakes,
+            [(food.pos, food.type) for food in self.foods],
+            [(o.x, o.y, o.moving, o.direction, o.move_timer) for o in self.obstacles],
+            *self.scores.values(), self.level, self.slow_effect, self.slow_timer,
+            self.auto_boost_timer, self.survival_timer, self.rng.getstate()
+        )
+        return hashlib.sha1(repr(state).encode()).hexdigest()
+
+    def getstate(self):
+        # État complet en types de base (tuples, entiers, octets) : sert de
+        # keyframe aux replays et se relit sans pickle avec ast.literal_eval
+        snakes = []
+        for snake in self.snakes.values():
+            snakes.append((tuple(snake.body), snake.direction, snake.heading, snake.sprinting,
+                           snake.ghost_timer, snake.speed_boost_timer, snake.invincible_timer,
+                           snake.teleport_charges))
+        return (
+            self.tick, self.scheduler.getstate(), tuple(snakes),
+            tuple((food.pos, food.type) for food in self.foods),
+            tuple((o.x, o.y, o.moving, o.direction, o.move_timer) for o in self.obstacles),
+            tuple(self.scores.values()), self.level, self.slow_effect, self.slow_timer,
+            self.auto_boost_timer, self.survival_timer, self.rng.getstate()
+        )
+
+    def setstate(self, state):
+        (self.tick, scheduler, snakes, foods, obstacles, scores, self.level,
+         self.slow_effect, self.slow_timer, self.auto_boost_timer, self.survival_timer,
+         rng_state) = state
+
+        self.scores = dict(zip(self.snakes, scores))
+        for snake, snake_state in zip(self.snakes.values(), snakes):
+            (body, snake.direction, snake.heading, snake.sprinting, snake.ghost_timer,
+             snake.speed_boost_timer, snake.invincible_timer, snake.teleport_charges) = snake_state
+            snake.body = deque(body)
+            snake.counts = {}
+            for pos in body:
+                snake.counts[pos] = snake.counts.get(pos, 0) + 1
+
+        self.scheduler.setstate(scheduler)
+        self.foods = [PowerUp(pos, fruit_type) for pos, fruit_type in foods]
+        self.obstacles = []
+        for x, y, moving, direction, move_timer in obstacles:
+            obstacle = Obstacle(x, y, moving, self.rng, self.width, self.height)
+            obstacle.direction = direction
+            obstacle.move_timer = move_timer
+            self.obstacles.append(obstacle)
+
+        self.rebuild_free_cells()
+        # Restauré en dernier : Obstacle() vient de consommer des tirages
+        self.rng.setstate(rng_state)
+        self.events = []
+
+    def rebuild_free_cells(self):
+        # L'index ne dépend que du contenu de la grille : recalculé plutôt que
+        # stocké dans chaque keyframe. clear() réalloue la grille (O(surface),
+        # par tranches de tableau), puis O(log surface) par case d'entité
+        self.free_cells.clear()
+        for snake in self.snakes.values():
+            for pos in snake.body:
+                self.free_cells.occupy(pos)
+        for food in self.foods:
+            self.free_cells.occupy(food.pos)
+        for obstacle in self.obstacles:
+            self.free_cells.occupy((obstacle.x, obstacle.y))
+
+    def survival_victory(self):
+        return self.game_mode == MODE_SURVIVAL and self.survival_timer <= 0
+
+    def get_current_speed(self, snake, sprinting):
+        base = self.base_speed + (self.level - 1) * 1.5
+
+        if self.slow_effect:
+            base = max(4, base // 2)
+
+        if snake.speed_boost_timer > 0:
+            base *= 1.5
+
+        if sprinting:
+            base *= self.sprint_multiplier
+
+        return min(int(base), 30)
@@ -4,6 +4,10 @@ import sys
 import json
 import os
 import math
+import argparse
+from free_cells import FreeCellIndex
+from hud_cache import Hud
+from synth import ToneCache
 
 # Initialisation
 pygame.init()
@@ -56,27 +60,30 @@ class PowerUp:
         return points[self.type]
 
 class Snake:
-    def __init__(self):
+    def __init__(self, cells):
         self.body = [(GRID_WIDTH//2, GRID_HEIGHT//2)]
         self.direction = (1, 0)
         self.slow_timer = 0
+        self.cells = cells
+        cells.occupy(self.body[0])
         
     def move(self):
         head = (self.body[0][0] + self.direction[0], self.body[0][1] + self.direction[1])
         self.body.insert(0, head)
+        self.cells.occupy(head)
         
     def grow(self):
         pass
         
     def shrink(self):
         if len(self.body) > 1:
-            self.body.pop()
+            self.cells.release(self.body.pop())
             
     def apply_shrink(self):
         # Réduire de 3 segments
         for _ in range(3):
             if len(self.body) > 1:
-                self.body.pop()
+                self.cells.release(self.body.pop())
         
     def check_collision(self):
         head = self.body[0]
@@ -85,16 +92,22 @@ class Snake:
         return head in self.body[1:]
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Snake Enhanced")
         self.clock = pygame.time.Clock()
-        self.snake = Snake()
+        # Avec une graine fixe, chaque partie se rejoue à l'identique
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+        self.snake = Snake(self.free_cells)
         self.foods = []
         self.score = 0
         self.best_score = self.load_best_score()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        # Textes du HUD mémorisés et légende assemblée une seule fois
+        self.hud = Hud()
         self.sprinting = False
         self.base_speed = 8
         self.sprint_multiplier = 2
@@ -103,33 +116,25 @@ class Game:
         self.level = 1
         self.start_time = pygame.time.get_ticks()
         
-        # Sons (créer des sons simples)
+        # Sons (créer des sons simples, mémorisés sur disque)
+        self.tones = ToneCache()
         self.create_sounds()
         
     def create_sounds(self):
         # Créer des sons basiques avec pygame
         try:
             # Son de manger (fréquence haute courte)
-            self.eat_sound = pygame.mixer.Sound(buffer=self.generate_tone(800, 0.1))
+            self.eat_sound = self.tones.sound([800], 0.1, 4096)
             # Son de power-up (accord)
-            self.powerup_sound = pygame.mixer.Sound(buffer=self.generate_tone(1200, 0.2))
+            self.powerup_sound = self.tones.sound([1200], 0.2, 4096)
             # Son de game over (fréquence descendante)
-            self.gameover_sound = pygame.mixer.Sound(buffer=self.generate_tone(200, 0.5))
+            self.gameover_sound = self.tones.sound([200], 0.5, 4096)
+            self.tones.save()
         except:
             self.eat_sound = None
             self.powerup_sound = None
             self.gameover_sound = None
     
-    def generate_tone(self, frequency, duration):
-        # Générer un ton simple
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = []
-        for i in range(frames):
-            wave = 4096 * math.sin(frequency * 2 * math.pi * i / sample_rate)
-            arr.append([int(wave), int(wave)])
-        return pygame.sndarray.array(arr)
-        
     def load_best_score(self):
         try:
             if os.path.exists('best_score.json'):
@@ -148,21 +153,12 @@ class Game:
             
     def maintain_foods(self):
         while len(self.foods) < 10:
-            occupied = set(self.snake.body) | set([f.pos for f in self.foods])
-            free_positions = []
-            
-            for x in range(GRID_WIDTH):
-                for y in range(GRID_HEIGHT):
-                    if (x, y) not in occupied:
-                        free_positions.append((x, y))
-            
-            if not free_positions:
+            pos = self.free_cells.random_free(self.rng)
+            if pos is None:
                 break
-                
-            pos = random.choice(free_positions)
             
             # Probabilités des types de fruits
-            rand = random.random()
+            rand = self.rng.random()
             if rand < 0.7:  # 70% fruits normaux
                 fruit_type = FRUIT_NORMAL
             elif rand < 0.85:  # 15% fruits bonus
@@ -173,6 +169,7 @@ class Game:
                 fruit_type = FRUIT_SHRINK
                 
             self.foods.append(PowerUp(pos, fruit_type))
+            self.free_cells.occupy(pos)
                 
     def handle_events(self):
         keys = pygame.key.get_pressed()
@@ -208,6 +205,7 @@ class Game:
             if head == food.pos:
                 self.snake.grow()
                 self.foods.remove(food)
+                self.free_cells.release(food.pos)
                 points = food.get_points()
                 self.score += points
                 
@@ -278,9 +276,9 @@ class Game:
         
     def draw_ui(self):
         # Score et meilleur score
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        best_text = self.small_font.render(f"Meilleur: {self.best_score}", True, WHITE)
-        level_text = self.small_font.render(f"Niveau: {self.level}", True, WHITE)
+        score_text = self.hud.render(self.font, f"Score: {self.score}", WHITE)
+        best_text = self.hud.render(self.small_font, f"Meilleur: {self.best_score}", WHITE)
+        level_text = self.hud.render(self.small_font, f"Niveau: {self.level}", WHITE)
         
         self.screen.blit(score_text, (10, 10))
         self.screen.blit(best_text, (10, 50))
@@ -288,33 +286,32 @@ class Game:
         
         # Temps de jeu
         elapsed = (pygame.time.get_ticks() - self.start_time) // 1000
-        time_text = self.small_font.render(f"Temps: {elapsed}s", True, WHITE)
+        time_text = self.hud.render(self.small_font, f"Temps: {elapsed}s", WHITE)
         self.screen.blit(time_text, (10, 100))
         
         # Indicateurs d'état
         y_offset = 130
         if self.sprinting:
-            sprint_text = self.small_font.render("SPRINT!", True, WHITE)
+            sprint_text = self.hud.render(self.small_font, "SPRINT!", WHITE)
             self.screen.blit(sprint_text, (10, y_offset))
             y_offset += 25
             
         if self.slow_effect:
-            slow_text = self.small_font.render("RALENTI", True, GOLD)
+            slow_text = self.hud.render(self.small_font, "RALENTI", GOLD)
             self.screen.blit(slow_text, (10, y_offset))
             y_offset += 25
         
         # Légende des power-ups
-        legend_x = WIDTH - 200
+        self.screen.blit(self.hud.panel('legend', self.legend_lines), (WIDTH - 200, 10))
+        
+    def legend_lines(self):
         legend_texts = [
             ("Rouge: +1 pt", RED),
             ("Bleu: +5 pts", BLUE),
             ("Or: Ralentit", GOLD),
             ("Violet: Réduit", PURPLE)
         ]
-        
-        for i, (text, color) in enumerate(legend_texts):
-            legend_text = self.small_font.render(text, True, color)
-            self.screen.blit(legend_text, (legend_x, 10 + i * 25))
+        return [(self.small_font, text, color, (0, i * 25)) for i, (text, color) in enumerate(legend_texts)]
         
     def game_over(self):
         if self.score > self.best_score:
@@ -364,7 +361,9 @@ class Game:
                 if not self.game_over():
                     break
                 # Redémarrer le jeu
-                self.snake = Snake()
+                self.rng = random.Random(self.seed)
+                self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+                self.snake = Snake(self.free_cells)
                 self.foods = []
                 self.score = 0
                 self.level = 1
@@ -380,5 +379,10 @@ class Game:
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Snake Enhanced")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="graine du générateur aléatoire (parties reproductibles)")
+    args = parser.parse_args()
+    
+    game = Game(seed=args.seed)
     game.run()
\ No newline at end of file
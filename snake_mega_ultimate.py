@@ -1,16 +1,43 @@
 import pygame
 import random
 import sys
-import json
+import argparse
 import os
 import math
 import time
+import glob
+from itertools import islice
+from snake_engine import (
+    SnakeEngine, Action,
+    FRUIT_NORMAL, FRUIT_BONUS, FRUIT_SLOW, FRUIT_SHRINK, FRUIT_GHOST,
+    FRUIT_SPEED, FRUIT_TELEPORT, FRUIT_INVINCIBLE,
+    MODE_CLASSIC, MODE_PORTAL, MODE_OBSTACLES, MODE_SURVIVAL, MODE_COOPERATIVE,
+    EVENT_MOVE, EVENT_EAT, EVENT_LEVEL_UP, EVENT_TELEPORT, EVENT_COLLISION, TIME_UNIT
+)
+from snake_replay import ReplayRecorder, ReplayPlayer, ReplayError
+from sprite_cache import SpriteCache
+from hud_cache import Hud
+from particles import ParticleSystem
+from trails import TrailLayer
+from synth import ToneCache, MusicLoop
+from input_queue import InputQueue
+from stats_store import StatsStore, StatsError, game_score
+from frame_capture import FrameCapture, RECORD_EVERY
+from profiler import FrameProfiler
+from camera import Camera
 
 # Initialisation
 pygame.init()
 pygame.mixer.init()
 
 WIDTH, HEIGHT = 1200, 800
+REPLAY_DIR = "replays"
+REPLAY_SPEEDS = [1, 2, 4, 8, 16, 32, 64]
+DISPLAY_FPS = 60  # Images par seconde, indépendantes de la vitesse du snake
+MAX_FRAME_TIME = 0.25  # Au-delà (fenêtre déplacée, chargement...), l'image compte pour 0.25 s
+MAX_TICKS_PER_FRAME = 8
+FADE_SEGMENTS = 15  # Au-delà, le dégradé du corps est constant (30%)
+ANIMATION_STEPS = 16  # Phases distinctes des tuiles animées (pulsation, scintillement)
 CELL_SIZE = 20
 GRID_WIDTH = WIDTH // CELL_SIZE
 GRID_HEIGHT = HEIGHT // CELL_SIZE
@@ -32,268 +59,128 @@ CYAN = (0, 255, 255)
 PINK = (255, 192, 203)
 YELLOW = (255, 255, 0)
 
-# Types de fruits et power-ups
-FRUIT_NORMAL = 0
-FRUIT_BONUS = 1
-FRUIT_SLOW = 2
-FRUIT_SHRINK = 3
-FRUIT_GHOST = 4
-FRUIT_SPEED = 5
-FRUIT_TELEPORT = 6
-FRUIT_INVINCIBLE = 7
+# Couleurs des fruits par type
+FRUIT_COLORS = {
+    FRUIT_NORMAL: RED,
+    FRUIT_BONUS: BLUE,
+    FRUIT_SLOW: GOLD,
+    FRUIT_SHRINK: PURPLE,
+    FRUIT_GHOST: CYAN,
+    FRUIT_SPEED: ORANGE,
+    FRUIT_TELEPORT: PINK,
+    FRUIT_INVINCIBLE: YELLOW
+}
 
-# Modes de jeu
-MODE_CLASSIC = 0
-MODE_PORTAL = 1
-MODE_OBSTACLES = 2
-MODE_SURVIVAL = 3
-MODE_COOPERATIVE = 4
+# Classements : (titre, mode, joueurs, coopératif)
+LEADERBOARDS = [
+    ("Classique", MODE_CLASSIC, 1, False),
+    ("Portails", MODE_PORTAL, 1, False),
+    ("Obstacles", MODE_OBSTACLES, 1, False),
+    ("Survie", MODE_SURVIVAL, 1, False),
+    ("Compétitif", MODE_CLASSIC, 2, False),
+    ("Coopératif (équipe)", MODE_COOPERATIVE, 2, True)
+]
+LEADERBOARD_SIZE = 10
+PROFILER_REFRESH = 10  # Images entre deux mises à jour de l'overlay F3
+PROFILER_GRAPH_MS = 50  # Hauteur du graphe des temps d'image
+MIN_CELL_SIZE = 4  # Taille d'une case en pixels, zoom compris
 
-class Trail:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.life = 20
-        self.max_life = 20
-        
-    def update(self):
-        self.life -= 1
-        
-    def draw(self, screen):
-        if self.life > 0:
-            alpha = self.life / self.max_life
-            color = tuple(int(c * alpha) for c in self.color)
-            rect = pygame.Rect(self.x * CELL_SIZE + 5, self.y * CELL_SIZE + 5, 
-                             CELL_SIZE - 10, CELL_SIZE - 10)
-            pygame.draw.rect(screen, color, rect)
+def grid_size(text):
+    # "LARGEURxHAUTEUR" -> (largeur, hauteur), pour --grid
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"taille de plateau invalide : {text} (attendu LARGEURxHAUTEUR)")
+    return width, height
 
-class Explosion:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.particles = []
-        for _ in range(20):
-            self.particles.append({
-                'x': x,
-                'y': y,
-                'vx': random.uniform(-5, 5),
-                'vy': random.uniform(-5, 5),
-                'life': 60,
-                'color': random.choice([RED, ORANGE, YELLOW])
-            })
-    
-    def update(self):
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['vx'] *= 0.98
-            particle['vy'] *= 0.98
-            particle['life'] -= 1
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
-    
-    def draw(self, screen):
-        for particle in self.particles:
-            if particle['life'] > 0:
-                alpha = particle['life'] / 60
-                size = int(5 * alpha)
-                if size > 0:
-                    pygame.draw.circle(screen, particle['color'], 
-                                     (int(particle['x']), int(particle['y'])), size)
-
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
-        self.color = color
-        self.life = 30
-        self.max_life = 30
-        
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= 1
-        
-    def draw(self, screen):
-        if self.life > 0:
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 3)
-
-class Obstacle:
-    def __init__(self, x, y, moving=False):
-        self.x = x
-        self.y = y
-        self.moving = moving
-        self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
-        self.move_timer = 0
-        
-    def update(self):
-        if self.moving:
-            self.move_timer += 1
-            if self.move_timer > 60:
-                self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
-                self.move_timer = 0
-                
-            new_x = self.x + self.direction[0]
-            new_y = self.y + self.direction[1]
-            
-            if 0 <= new_x < GRID_WIDTH and 0 <= new_y < GRID_HEIGHT:
-                self.x = new_x
-                self.y = new_y
+def common_cells(cells, counts):
+    # Cases de cells occupées dans counts, en parcourant le plus petit des deux
+    if len(counts) < len(cells):
+        return [pos for pos in counts if pos in cells]
+    return [pos for pos in cells if pos in counts]
 
-class PowerUp:
-    def __init__(self, pos, fruit_type):
-        self.pos = pos
-        self.type = fruit_type
-        self.timer = 0
-        self.animation_timer = 0
-        
-    def get_color(self):
-        colors = {
-            FRUIT_NORMAL: RED,
-            FRUIT_BONUS: BLUE,
-            FRUIT_SLOW: GOLD,
-            FRUIT_SHRINK: PURPLE,
-            FRUIT_GHOST: CYAN,
-            FRUIT_SPEED: ORANGE,
-            FRUIT_TELEPORT: PINK,
-            FRUIT_INVINCIBLE: YELLOW
-        }
-        return colors[self.type]
-        
-    def get_points(self):
-        points = {
-            FRUIT_NORMAL: 1,
-            FRUIT_BONUS: 5,
-            FRUIT_SLOW: 2,
-            FRUIT_SHRINK: 3,
-            FRUIT_GHOST: 4,
-            FRUIT_SPEED: 3,
-            FRUIT_TELEPORT: 6,
-            FRUIT_INVINCIBLE: 8
-        }
-        return points[self.type]
-
-class Snake:
-    def __init__(self, color=GREEN, start_pos=None):
-        if start_pos is None:
-            start_pos = (GRID_WIDTH//2, GRID_HEIGHT//2)
-        self.body = [start_pos]
-        self.direction = (1, 0)
-        self.color = color
-        self.ghost_timer = 0
-        self.speed_boost_timer = 0
-        self.invincible_timer = 0
-        self.teleport_charges = 0
-        self.trail = []
-        
-    def move(self):
-        head = (self.body[0][0] + self.direction[0], self.body[0][1] + self.direction[1])
-        self.body.insert(0, head)
-        
-    def grow(self):
-        pass
-        
-    def shrink(self):
-        if len(self.body) > 1:
-            self.body.pop()
-            
-    def apply_shrink(self):
-        for _ in range(3):
-            if len(self.body) > 1:
-                self.body.pop()
-    
-    def teleport(self):
-        if self.teleport_charges > 0:
-            # Téléporter à une position aléatoire
-            for _ in range(100):  # Essayer 100 fois
-                new_x = random.randint(5, GRID_WIDTH-5)
-                new_y = random.randint(5, GRID_HEIGHT-5)
-                if (new_x, new_y) not in self.body:
-                    self.body[0] = (new_x, new_y)
-                    self.teleport_charges -= 1
-                    return True
-        return False
-        
-    def check_collision(self, obstacles=None, portal_mode=False):
-        head = self.body[0]
-        
-        # Mode portail : téléportation
-        if portal_mode:
-            new_head = list(head)
-            if head[0] < 0:
-                new_head[0] = GRID_WIDTH - 1
-            elif head[0] >= GRID_WIDTH:
-                new_head[0] = 0
-            if head[1] < 0:
-                new_head[1] = GRID_HEIGHT - 1
-            elif head[1] >= GRID_HEIGHT:
-                new_head[1] = 0
-            self.body[0] = tuple(new_head)
-            head = self.body[0]
-        else:
-            # Collision avec les bords (sauf si invincible)
-            if self.invincible_timer <= 0:
-                if head[0] < 0 or head[0] >= GRID_WIDTH or head[1] < 0 or head[1] >= GRID_HEIGHT:
-                    return True
-        
-        # Collision avec soi-même (sauf en mode fantôme ou invincible)
-        if self.ghost_timer <= 0 and self.invincible_timer <= 0 and head in self.body[1:]:
-            return True
-            
-        # Collision avec obstacles (sauf si invincible)
-        if obstacles and self.invincible_timer <= 0:
-            for obstacle in obstacles:
-                if head == (obstacle.x, obstacle.y):
-                    return True
-                    
-        return False
+def is_adjacent(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, dirty_rendering=True, record_every=RECORD_EVERY, trace_path=None,
+                 grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT, cell_size=CELL_SIZE):
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Snake MEGA Ultimate Edition")
         self.clock = pygame.time.Clock()
         
-        # État du jeu
-        self.game_mode = MODE_CLASSIC
-        self.multiplayer = False
-        self.cooperative_mode = False
-        self.snake1 = Snake(GREEN)
-        self.snake2 = Snake(BLUE, (GRID_WIDTH//4, GRID_HEIGHT//2))
-        
-        self.foods = []
-        self.obstacles = []
-        self.particles = []
-        self.trails = []
-        self.explosions = []
-        
-        # Scores et statistiques
-        self.score1 = 0
-        self.score2 = 0
-        self.best_score = self.load_best_score()
-        self.games_played = self.load_stats().get('games_played', 0)
-        self.total_time = self.load_stats().get('total_time', 0)
-        
-        # Mode survie
-        self.survival_time = 120  # 2 minutes
-        self.survival_timer = 0
+        # État du jeu (règles et simulation dans snake_engine)
+        # Avec une graine fixe, chaque partie se rejoue à l'identique
+        self.seed = seed
+        # Dimensions du plateau en cases et taille d'une case en pixels ;
+        # cell_size est celle affichée, zoom compris (voir setup_view)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.base_cell_size = cell_size
+        self.cell_size = cell_size
+        # Partie visible du plateau : seul ce qu'elle montre est dessiné
+        self.camera = Camera((WIDTH, HEIGHT))
+        self.engine = SnakeEngine(seed=seed, width=grid_width, height=grid_height)
+        # Flux aléatoire séparé pour les effets visuels, sans effet sur le gameplay
+        self.fx_rng = random.Random()
+        self.pending_actions = {}
+        # Directions en attente : une par déplacement de chaque snake
+        self.input_queues = {1: InputQueue(), 2: InputQueue()}
+        self.player_colors = {1: GREEN, 2: BLUE}
+        
+        # Replay binaire de la partie en cours (graine + entrées de chaque tick)
+        self.recording = True
+        self.recorder = None
+        
+        # Lecteur de replays
+        self.replay_player = None
+        self.replay_speed = 0  # Indice dans REPLAY_SPEEDS
+        self.replay_paused = False
+        
+        # Pas de temps fixe : la simulation avance de tick en tick selon
+        # l'horloge de chaque snake (engine.scheduler), l'affichage à
+        # DISPLAY_FPS en interpolant la tête et la queue
+        self.sim_time = 0.0  # Temps affiché, en unités TIME_UNIT du moteur
+        self.frame_time = 0.0
+        self.previous_ends = {}  # Joueur -> (tête, queue) avant son dernier déplacement
+        
+        # Captures d'écran et enregistrement vidéo, encodés hors de la boucle de jeu
+        self.capture = FrameCapture(every=record_every)
+        
+        # Temps passé dans chaque phase d'une image (overlay F3)
+        self.profiler = FrameProfiler()
+        self.profiler_panel = None
+        self.profiler_panel_frame = 0
+        self.trace_path = trace_path  # Trace Chrome écrite à la fermeture du jeu
+        if trace_path:
+            self.profiler.start_trace()
+        
+        # Particules des fruits mangés et des explosions
+        self.particles = ParticleSystem()
+        self.trails = None  # Calque créé par setup_view(), à la taille des cases
+        
+        # Statistiques : lues une seule fois, écrites en arrière-plan
+        try:
+            self.stats = StatsStore()
+            summary = self.stats.summary
+        except StatsError as e:
+            print(f"Statistiques désactivées: {e}")
+            self.stats = None
+            summary = {}
+        self.best_score = summary.get('best_score', 0)
+        self.games_played = summary.get('games_played', 0)
+        self.total_time = summary.get('total_time', 0)
+        self.fruit_counts = [0] * len(FRUIT_COLORS)  # Fruits mangés par type pendant la partie
         
         # Interface
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
         self.big_font = pygame.font.Font(None, 48)
+        self.profiler_font = pygame.font.Font(None, 20)
         
         # Effets et timers
         self.sprinting1 = False
         self.sprinting2 = False
-        self.base_speed = 8
-        self.sprint_multiplier = 2
-        self.slow_effect = False
-        self.slow_timer = 0
-        self.level = 1
         self.start_time = pygame.time.get_ticks()
         
         # Nouvelles fonctionnalités
@@ -302,9 +189,6 @@ class Game:
         self.zoom_level = 1.0
         self.volume = 0.5
         self.show_trails = True
-        self.auto_boost_timer = 0
-        self.replay_data = []
-        self.recording = True
         
         # Menu
         self.in_menu = True
@@ -316,10 +200,23 @@ class Game:
             "Mode Survie",
             "Multijoueur Compétitif",
             "Multijoueur Coopératif",
+            "Classements",
+            "Replays",
             "Options",
             "Quitter"
         ]
         
+        # Classements, lus seulement à l'ouverture de l'écran
+        self.in_leaderboard = False
+        self.leaderboard_selection = 0
+        self.leaderboards = {}  # Indice dans LEADERBOARDS -> meilleurs scores
+        self.last_scores = {}  # Indice dans LEADERBOARDS -> score de la dernière partie
+        
+        # Menu replays
+        self.in_replay_menu = False
+        self.replay_selection = 0
+        self.replay_files = []
+        
         # Menu options
         self.in_options = False
         self.options_selection = 0
@@ -339,28 +236,49 @@ class Game:
             {"bg": (20, 20, 20), "grid": (40, 40, 40)}
         ]
         
-        # Musique de fond
+        # Musique de fond : une note toutes les 2 secondes, pré-rendue en boucle
         self.music_notes = [440, 494, 523, 587, 659, 698, 784]  # Gamme de Do
-        self.music_timer = 0
-        self.current_note = 0
-        
+        self.music = None
+        
+        # Rendu par rectangles modifiés : plateau persistant, seules les cases
+        # qui changent sont repeintes puis envoyées à l'écran
+        self.dirty_rendering = dirty_rendering
+        self.board_surface = pygame.Surface((WIDTH, HEIGHT))
+        # Tuiles pré-rendues des cases du plateau
+        self.sprites = SpriteCache()
+        # Textes du HUD mémorisés et panneaux fixes
+        self.hud = Hud()
+        self.board_state = None
+        self.board_valid = False
+        self.overlay_rects = []
+        self.display_rects = None
+        
+        # Sons synthétisés, mémorisés sur disque entre deux lancements
+        self.tones = ToneCache()
+        try:
+            self.music = MusicLoop(self.tones, self.music_notes, 0.5, 2.0, 2048)
+        except Exception:
+            self.music = None
         self.create_sounds()
-        self.create_background_pattern()
+        self.setup_view()
         
     def create_sounds(self):
         try:
-            self.eat_sound = pygame.mixer.Sound(buffer=self.generate_tone(800, 0.1))
-            self.powerup_sound = pygame.mixer.Sound(buffer=self.generate_tone(1200, 0.2))
-            self.gameover_sound = pygame.mixer.Sound(buffer=self.generate_tone(200, 0.5))
-            self.level_up_sound = pygame.mixer.Sound(buffer=self.generate_chord([440, 554, 659], 0.3))
-            self.teleport_sound = pygame.mixer.Sound(buffer=self.generate_tone(1500, 0.15))
-            self.pause_sound = pygame.mixer.Sound(buffer=self.generate_tone(600, 0.1))
+            self.eat_sound = self.tones.sound([800], 0.1, 2048)
+            self.powerup_sound = self.tones.sound([1200], 0.2, 2048)
+            self.gameover_sound = self.tones.sound([200], 0.5, 2048)
+            self.level_up_sound = self.tones.sound([440, 554, 659], 0.3, 1024)
+            self.teleport_sound = self.tones.sound([1500], 0.15, 2048)
+            self.pause_sound = self.tones.sound([600], 0.1, 2048)
+            self.tones.save()
             
             # Ajuster le volume
             for sound in [self.eat_sound, self.powerup_sound, self.gameover_sound, 
                          self.level_up_sound, self.teleport_sound, self.pause_sound]:
                 if sound:
                     sound.set_volume(self.volume)
+            if self.music:
+                self.music.set_volume(self.volume * 0.3)  # Plus faible que les effets
         except:
             self.eat_sound = None
             self.powerup_sound = None
@@ -369,142 +287,93 @@ class Game:
             self.teleport_sound = None
             self.pause_sound = None
     
-    def generate_tone(self, frequency, duration):
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = []
-        for i in range(frames):
-            wave = 2048 * math.sin(frequency * 2 * math.pi * i / sample_rate)
-            arr.append([int(wave), int(wave)])
-        return pygame.sndarray.array(arr)
-        
-    def generate_chord(self, frequencies, duration):
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = []
-        for i in range(frames):
-            wave = 0
-            for freq in frequencies:
-                wave += 1024 * math.sin(freq * 2 * math.pi * i / sample_rate)
-            arr.append([int(wave), int(wave)])
-        return pygame.sndarray.array(arr)
-        
     def play_background_music(self):
-        self.music_timer += 1
-        if self.music_timer > 120:  # Nouvelle note toutes les 2 secondes
-            try:
-                note_sound = pygame.mixer.Sound(buffer=self.generate_tone(
-                    self.music_notes[self.current_note], 0.5))
-                note_sound.set_volume(self.volume * 0.3)  # Plus faible que les effets
-                note_sound.play()
-                self.current_note = (self.current_note + 1) % len(self.music_notes)
-                self.music_timer = 0
-            except:
-                pass
+        # La boucle tourne dans le mixer : rien à synthétiser ici
+        if self.music:
+            self.music.play()
+            
+    def pause_background_music(self):
+        if self.music:
+            self.music.pause()
         
     def create_background_pattern(self):
         self.bg_surface = pygame.Surface((WIDTH, HEIGHT))
         bg_color = self.themes[self.theme]["bg"]
+        # Hors du plateau (plus petit que la fenêtre) : couleur de grille assombrie
+        outside_color = tuple(c // 3 for c in self.themes[self.theme]["grid"])
         if self.night_mode:
             bg_color = tuple(255 - c for c in bg_color)
-        self.bg_surface.fill(bg_color)
+            outside_color = tuple(255 - c for c in outside_color)
+        self.bg_surface.fill(outside_color)
+        self.bg_surface.fill(bg_color, (0, 0, self.engine.width * self.cell_size, self.engine.height * self.cell_size))
+        self.board_valid = False
+        self.sprites.clear()
+        self.hud.clear()
             
-    def load_best_score(self):
-        try:
-            if os.path.exists('game_data.json'):
-                with open('game_data.json', 'r') as f:
-                    return json.load(f).get('best_score', 0)
-        except:
-            pass
-        return 0
-        
-    def load_stats(self):
-        try:
-            if os.path.exists('game_data.json'):
-                with open('game_data.json', 'r') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+    def setup_view(self):
+        # Caméra, calque des traînées et fond pour le plateau et le zoom en
+        # cours ; rien à refaire si ni l'un ni l'autre n'a changé
+        cell_size = max(MIN_CELL_SIZE, round(self.base_cell_size * self.zoom_level))
+        world_size = (self.engine.width, self.engine.height)
+        if self.trails and (world_size, cell_size) == (self.camera.world_size, self.cell_size):
+            return
+        self.cell_size = cell_size
+        self.camera.configure(world_size, cell_size)
+        self.trails = TrailLayer((WIDTH, HEIGHT), cell_size, inset=cell_size // 4)
+        self.particles.clear()
+        self.create_background_pattern()
         
-    def save_game_data(self):
-        try:
-            data = {
-                'best_score': self.best_score,
-                'games_played': self.games_played,
-                'total_time': self.total_time,
-                'volume': self.volume,
-                'show_trails': self.show_trails,
-                'night_mode': self.night_mode
-            }
-            with open('game_data.json', 'w') as f:
-                json.dump(data, f)
-        except:
-            pass
+    def update_camera(self):
+        # Suivre les têtes. Après un défilement, le plateau déjà peint est
+        # décalé d'autant : renvoie les cases découvertes, à repeindre (None
+        # si la caméra n'a pas bougé)
+        origin = self.camera.origin
+        if not self.camera.follow([snake.body[0] for player_num, snake, color in self.game_snakes()]):
+            return None
+        self.trails.set_origin(self.camera.origin)
+        self.board_surface.scroll((origin[0] - self.camera.origin[0]) * self.cell_size,
+                                  (origin[1] - self.camera.origin[1]) * self.cell_size)
+        return self.camera.exposed_cells(origin)
+        
+    def cell_position(self, x, y):
+        # Coin d'une case du plateau à l'écran
+        return ((x - self.camera.origin[0]) * self.cell_size, (y - self.camera.origin[1]) * self.cell_size)
+        
+    def save_game_stats(self, duration):
+        if not self.stats:
+            return
+        self.stats.record_game(self.engine.game_mode, 2 if self.engine.multiplayer else 1,
+                               self.engine.cooperative_mode, self.engine.score1, self.engine.score2,
+                               self.engine.level, duration, self.engine.tick, self.engine.seed,
+                               self.fruit_counts)
+        self.stats.save_settings({
+            'volume': self.volume,
+            'show_trails': self.show_trails,
+            'night_mode': self.night_mode
+        })
     
     def save_screenshot(self):
+        # Copie l'image et rend la main : l'encodage PNG se fait en arrière-plan
+        timestamp = int(time.time())
+        return self.capture.screenshot(self.screen, f"snake_screenshot_{timestamp}.png")
+        
+    def save_trace(self):
         try:
-            timestamp = int(time.time())
-            filename = f"snake_screenshot_{timestamp}.png"
-            pygame.image.save(self.screen, filename)
-            return filename
-        except:
-            return None
-            
-    def create_obstacles(self, count=5):
-        self.obstacles = []
-        for _ in range(count):
-            while True:
-                x = random.randint(5, GRID_WIDTH-5)
-                y = random.randint(5, GRID_HEIGHT-5)
-                if (x, y) not in self.snake1.body and (not self.multiplayer or (x, y) not in self.snake2.body):
-                    moving = random.random() < 0.3
-                    self.obstacles.append(Obstacle(x, y, moving))
-                    break
-                    
-    def maintain_foods(self):
-        target_count = 15 if self.multiplayer else 10
-        if self.game_mode == MODE_SURVIVAL:
-            target_count = 20  # Plus de nourriture en mode survie
-            
-        while len(self.foods) < target_count:
-            occupied = set(self.snake1.body)
-            if self.multiplayer:
-                occupied |= set(self.snake2.body)
-            occupied |= set([f.pos for f in self.foods])
-            occupied |= set([(o.x, o.y) for o in self.obstacles])
-            
-            free_positions = []
-            for x in range(GRID_WIDTH):
-                for y in range(GRID_HEIGHT):
-                    if (x, y) not in occupied:
-                        free_positions.append((x, y))
-            
-            if not free_positions:
-                break
-                
-            pos = random.choice(free_positions)
-            
-            # Probabilités étendues avec nouveaux fruits
-            rand = random.random()
-            if rand < 0.4:  # 40% fruits normaux
-                fruit_type = FRUIT_NORMAL
-            elif rand < 0.55:  # 15% fruits bonus
-                fruit_type = FRUIT_BONUS
-            elif rand < 0.68:  # 13% fruits slow
-                fruit_type = FRUIT_SLOW
-            elif rand < 0.78:  # 10% fruits shrink
-                fruit_type = FRUIT_SHRINK
-            elif rand < 0.86:  # 8% fruits ghost
-                fruit_type = FRUIT_GHOST
-            elif rand < 0.92:  # 6% fruits speed
-                fruit_type = FRUIT_SPEED
-            elif rand < 0.97:  # 5% fruits teleport
-                fruit_type = FRUIT_TELEPORT
-            else:  # 3% fruits invincible
-                fruit_type = FRUIT_INVINCIBLE
-                
-            self.foods.append(PowerUp(pos, fruit_type))
+            count = self.profiler.save_trace(self.trace_path)
+            print(f"Trace enregistrée: {self.trace_path} ({count} événements)")
+        except OSError as e:
+            print(f"Trace non enregistrée: {e}")
+        
+    def toggle_video(self):
+        if self.capture.recording:
+            directory, saved, dropped = self.capture.stop_recording()
+            print(f"Enregistrement terminé: {saved} images dans {directory} ({dropped} abandonnées)")
+        else:
+            try:
+                directory = self.capture.start_recording()
+                print(f"Enregistrement vidéo: {directory}")
+            except OSError as e:
+                print(f"Enregistrement impossible: {e}")
             
     def handle_menu_events(self):
         for event in pygame.event.get():
@@ -513,6 +382,12 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if self.in_options:
                     return self.handle_options_events(event)
+                if self.in_replay_menu:
+                    self.handle_replay_menu_events(event)
+                    continue
+                if self.in_leaderboard:
+                    self.handle_leaderboard_events(event)
+                    continue
                     
                 if event.key == pygame.K_UP:
                     self.menu_selection = (self.menu_selection - 1) % len(self.menu_options)
@@ -531,9 +406,13 @@ class Game:
                         self.start_game(MODE_CLASSIC, True, False)
                     elif self.menu_selection == 5:  # Multijoueur Coopératif
                         self.start_game(MODE_COOPERATIVE, True, True)
-                    elif self.menu_selection == 6:  # Options
+                    elif self.menu_selection == 6:  # Classements
+                        self.in_leaderboard = True
+                    elif self.menu_selection == 7:  # Replays
+                        self.open_replay_menu()
+                    elif self.menu_selection == 8:  # Options
                         self.in_options = True
-                    elif self.menu_selection == 7:  # Quitter
+                    elif self.menu_selection == 9:  # Quitter
                         return False
                 elif event.key == pygame.K_t:  # Changer de thème
                     self.theme = (self.theme + 1) % len(self.themes)
@@ -566,34 +445,129 @@ class Game:
             self.in_options = False
         return True
         
+    def handle_leaderboard_events(self, event):
+        if event.key == pygame.K_ESCAPE:
+            self.in_leaderboard = False
+        elif event.key == pygame.K_LEFT:
+            self.leaderboard_selection = (self.leaderboard_selection - 1) % len(LEADERBOARDS)
+        elif event.key == pygame.K_RIGHT:
+            self.leaderboard_selection = (self.leaderboard_selection + 1) % len(LEADERBOARDS)
+            
+    def leaderboard_index(self):
+        # Classement de la partie en cours (None si la combinaison n'en a pas)
+        key = (self.engine.game_mode, 2 if self.engine.multiplayer else 1, self.engine.cooperative_mode)
+        for i, (_, mode, players, cooperative) in enumerate(LEADERBOARDS):
+            if (mode, players, cooperative) == key:
+                return i
+        return None
+        
+    def load_leaderboard(self, index):
+        # Meilleurs scores et rang de la dernière partie, lus une fois par écran
+        if index in self.leaderboards:
+            return self.leaderboards[index]
+        board = {'top': [], 'rank': None}
+        if self.stats:
+            _, mode, players, cooperative = LEADERBOARDS[index]
+            try:
+                board['top'] = self.stats.top_scores(mode, players, cooperative, LEADERBOARD_SIZE)
+                if index in self.last_scores:
+                    board['rank'] = self.stats.rank(mode, players, cooperative, self.last_scores[index])
+            except StatsError as e:
+                print(f"Classement indisponible: {e}")
+        self.leaderboards[index] = board
+        return board
+        
+    def open_replay_menu(self):
+        # Replays les plus récents en premier
+        files = glob.glob(os.path.join(REPLAY_DIR, "*.snkr"))
+        files.sort(key=os.path.getmtime, reverse=True)
+        self.replay_files = files[:10]
+        self.replay_selection = 0
+        self.in_replay_menu = True
+        
+    def handle_replay_menu_events(self, event):
+        if event.key == pygame.K_ESCAPE:
+            self.in_replay_menu = False
+        elif not self.replay_files:
+            return
+        elif event.key == pygame.K_UP:
+            self.replay_selection = (self.replay_selection - 1) % len(self.replay_files)
+        elif event.key == pygame.K_DOWN:
+            self.replay_selection = (self.replay_selection + 1) % len(self.replay_files)
+        elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
+            self.start_replay(self.replay_files[self.replay_selection])
+            
+    def start_replay(self, path):
+        try:
+            self.replay_player = ReplayPlayer(path)
+        except (OSError, ValueError, ReplayError) as e:
+            print(f"Replay illisible: {e}")
+            return
+        self.engine = self.replay_player.engine
+        self.engine.profiler = self.profiler
+        self.in_menu = False
+        self.in_replay_menu = False
+        self.replay_speed = 0
+        self.replay_paused = False
+        self.clear_effects()
+        
+    def stop_replay(self):
+        self.replay_player.close()
+        self.replay_player = None
+        self.in_menu = True
+        self.in_replay_menu = True
+        
+    def seek_replay(self, tick):
+        # Saut instantané : le lecteur repart de la keyframe la plus proche
+        self.replay_player.seek(tick)
+        self.replay_jumped()
+        
+    def skip_replay(self, seconds):
+        # Saut en temps de jeu : la durée d'un tick dépend de la vitesse
+        player = self.replay_player
+        player.seek_time(player.engine.scheduler.time + seconds * TIME_UNIT)
+        self.replay_jumped()
+        
+    def replay_jumped(self):
+        self.engine = self.replay_player.engine
+        self.engine.profiler = self.profiler
+        self.clear_effects()
+        
+    def clear_effects(self):
+        self.setup_view()
+        self.particles.clear()
+        self.trails.clear()
+        self.update_camera()
+        self.previous_ends = {}
+        self.sim_time = self.engine.scheduler.time
+        self.board_valid = False
+        
     def start_game(self, mode, multiplayer, cooperative):
-        self.game_mode = mode
-        self.multiplayer = multiplayer
-        self.cooperative_mode = cooperative
         self.in_menu = False
         
         # Réinitialiser le jeu
-        self.snake1 = Snake(GREEN)
-        if multiplayer:
-            self.snake2 = Snake(BLUE, (GRID_WIDTH//4, GRID_HEIGHT//2))
-        
-        self.foods = []
-        self.obstacles = []
-        self.particles = []
-        self.trails = []
-        self.explosions = []
-        self.score1 = 0
-        self.score2 = 0
-        self.level = 1
+        self.engine = SnakeEngine(mode, multiplayer, cooperative, self.seed, self.grid_width, self.grid_height)
+        self.engine.profiler = self.profiler
+        self.fx_rng = random.Random(self.engine.seed + 1)
+        self.pending_actions = {}
+        for queue in self.input_queues.values():
+            queue.clear()
+        self.stop_recording()
+        if self.recording:
+            path = os.path.join(REPLAY_DIR, f"replay_{int(time.time())}_{self.engine.seed}.snkr")
+            try:
+                self.recorder = ReplayRecorder(path, self.engine)
+            except (OSError, ReplayError):
+                self.recorder = None
+        self.clear_effects()
+        self.fruit_counts = [0] * len(FRUIT_COLORS)
+        if self.music:
+            self.music.stop()
         self.start_time = pygame.time.get_ticks()
         self.paused = False
-        self.replay_data = []
-        self.recording = True
-        
-        if mode == MODE_OBSTACLES:
-            self.create_obstacles()
-        elif mode == MODE_SURVIVAL:
-            self.survival_timer = self.survival_time * 60  # Convertir en frames
+        # Repartir d'une image vierge, sans le temps passé dans le menu
+        self.clock.tick()
+        self.frame_time = 0.0
             
     def handle_game_events(self):
         keys = pygame.key.get_pressed()
@@ -602,7 +576,7 @@ class Game:
         self.sprinting1 = keys[pygame.K_SPACE]
         
         # Contrôles Joueur 2 (si multijoueur)
-        if self.multiplayer:
+        if self.engine.multiplayer:
             self.sprinting2 = keys[pygame.K_RSHIFT]
         
         for event in pygame.event.get():
@@ -611,242 +585,252 @@ class Game:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.in_menu = True
+                    self.pause_background_music()
                     return True
                 elif event.key == pygame.K_p:  # Pause
                     self.paused = not self.paused
+                    if self.paused:
+                        self.pause_background_music()
                     if self.pause_sound:
                         self.pause_sound.play()
+                elif event.key == pygame.K_F3:  # Profileur
+                    self.profiler.toggle()
+                    self.profiler_panel = None
                 elif event.key == pygame.K_n:  # Mode nuit
                     self.night_mode = not self.night_mode
                     self.create_background_pattern()
-                elif event.key == pygame.K_s and keys[pygame.K_LCTRL]:  # Screenshot
+                elif event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL:  # Screenshot
                     filename = self.save_screenshot()
-                    if filename:
-                        print(f"Screenshot sauvé: {filename}")
-                elif event.key == pygame.K_t and not self.multiplayer:  # Téléportation
-                    if self.snake1.teleport():
-                        if self.teleport_sound:
-                            self.teleport_sound.play()
+                    print(f"Screenshot sauvé: {filename}")
+                elif event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:  # Enregistrement vidéo
+                    self.toggle_video()
+                elif event.key == pygame.K_t and not self.engine.multiplayer:  # Téléportation
+                    self.queue_teleport(1)
                     
                 # Contrôles Joueur 1 (flèches)
-                if event.key == pygame.K_UP and self.snake1.direction != (0, 1):
-                    self.snake1.direction = (0, -1)
-                elif event.key == pygame.K_DOWN and self.snake1.direction != (0, -1):
-                    self.snake1.direction = (0, 1)
-                elif event.key == pygame.K_LEFT and self.snake1.direction != (1, 0):
-                    self.snake1.direction = (-1, 0)
-                elif event.key == pygame.K_RIGHT and self.snake1.direction != (-1, 0):
-                    self.snake1.direction = (1, 0)
+                if event.key == pygame.K_UP:
+                    self.queue_direction(1, (0, -1))
+                elif event.key == pygame.K_DOWN:
+                    self.queue_direction(1, (0, 1))
+                elif event.key == pygame.K_LEFT:
+                    self.queue_direction(1, (-1, 0))
+                elif event.key == pygame.K_RIGHT:
+                    self.queue_direction(1, (1, 0))
                     
-                # Contrôles Joueur 2 (WASD)
-                if self.multiplayer:
-                    if event.key == pygame.K_w and self.snake2.direction != (0, 1):
-                        self.snake2.direction = (0, -1)
-                    elif event.key == pygame.K_s and self.snake2.direction != (0, -1):
-                        self.snake2.direction = (0, 1)
-                    elif event.key == pygame.K_a and self.snake2.direction != (1, 0):
-                        self.snake2.direction = (-1, 0)
-                    elif event.key == pygame.K_d and self.snake2.direction != (-1, 0):
-                        self.snake2.direction = (1, 0)
+                # Contrôles Joueur 2 (WASD), sauf Ctrl+S réservé à la capture
+                if self.engine.multiplayer and not event.mod & pygame.KMOD_CTRL:
+                    if event.key == pygame.K_w:
+                        self.queue_direction(2, (0, -1))
+                    elif event.key == pygame.K_s:
+                        self.queue_direction(2, (0, 1))
+                    elif event.key == pygame.K_a:
+                        self.queue_direction(2, (-1, 0))
+                    elif event.key == pygame.K_d:
+                        self.queue_direction(2, (1, 0))
                     elif event.key == pygame.K_LSHIFT:  # Téléportation J2
-                        if self.snake2.teleport():
-                            if self.teleport_sound:
-                                self.teleport_sound.play()
+                        self.queue_teleport(2)
+        return True
+    
+    def handle_replay_events(self):
+        player = self.replay_player
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.stop_replay()
+                    return True
+                elif event.key == pygame.K_SPACE or event.key == pygame.K_p:
+                    self.replay_paused = not self.replay_paused
+                elif event.key == pygame.K_UP:
+                    self.replay_speed = min(self.replay_speed + 1, len(REPLAY_SPEEDS) - 1)
+                elif event.key == pygame.K_DOWN:
+                    self.replay_speed = max(self.replay_speed - 1, 0)
+                elif event.key == pygame.K_LEFT:  # -10 secondes de jeu
+                    self.skip_replay(-10)
+                elif event.key == pygame.K_RIGHT:  # +10 secondes de jeu
+                    self.skip_replay(10)
+                elif event.key == pygame.K_PAGEDOWN:  # -1 minute de jeu
+                    self.skip_replay(-60)
+                elif event.key == pygame.K_PAGEUP:  # +1 minute de jeu
+                    self.skip_replay(60)
+                elif event.key == pygame.K_HOME:
+                    self.seek_replay(0)
+                elif event.key == pygame.K_END:
+                    self.seek_replay(len(player))
+                elif event.key == pygame.K_F3:  # Profileur
+                    self.profiler.toggle()
+                    self.profiler_panel = None
+                elif event.key == pygame.K_n:  # Mode nuit
+                    self.night_mode = not self.night_mode
+                    self.create_background_pattern()
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                # Clic sur la barre de progression : aller à ce tick
+                bar = self.replay_bar_rect()
+                if bar.inflate(0, 16).collidepoint(event.pos):
+                    ratio = (event.pos[0] - bar.x) / bar.width
+                    self.seek_replay(int(ratio * len(player)))
         return True
         
-    def update_snake(self, snake, player_num):
+    def update_replay(self):
+        # Renvoie le nombre d'images par seconde à viser
+        self.update_effects()
+        player = self.replay_player
+        if self.replay_paused or player.finished:
+            return DISPLAY_FPS
+        
+        # Les ticks tombent aux mêmes instants que pendant la partie enregistrée
+        self.sim_time += TIME_UNIT * REPLAY_SPEEDS[self.replay_speed] / DISPLAY_FPS
+        stepped = False
+        while not player.finished and self.engine.next_time() <= self.sim_time:
+            self.trails.update()
+            ends = self.snake_ends()
+            player.step()
+            self.remember_ends(ends)
+            stepped = True
+        if stepped:
+            self.handle_engine_events()
+        return DISPLAY_FPS
+        
+    def advance_game(self, dt):
+        # Une image de dt secondes : tous les ticks dus d'ici là, dans l'ordre
+        # du planificateur du moteur. Renvoie False à la fin de la partie.
+        self.update_effects()
         if self.paused:
             return True
+        
+        self.sim_time += dt * TIME_UNIT
+        steps = 0
+        while self.engine.next_time() <= self.sim_time:
+            with self.profiler.phase("tick"):
+                alive = self.update_game()
+            if not alive:
+                return False
+            steps += 1
+            if steps == MAX_TICKS_PER_FRAME:
+                # Trop de retard : abandonner le temps restant plutôt que d'accélérer
+                self.sim_time = min(self.sim_time, self.engine.next_time())
+                break
+        return True
+        
+    def snake_ends(self):
+        return {player_num: (snake.body[0], snake.body[-1])
+                for player_num, snake, color in self.game_snakes()}
+        
+    def remember_ends(self, ends):
+        # Les snakes qui viennent de bouger partent de leurs anciennes extrémités
+        for event in self.engine.events:
+            if event[0] == EVENT_MOVE:
+                self.previous_ends[event[1]] = ends[event[1]]
+        
+    def queue_direction(self, player_num, direction):
+        # Jouée au prochain déplacement de ce snake libre dans la file
+        snake = self.engine.get_snake(player_num)
+        self.input_queues[player_num].push(direction, snake.direction, time.perf_counter())
             
-        snake.move()
-        
-        # Ajouter traînée
-        if self.show_trails and len(snake.body) > 1:
-            tail = snake.body[-1]
-            self.trails.append(Trail(tail[0], tail[1], snake.color))
-        
-        # Mettre à jour les timers d'effets
-        if snake.ghost_timer > 0:
-            snake.ghost_timer -= 1
-        if snake.speed_boost_timer > 0:
-            snake.speed_boost_timer -= 1
-        if snake.invincible_timer > 0:
-            snake.invincible_timer -= 1
-        
-        # Enregistrer pour replay
-        if self.recording:
-            self.replay_data.append({
-                'time': pygame.time.get_ticks(),
-                'snake': player_num,
-                'pos': snake.body[0],
-                'direction': snake.direction
-            })
-        
-        # Vérifier consommation de nourriture
-        head = snake.body[0]
-        for food in self.foods[:]:
-            if head == food.pos:
-                snake.grow()
-                self.foods.remove(food)
-                points = food.get_points()
-                
-                if player_num == 1:
-                    self.score1 += points
-                else:
-                    self.score2 += points
+    def queue_teleport(self, player_num):
+        self.pending_actions.setdefault(player_num, Action()).teleport = True
+        
+    def handle_engine_events(self):
+        if self.profiler.trace is not None:
+            self.trace_engine_events()
+        for event in self.engine.events:
+            kind = event[0]
+            if kind == EVENT_MOVE:
+                # Ajouter traînée
+                player_num, tail = event[1], event[2]
+                if self.show_trails and len(self.engine.get_snake(player_num).body) > 1:
+                    self.trails.add(player_num, tail, self.player_colors[player_num])
+            elif kind == EVENT_EAT:
+                fruit_type, head = event[2], event[3]
+                self.fruit_counts[fruit_type] += 1
                 
                 # Créer des particules
-                for _ in range(15):
-                    self.particles.append(Particle(
-                        head[0] * CELL_SIZE + CELL_SIZE//2,
-                        head[1] * CELL_SIZE + CELL_SIZE//2,
-                        food.get_color()
-                    ))
+                self.particles.emit(
+                    head[0] * self.cell_size + self.cell_size//2,
+                    head[1] * self.cell_size + self.cell_size//2,
+                    15, 2, 30, FRUIT_COLORS[fruit_type], self.fx_rng
+                )
                 
-                # Effets spéciaux
-                if food.type == FRUIT_BONUS:
-                    if self.powerup_sound:
-                        self.powerup_sound.play()
-                elif food.type == FRUIT_SLOW:
-                    self.slow_effect = True
-                    self.slow_timer = max(self.slow_timer, 300)
-                    if self.powerup_sound:
-                        self.powerup_sound.play()
-                elif food.type == FRUIT_SHRINK:
-                    snake.apply_shrink()
-                    if self.powerup_sound:
-                        self.powerup_sound.play()
-                elif food.type == FRUIT_GHOST:
-                    snake.ghost_timer = 180
-                    if self.powerup_sound:
-                        self.powerup_sound.play()
-                elif food.type == FRUIT_SPEED:
-                    snake.speed_boost_timer = 300
-                    if self.powerup_sound:
-                        self.powerup_sound.play()
-                elif food.type == FRUIT_TELEPORT:
-                    snake.teleport_charges += 3
-                    if self.teleport_sound:
-                        self.teleport_sound.play()
-                elif food.type == FRUIT_INVINCIBLE:
-                    snake.invincible_timer = 600  # 10 secondes
-                    if self.powerup_sound:
-                        self.powerup_sound.play()
+                if fruit_type == FRUIT_NORMAL:
+                    sound = self.eat_sound
+                elif fruit_type == FRUIT_TELEPORT:
+                    sound = self.teleport_sound
                 else:
-                    if self.eat_sound:
-                        self.eat_sound.play()
-                
-                # Calculer le niveau
-                if self.cooperative_mode:
-                    total_score = self.score1 + self.score2
-                else:
-                    total_score = self.score1 + (self.score2 if self.multiplayer else 0)
-                    
-                new_level = (total_score // 15) + 1
-                if new_level > self.level:
-                    self.level = new_level
-                    if self.level_up_sound:
-                        self.level_up_sound.play()
-                break
-        else:
-            snake.shrink()
-            
-        # Vérifier collisions
-        portal_mode = (self.game_mode == MODE_PORTAL)
-        obstacles = self.obstacles if self.game_mode == MODE_OBSTACLES else None
-        
-        if snake.check_collision(obstacles, portal_mode):
-            # Créer explosion
-            head = snake.body[0]
-            self.explosions.append(Explosion(
-                head[0] * CELL_SIZE + CELL_SIZE//2,
-                head[1] * CELL_SIZE + CELL_SIZE//2
-            ))
-            return False
-            
-        # Collision entre snakes en multijoueur (sauf en coopératif)
-        if self.multiplayer and not self.cooperative_mode:
-            other_snake = self.snake2 if player_num == 1 else self.snake1
-            if (snake.ghost_timer <= 0 and snake.invincible_timer <= 0 and 
-                head in other_snake.body):
-                return False
+                    sound = self.powerup_sound
+                if sound:
+                    sound.play()
+            elif kind == EVENT_LEVEL_UP:
+                if self.level_up_sound:
+                    self.level_up_sound.play()
+            elif kind == EVENT_TELEPORT:
+                if self.teleport_sound:
+                    self.teleport_sound.play()
+            elif kind == EVENT_COLLISION:
+                # Créer explosion : particules plus rapides, freinées, qui rétrécissent
+                head = event[2]
+                self.particles.emit(
+                    head[0] * self.cell_size + self.cell_size//2,
+                    head[1] * self.cell_size + self.cell_size//2,
+                    20, 5, 60, [RED, ORANGE, YELLOW], self.fx_rng,
+                    damping=0.98, radius=5, shrink=True
+                )
+        
+    def trace_engine_events(self):
+        # Événements ponctuels de la trace (--trace), au tick qui les a produits
+        tick = self.engine.tick
+        for event in self.engine.events:
+            kind = event[0]
+            if kind == EVENT_EAT:
+                name = "fruit" if event[2] == FRUIT_NORMAL else "power-up"
+                self.profiler.instant(name, {"tick": tick, "joueur": event[1], "type": event[2]})
+            elif kind == EVENT_COLLISION:
+                self.profiler.instant("collision", {"tick": tick, "joueur": event[1]})
+            elif kind == EVENT_LEVEL_UP:
+                self.profiler.instant("niveau", {"tick": tick, "niveau": event[1]})
+            elif kind == EVENT_TELEPORT:
+                self.profiler.instant("téléportation", {"tick": tick, "joueur": event[1]})
+        
+    def update_effects(self):
+        # Mettre à jour les particules (à chaque image)
+        with self.profiler.phase("particules"):
+            self.particles.update()
                 
-        return True
-        
     def update_game(self):
+        # Un tick de simulation
         if self.paused:
             return True
-            
-        # Mettre à jour les obstacles mobiles
-        for obstacle in self.obstacles:
-            obstacle.update()
-            
-        # Maintenir la nourriture
-        self.maintain_foods()
-        
-        # Mettre à jour les timers globaux
-        if self.slow_timer > 0:
-            self.slow_timer -= 1
-            if self.slow_timer == 0:
-                self.slow_effect = False
-        
-        # Auto-boost périodique
-        self.auto_boost_timer += 1
-        if self.auto_boost_timer > 1800:  # Toutes les 30 secondes
-            if not self.multiplayer:
-                self.snake1.speed_boost_timer = 180  # 3 secondes
-            self.auto_boost_timer = 0
-        
-        # Mode survie
-        if self.game_mode == MODE_SURVIVAL:
-            self.survival_timer -= 1
-            if self.survival_timer <= 0:
-                return False  # Temps écoulé = victoire
-        
-        # Mettre à jour les particules
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                self.particles.remove(particle)
-        
-        # Mettre à jour les traînées
-        for trail in self.trails[:]:
-            trail.update()
-            if trail.life <= 0:
-                self.trails.remove(trail)
-        
-        # Mettre à jour les explosions
-        for explosion in self.explosions[:]:
-            explosion.update()
-            if not explosion.particles:
-                self.explosions.remove(explosion)
+        
+        # Estomper les traînées
+        with self.profiler.phase("traînées"):
+            self.trails.update()
         
         # Jouer musique de fond
-        if not self.paused:
+        with self.profiler.phase("musique"):
             self.play_background_music()
         
-        # Mettre à jour les snakes
-        if not self.update_snake(self.snake1, 1):
-            return False
-            
-        if self.multiplayer and not self.update_snake(self.snake2, 2):
-            return False
-            
-        return True
-        
-    def get_current_speed(self, snake, sprinting):
-        base = self.base_speed + (self.level - 1) * 1.5
-        
-        if self.slow_effect:
-            base = max(4, base // 2)
-            
-        if snake.speed_boost_timer > 0:
-            base *= 1.5
-            
-        if sprinting:
-            base *= self.sprint_multiplier
-            
-        return min(int(base), 30)
+        # Faire avancer la simulation d'un tick ; le sprint règle l'horloge du snake
+        actions = self.pending_actions
+        self.pending_actions = {}
+        for player_num, sprinting in ((1, self.sprinting1), (2, self.sprinting2)):
+            actions.setdefault(player_num, Action()).sprinting = sprinting
+        # Une direction de la file pour chaque snake qui bouge à ce tick
+        now = time.perf_counter()
+        for player_num, snake, color in self.game_snakes():
+            if self.engine.scheduler.is_due(player_num):
+                direction = self.input_queues[player_num].pop(snake.heading, self.engine.tick, now)
+                if direction:
+                    actions[player_num].direction = direction
+        if self.recorder:
+            self.recorder.record(actions)
+        ends = self.snake_ends()
+        with self.profiler.phase("moteur"):
+            alive = self.engine.step(actions)
+        self.remember_ends(ends)
+        # Particules, explosions et sons déclenchés par le tick
+        with self.profiler.phase("effets"):
+            self.handle_engine_events()
+        return alive
         
     def draw_menu(self):
         self.screen.blit(self.bg_surface, (0, 0))
@@ -863,6 +847,10 @@ class Game:
         
         if self.in_options:
             self.draw_options_menu()
+        elif self.in_replay_menu:
+            self.draw_replay_menu()
+        elif self.in_leaderboard:
+            self.draw_leaderboard()
         else:
             self.draw_main_menu()
     
@@ -889,7 +877,7 @@ class Game:
         
         for i, instruction in enumerate(instructions):
             text = self.small_font.render(instruction, True, WHITE)
-            text_rect = text.get_rect(center=(WIDTH//2, 550 + i * 25))
+            text_rect = text.get_rect(center=(WIDTH//2, 630 + i * 25))
             self.screen.blit(text, text_rect)
     
     def draw_options_menu(self):
@@ -920,114 +908,386 @@ class Game:
             text_rect = text.get_rect(center=(WIDTH//2, 250 + i * 40))
             self.screen.blit(text, text_rect)
             
-    def draw_snake(self, snake):
-        for i, segment in enumerate(snake.body):
-            # Couleur avec dégradé
-            if i == 0:  # Tête
-                color = snake.color
-                if snake.ghost_timer > 0:
-                    alpha = 128 + int(127 * math.sin(pygame.time.get_ticks() * 0.02))
-                    color = (*color[:3], alpha)
-                elif snake.invincible_timer > 0:
-                    # Effet scintillant pour invincibilité
-                    brightness = abs(math.sin(pygame.time.get_ticks() * 0.05)) * 0.5 + 0.5
-                    color = tuple(int(c * brightness + 255 * (1 - brightness)) for c in color)
-            else:  # Corps
-                fade = max(0.3, 1 - (i * 0.05))
-                color = tuple(int(c * fade) for c in snake.color)
+    def draw_replay_menu(self):
+        title = self.font.render("REPLAYS", True, WHITE)
+        self.screen.blit(title, title.get_rect(center=(WIDTH//2, 180)))
+        
+        if not self.replay_files:
+            text = self.small_font.render("Aucun replay enregistré", True, GRAY)
+            self.screen.blit(text, text.get_rect(center=(WIDTH//2, 250)))
+        
+        for i, path in enumerate(self.replay_files):
+            color = WHITE if i == self.replay_selection else GRAY
+            if i == self.replay_selection:
+                pygame.draw.rect(self.screen, (50, 50, 50), 
+                               (WIDTH//2 - 250, 230 + i * 35 - 5, 500, 30))
+            date = time.strftime("%d/%m/%Y %H:%M", time.localtime(os.path.getmtime(path)))
+            text = self.small_font.render(f"{date}  {os.path.basename(path)}", True, color)
+            self.screen.blit(text, text.get_rect(center=(WIDTH//2, 240 + i * 35)))
             
-            # Appliquer mode nuit
-            if self.night_mode:
-                color = tuple(255 - c for c in color)
+        help_text = self.small_font.render("ENTRÉE: Regarder | ECHAP: Retour", True, WHITE)
+        self.screen.blit(help_text, help_text.get_rect(center=(WIDTH//2, 620)))
+        
+    def draw_leaderboard(self):
+        title, _, players, _ = LEADERBOARDS[self.leaderboard_selection]
+        players_label = "1 joueur" if players == 1 else f"{players} joueurs"
+        header = self.font.render(f"< CLASSEMENT {title.upper()} - {players_label} >", True, WHITE)
+        self.screen.blit(header, header.get_rect(center=(WIDTH//2, 180)))
+        
+        board = self.load_leaderboard(self.leaderboard_selection)
+        if not board['top']:
+            text = self.small_font.render("Aucune partie enregistrée", True, GRAY)
+            self.screen.blit(text, text.get_rect(center=(WIDTH//2, 250)))
+        
+        for i, (score, played_at, level, duration) in enumerate(board['top']):
+            date = time.strftime("%d/%m/%Y %H:%M", time.localtime(played_at))
+            line = f"{i + 1:>2}.  {score:>5} pts   niveau {level:<3} {duration // 60}min{duration % 60:02d}s   {date}"
+            text = self.small_font.render(line, True, GOLD if i == 0 else WHITE)
+            self.screen.blit(text, text.get_rect(center=(WIDTH//2, 240 + i * 30)))
             
-            rect = pygame.Rect(segment[0] * CELL_SIZE, segment[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(self.screen, color, rect)
+        if board['rank']:
+            rank, total = board['rank']
+            score = self.last_scores[self.leaderboard_selection]
+            text = self.small_font.render(f"Dernière partie: {score} pts, rang {rank} sur {total}", True, GREEN)
+            self.screen.blit(text, text.get_rect(center=(WIDTH//2, 560)))
             
-            # Bordures et effets
-            if i == 0:
-                border_color = WHITE if not self.night_mode else BLACK
-                pygame.draw.rect(self.screen, border_color, rect, 2)
-                # Yeux
-                eye_color = BLACK if not self.night_mode else WHITE
-                eye_size = 3
-                pygame.draw.circle(self.screen, border_color, 
-                                 (rect.centerx - 5, rect.centery - 3), eye_size)
-                pygame.draw.circle(self.screen, border_color,
-                                 (rect.centerx + 5, rect.centery - 3), eye_size)
-                pygame.draw.circle(self.screen, eye_color,
-                                 (rect.centerx - 5, rect.centery - 3), 1)
-                pygame.draw.circle(self.screen, eye_color,
-                                 (rect.centerx + 5, rect.centery - 3), 1)
-            else:
-                border_color = WHITE if not self.night_mode else BLACK
-                pygame.draw.rect(self.screen, border_color, rect, 1)
-                
-    def draw_game(self):
-        self.screen.blit(self.bg_surface, (0, 0))
+        help_text = self.small_font.render("Gauche/Droite: Changer de classement | ECHAP: Retour", True, WHITE)
+        self.screen.blit(help_text, help_text.get_rect(center=(WIDTH//2, 620)))
+        
+    def replay_bar_rect(self):
+        return pygame.Rect(20, HEIGHT - 25, WIDTH - 40, 10)
+        
+    def draw_replay_ui(self):
+        player = self.replay_player
+        bar = self.replay_bar_rect()
+        self.overlay_rects.append(pygame.draw.rect(self.screen, GRAY, bar))
+        if len(player):
+            progress = bar.copy()
+            progress.width = int(bar.width * player.tick / len(player))
+            pygame.draw.rect(self.screen, GOLD, progress)
+        
+        status = "FIN" if player.finished else ("PAUSE" if self.replay_paused else "LECTURE")
+        minutes, seconds = divmod(player.engine.scheduler.time // TIME_UNIT, 60)
+        info = (f"REPLAY {status}  x{REPLAY_SPEEDS[self.replay_speed]}  "
+                f"{minutes}:{seconds:02d}  tick {player.tick}/{len(player)}")
+        text = self.small_font.render(info, True, WHITE)
+        self.blit_ui(text, (20, HEIGHT - 50))
+        
+        help_text = self.small_font.render(
+            "ESPACE: Pause | ↑↓: Vitesse | ←→: ±10s | PgUp/PgDn: ±1min | Clic: Aller à", True, WHITE)
+        self.blit_ui(help_text, help_text.get_rect(topright=(WIDTH - 20, HEIGHT - 50)))
+        
+    def animation_step(self, speed, signed=False):
+        # Phase d'animation arrondie à ANIMATION_STEPS valeurs, pour que les
+        # tuiles animées restent en nombre fini dans le cache
+        value = math.sin(pygame.time.get_ticks() * speed)
+        if signed:
+            value = (value + 1) / 2
+        return int(abs(value) * ANIMATION_STEPS + 0.5)
+        
+    def scaled(self, pixels):
+        # Dimension d'un motif dessiné pour des cases de CELL_SIZE pixels
+        return max(1, round(pixels * self.cell_size / CELL_SIZE))
+        
+    def segment_sprite(self, snake, i, snake_color):
+        if i == 0:  # Tête
+            phase = None
+            if snake.ghost_timer > 0:
+                phase = ('ghost', self.animation_step(0.02, signed=True))
+            elif snake.invincible_timer > 0:
+                phase = ('invincible', self.animation_step(0.05))
+            key = ('head', snake_color, phase, self.night_mode)
+        else:  # Corps : dégradé constant au-delà de FADE_SEGMENTS
+            i = min(i, FADE_SEGMENTS - 1)
+            phase = None
+            key = ('body', snake_color, i, self.night_mode)
+        return self.sprites.get(key, self.render_segment, snake_color, i, phase)
+        
+    def render_segment(self, snake_color, i, phase):
+        # Couleur avec dégradé
+        if i == 0:  # Tête
+            color = snake_color
+            if phase and phase[0] == 'invincible':
+                # Effet scintillant pour invincibilité
+                brightness = phase[1] / ANIMATION_STEPS * 0.5 + 0.5
+                color = tuple(int(c * brightness + 255 * (1 - brightness)) for c in color)
+        else:  # Corps
+            fade = max(0.3, 1 - (i * 0.05))
+            color = tuple(int(c * fade) for c in snake_color)
+        
+        # Appliquer mode nuit
+        if self.night_mode:
+            color = tuple(255 - c for c in color)
         
-        # Dessiner les traînées
-        if self.show_trails:
-            for trail in self.trails:
-                trail.draw(self.screen)
+        tile = pygame.Surface((self.cell_size, self.cell_size))
+        rect = tile.get_rect()
+        pygame.draw.rect(tile, color, rect)
         
-        # Dessiner les obstacles
-        for obstacle in self.obstacles:
-            rect = pygame.Rect(obstacle.x * CELL_SIZE, obstacle.y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            color = ORANGE if obstacle.moving else GRAY
-            if self.night_mode:
-                color = tuple(255 - c for c in color)
-            pygame.draw.rect(self.screen, color, rect)
+        # Bordures et effets
+        if i == 0:
             border_color = WHITE if not self.night_mode else BLACK
-            pygame.draw.rect(self.screen, border_color, rect, 2)
-            
-        # Dessiner les nourritures avec animations
-        for food in self.foods:
-            color = food.get_color()
-            if self.night_mode:
-                color = tuple(255 - c for c in color)
+            pygame.draw.rect(tile, border_color, rect, 2)
+            # Yeux
+            eye_color = BLACK if not self.night_mode else WHITE
+            eye_size = self.scaled(3)
+            eye_x, eye_y = self.scaled(5), rect.centery - self.scaled(3)
+            pygame.draw.circle(tile, border_color, 
+                             (rect.centerx - eye_x, eye_y), eye_size)
+            pygame.draw.circle(tile, border_color,
+                             (rect.centerx + eye_x, eye_y), eye_size)
+            pygame.draw.circle(tile, eye_color,
+                             (rect.centerx - eye_x, eye_y), 1)
+            pygame.draw.circle(tile, eye_color,
+                             (rect.centerx + eye_x, eye_y), 1)
+            if phase and phase[0] == 'ghost':
+                # Tête translucide en mode fantôme
+                tile.set_alpha(128 + int(127 * (phase[1] * 2 / ANIMATION_STEPS - 1)))
+        else:
+            border_color = WHITE if not self.night_mode else BLACK
+            pygame.draw.rect(tile, border_color, rect, 1)
+        return tile
             
-            # Effets spéciaux selon le type
-            if food.type != FRUIT_NORMAL:
-                brightness = abs(math.sin(pygame.time.get_ticks() * 0.01)) * 0.4 + 0.6
-                color = tuple(int(c * brightness) for c in color)
-                
-                # Effet de pulsation
-                size_mod = int(4 * math.sin(pygame.time.get_ticks() * 0.02))
-                rect = pygame.Rect(food.pos[0] * CELL_SIZE - size_mod//2, 
-                                 food.pos[1] * CELL_SIZE - size_mod//2,
-                                 CELL_SIZE + size_mod, CELL_SIZE + size_mod)
+    def snake_sprites(self, snake, snake_color, cells=None, head=True):
+        # Sans head, la tête est omise (dessinée à part, voir draw_snake_heads)
+        first = 0 if head else 1
+        if cells is None:
+            return [(self.segment_sprite(snake, i, snake_color), self.cell_position(x, y))
+                    for i, (x, y) in enumerate(snake.body) if i >= first]
+        
+        # Indice du dernier segment de chaque case en début de corps : c'est
+        # lui qui est dessiné par-dessus quand le corps se replie (fantôme)
+        window = {}
+        window_counts = {}
+        for i, segment in enumerate(islice(snake.body, FADE_SEGMENTS)):
+            window[segment] = i
+            window_counts[segment] = window_counts.get(segment, 0) + 1
+        sprites = []
+        for pos in common_cells(cells, snake.counts):
+            if snake.counts[pos] > window_counts.get(pos, 0):
+                i = FADE_SEGMENTS
             else:
-                rect = pygame.Rect(food.pos[0] * CELL_SIZE, food.pos[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+                i = window[pos]
+                if i < first:
+                    continue
+            sprites.append((self.segment_sprite(snake, i, snake_color), self.cell_position(*pos)))
+        return sprites
             
-            pygame.draw.rect(self.screen, color, rect)
+    def draw_snake_ends(self):
+        # La tête glisse de la case précédente vers la case actuelle et la
+        # queue quitte la sienne, selon la fraction écoulée du tick de ce
+        # snake. Un saut (portail, téléportation, rétrécissement) n'est pas interpolé.
+        for player_num, snake, color in self.game_snakes():
+            sprites = []
+            head = snake.body[0]
+            ends = self.previous_ends.get(player_num)
+            alpha = self.engine.scheduler.progress(player_num, self.sim_time)
+            if ends and len(snake.body) > 1 and alpha < 1:
+                tail = snake.body[-1]
+                if is_adjacent(ends[1], tail):
+                    sprites.append((self.segment_sprite(snake, len(snake.body) - 1, color),
+                                    self.interpolate(ends[1], tail, alpha)))
+            if ends and is_adjacent(ends[0], head):
+                sprites.append((self.segment_sprite(snake, 0, color), self.interpolate(ends[0], head, alpha)))
+            else:
+                sprites.append((self.segment_sprite(snake, 0, color), self.cell_position(*head)))
+            for sprite, dest in sprites:
+                self.blit_ui(sprite, dest)
+                
+    def interpolate(self, start, end, alpha):
+        ox, oy = self.camera.origin
+        return (round((start[0] - ox + (end[0] - start[0]) * alpha) * self.cell_size),
+                round((start[1] - oy + (end[1] - start[1]) * alpha) * self.cell_size))
             
-            # Icônes pour les power-ups
-            icon_color = WHITE if not self.night_mode else BLACK
-            if food.type == FRUIT_BONUS:
-                pygame.draw.circle(self.screen, icon_color, rect.center, 4)
-            elif food.type == FRUIT_TELEPORT:
-                pygame.draw.circle(self.screen, icon_color, rect.center, 8, 2)
-                pygame.draw.circle(self.screen, icon_color, rect.center, 4, 2)
-            elif food.type == FRUIT_INVINCIBLE:
-                points = [
-                    (rect.centerx, rect.centery - 6),
-                    (rect.centerx - 5, rect.centery + 4),
-                    (rect.centerx + 5, rect.centery + 4)
-                ]
-                pygame.draw.polygon(self.screen, icon_color, points)
+    def draw_snake(self, snake, snake_color, surface=None):
+        surface = surface or self.screen
+        surface.blits(self.snake_sprites(snake, snake_color), False)
                 
-        # Dessiner les snakes
-        self.draw_snake(self.snake1)
-        if self.multiplayer:
-            self.draw_snake(self.snake2)
+    def obstacle_sprite(self, obstacle):
+        return self.sprites.get(('obstacle', obstacle.moving, self.night_mode),
+                                self.render_obstacle, obstacle.moving)
+        
+    def render_obstacle(self, moving):
+        tile = pygame.Surface((self.cell_size, self.cell_size))
+        color = ORANGE if moving else GRAY
+        if self.night_mode:
+            color = tuple(255 - c for c in color)
+        pygame.draw.rect(tile, color, tile.get_rect())
+        border_color = WHITE if not self.night_mode else BLACK
+        pygame.draw.rect(tile, border_color, tile.get_rect(), 2)
+        return tile
+        
+    def food_sprite(self, food):
+        # Renvoie (tuile, décalage) : les fruits spéciaux débordent de 2 pixels
+        if food.type != FRUIT_NORMAL:
+            brightness_step = self.animation_step(0.01)
+            size_mod = int(4 * math.sin(pygame.time.get_ticks() * 0.02))
+        else:
+            brightness_step = size_mod = None
+        key = ('food', food.type, brightness_step, size_mod, self.night_mode)
+        return self.sprites.get(key, self.render_food, food.type, brightness_step, size_mod)
+        
+    def render_food(self, fruit_type, brightness_step, size_mod):
+        color = FRUIT_COLORS[fruit_type]
+        if self.night_mode:
+            color = tuple(255 - c for c in color)
+        
+        # Effets spéciaux selon le type
+        if fruit_type != FRUIT_NORMAL:
+            brightness = brightness_step / ANIMATION_STEPS * 0.4 + 0.6
+            color = tuple(int(c * brightness) for c in color)
+            
+            # Effet de pulsation, dans une tuile transparente de 2 pixels plus large
+            offset = -2
+            tile = pygame.Surface((self.cell_size + 4, self.cell_size + 4), pygame.SRCALPHA)
+            rect = pygame.Rect(2 - size_mod//2, 2 - size_mod//2,
+                             self.cell_size + size_mod, self.cell_size + size_mod)
+        else:
+            offset = 0
+            tile = pygame.Surface((self.cell_size, self.cell_size))
+            rect = tile.get_rect()
+        
+        pygame.draw.rect(tile, color, rect)
+        
+        # Icônes pour les power-ups
+        icon_color = WHITE if not self.night_mode else BLACK
+        if fruit_type == FRUIT_BONUS:
+            pygame.draw.circle(tile, icon_color, rect.center, self.scaled(4))
+        elif fruit_type == FRUIT_TELEPORT:
+            pygame.draw.circle(tile, icon_color, rect.center, self.scaled(8), 2)
+            pygame.draw.circle(tile, icon_color, rect.center, self.scaled(4), 2)
+        elif fruit_type == FRUIT_INVINCIBLE:
+            points = [
+                (rect.centerx, rect.centery - self.scaled(6)),
+                (rect.centerx - self.scaled(5), rect.centery + self.scaled(4)),
+                (rect.centerx + self.scaled(5), rect.centery + self.scaled(4))
+            ]
+            pygame.draw.polygon(tile, icon_color, points)
+        return tile, offset
+        
+    def board_sprites(self, cells=None):
+        # Tuiles du plateau dans l'ordre de superposition : obstacles,
+        # nourritures, snakes sans leur tête. Avec cells, seulement celles de ces cases
+        # (la vue de la caméra pour un plateau complet).
+        sprites = []
+        for obstacle in self.engine.obstacles:
+            if cells is None or (obstacle.x, obstacle.y) in cells:
+                sprites.append((self.obstacle_sprite(obstacle), self.cell_position(obstacle.x, obstacle.y)))
+        for food in self.engine.foods:
+            if cells is None or food.pos in cells:
+                tile, offset = self.food_sprite(food)
+                x, y = self.cell_position(*food.pos)
+                sprites.append((tile, (x + offset, y + offset)))
+        for player_num, snake, color in self.game_snakes():
+            sprites.extend(self.snake_sprites(snake, color, cells, head=False))
+        return sprites
+            
             
-        # Dessiner les particules
-        for particle in self.particles:
-            particle.draw(self.screen)
+    def game_snakes(self):
+        return [(player_num, self.engine.get_snake(player_num), self.player_colors[player_num])
+                for player_num in self.engine.players()]
+        
+    def redraw_board(self):
+        # Vue complète : fond, traînées, obstacles, nourritures, snakes
+        self.board_surface.blit(self.bg_surface, (0, 0))
+        if self.show_trails:
+            self.board_surface.blit(self.trails.surface, (0, 0))
+        self.board_surface.blits(self.board_sprites(self.camera.cells), False)
+        self.board_state = self.capture_board_state()
+        self.board_valid = True
+        
+    def capture_board_state(self):
+        # Ce qui est peint dans la vue, pour comparer d'une image à l'autre
+        snakes = []
+        for player_num, snake, color in self.game_snakes():
+            window = list(islice(snake.body, FADE_SEGMENTS))
+            cells = set(snake.counts) if self.camera.whole else set(common_cells(self.camera.cells, snake.counts))
+            snakes.append((cells, window))
+        return {
+            'snakes': snakes,
+            'pulsing': {food.pos for food in self.engine.foods if food.type != FRUIT_NORMAL},
+            'obstacles': {((o.x, o.y), o.moving) for o in self.engine.obstacles},
+            'foods': {(food.pos, food.type) for food in self.engine.foods},
+            'trails': self.trails.cells() if self.show_trails else set()
+        }
+        
+    def dirty_cells(self, old, new):
+        dirty = set()
+        for (old_cells, old_window), (new_cells, new_window) in zip(old['snakes'], new['snakes']):
+            # Cases gagnées ou perdues + début du corps, dont le dégradé glisse
+            dirty |= old_cells ^ new_cells
+            dirty.update(old_window)
+            dirty.update(new_window)
+        dirty.update(pos for pos, _ in old['obstacles'] ^ new['obstacles'])
+        dirty.update(pos for pos, _ in old['foods'] ^ new['foods'])
+        dirty |= old['trails'] | new['trails']
+        
+        # Les fruits spéciaux pulsent et débordent de 2 pixels sur les cases
+        # voisines : ces dernières ne sont à repeindre que si elles ne sont pas vides
+        pulsing = old['pulsing'] | new['pulsing']
+        for x, y in pulsing:
+            dirty.add((x, y))
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    pos = (x + dx, y + dy)
+                    if not self.engine.free_cells.is_free(pos) or pos in new['trails']:
+                        dirty.add(pos)
+        # Un fruit juste hors de la vue déborde encore sur son bord
+        return dirty & self.camera.cells, {pos for pos in pulsing if self.camera.visible(pos, 1)}
+        
+    def update_board(self, exposed=None):
+        # Ne repeint que les cases modifiées depuis l'image précédente (et
+        # celles que la caméra vient de découvrir)
+        state = self.capture_board_state()
+        dirty, pulsing = self.dirty_cells(self.board_state, state)
+        if exposed:
+            dirty |= exposed
+        self.board_state = state
+        if not dirty:
+            return []
+        
+        rects = []
+        for pos in pulsing:
+            x, y = self.cell_position(*pos)
+            rects.append(pygame.Rect(x - 2, y - 2, self.cell_size + 4, self.cell_size + 4))
+        for pos in dirty:
+            rects.append(pygame.Rect(self.cell_position(*pos), (self.cell_size, self.cell_size)))
+        self.board_surface.blits([(self.bg_surface, rect, rect) for rect in rects], False)
+        self.board_surface.blits([(self.trails.surface, rect, rect) for rect in
+                                  map(self.trails.cell_rect, state['trails'] & dirty)], False)
+        self.board_surface.blits(self.board_sprites(dirty), False)
+        return rects
+        
+    def blit_ui(self, surface, dest):
+        rect = self.screen.blit(surface, dest)
+        self.overlay_rects.append(rect)
+        return rect
+        
+    def draw_game(self):
+        exposed = self.update_camera()
+        full = not self.dirty_rendering or not self.board_valid or self.paused
+        with self.profiler.phase("plateau"):
+            if full:
+                self.redraw_board()
+                self.screen.blit(self.board_surface, (0, 0))
+            elif exposed is not None:
+                # Vue décalée : tout l'écran change, mais seules les bandes
+                # découvertes et les cases modifiées sont repeintes
+                self.update_board(exposed)
+                self.screen.blit(self.board_surface, (0, 0))
+            else:
+                # Effacer les cases modifiées et les superpositions de l'image précédente
+                rects = self.update_board() + self.overlay_rects
+                self.screen.blits([(self.board_surface, rect, rect) for rect in rects], False)
+        self.overlay_rects = []
+        
+        # Têtes (et queues) interpolées entre deux ticks
+        with self.profiler.phase("têtes"):
+            self.draw_snake_ends()
             
-        # Dessiner les explosions
-        for explosion in self.explosions:
-            explosion.draw(self.screen)
+        # Dessiner les particules et explosions
+        with self.profiler.phase("dessin particules"):
+            origin = (self.camera.origin[0] * self.cell_size, self.camera.origin[1] * self.cell_size)
+            self.overlay_rects.extend(self.particles.draw(self.screen, origin))
             
         # Overlay de pause
         if self.paused:
@@ -1043,78 +1303,162 @@ class Game:
             instruction = self.small_font.render("Appuyez sur P pour continuer", True, WHITE)
             instruction_rect = instruction.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
             self.screen.blit(instruction, instruction_rect)
+            # L'assombrissement couvre tout l'écran : repeindre tout en sortant de pause
+            self.board_valid = False
             
         # Interface utilisateur
-        self.draw_game_ui()
+        with self.profiler.phase("interface"):
+            self.draw_game_ui()
+        if self.replay_player:
+            self.draw_replay_ui()
+        if self.profiler.enabled:
+            self.draw_profiler()
+        
+        self.display_rects = None if full or exposed is not None else rects + self.overlay_rects
+        
+    def present(self):
+        # Envoie à l'écran seulement les zones redessinées, sauf image complète
+        if self.display_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.display_rects)
+        with self.profiler.phase("capture"):
+            self.capture.capture(self.screen)
+        
+        
+    def draw_profiler(self):
+        # Panneau reconstruit toutes les PROFILER_REFRESH images, lisible et peu coûteux
+        if self.profiler_panel is None or self.profiler.frames >= self.profiler_panel_frame + PROFILER_REFRESH:
+            self.profiler_panel = self.profiler_surface()
+            self.profiler_panel_frame = self.profiler.frames
+        self.blit_ui(self.profiler_panel, self.profiler_panel.get_rect(bottomright=(WIDTH - 10, HEIGHT - 10)))
+        
+    def profiler_surface(self):
+        font = self.profiler_font
+        report = self.profiler.report()
+        frame = self.profiler.stats(self.profiler.frame_times)
+        latency = self.input_queues[1].latency_stats()
+        line_height = 16
+        graph_height = 60
+        width = 340
+        height = 30 + (len(report) + 2) * line_height + graph_height
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 220))
+        
+        y = 6
+        if frame:
+            header = f"Image: {frame[0]:.1f} ms  p95 {frame[1]:.1f}  p99 {frame[2]:.1f}  ({1000 / frame[0]:.0f} FPS)"
+        else:
+            header = "Image: mesure en cours..."
+        panel.blit(font.render(header, True, WHITE), (8, y))
+        y += line_height + 4
+        for x, label in ((190, "moy"), (250, "p95"), (310, "p99")):
+            text = font.render(label, True, GRAY)
+            panel.blit(text, text.get_rect(topright=(x + 20, y)))
+        y += line_height
+        for name, depth, (mean, p95, p99) in report:
+            panel.blit(font.render(name, True, WHITE if depth == 0 else GRAY), (8 + depth * 12, y))
+            for x, value in ((190, mean), (250, p95), (310, p99)):
+                text = font.render(f"{value:.2f}", True, WHITE)
+                panel.blit(text, text.get_rect(topright=(x + 20, y)))
+            y += line_height
+        if latency:
+            text = f"Latence entrées J1: {latency[0]:.0f} ms (max {latency[1]:.0f})"
+            panel.blit(font.render(text, True, GRAY), (8, y))
+        y += line_height + 4
+        
+        # Graphe des temps d'image : une barre par image, ligne au budget de DISPLAY_FPS
+        budget = 1000 / DISPLAY_FPS
+        bottom = y + graph_height - 4
+        scale = (graph_height - 4) / PROFILER_GRAPH_MS
+        for i, ms in enumerate(self.profiler.frame_times):
+            color = GREEN if ms <= budget * 1.1 else RED
+            top = bottom - min(ms, PROFILER_GRAPH_MS) * scale
+            pygame.draw.line(panel, color, (8 + i, bottom), (8 + i, top))
+        budget_y = bottom - budget * scale
+        pygame.draw.line(panel, YELLOW, (8, budget_y), (width - 8, budget_y))
+        return panel
         
     def draw_game_ui(self):
         text_color = WHITE if not self.night_mode else BLACK
         
         # Scores
-        if self.multiplayer:
-            if self.cooperative_mode:
-                total_score = self.score1 + self.score2
-                score_text = self.font.render(f"Score Équipe: {total_score}", True, text_color)
-                self.screen.blit(score_text, (10, 10))
-                score1_text = self.small_font.render(f"J1: {self.score1}", True, GREEN)
-                score2_text = self.small_font.render(f"J2: {self.score2}", True, BLUE)
-                self.screen.blit(score1_text, (10, 50))
-                self.screen.blit(score2_text, (10, 75))
+        if self.engine.multiplayer:
+            if self.engine.cooperative_mode:
+                total_score = self.engine.score1 + self.engine.score2
+                score_text = self.hud.render(self.font, f"Score Équipe: {total_score}", text_color)
+                self.blit_ui(score_text, (10, 10))
+                score1_text = self.hud.render(self.small_font, f"J1: {self.engine.score1}", GREEN)
+                score2_text = self.hud.render(self.small_font, f"J2: {self.engine.score2}", BLUE)
+                self.blit_ui(score1_text, (10, 50))
+                self.blit_ui(score2_text, (10, 75))
             else:
-                score1_text = self.font.render(f"Joueur 1: {self.score1}", True, GREEN)
-                score2_text = self.font.render(f"Joueur 2: {self.score2}", True, BLUE)
-                self.screen.blit(score1_text, (10, 10))
-                self.screen.blit(score2_text, (10, 50))
+                score1_text = self.hud.render(self.font, f"Joueur 1: {self.engine.score1}", GREEN)
+                score2_text = self.hud.render(self.font, f"Joueur 2: {self.engine.score2}", BLUE)
+                self.blit_ui(score1_text, (10, 10))
+                self.blit_ui(score2_text, (10, 50))
         else:
-            score_text = self.font.render(f"Score: {self.score1}", True, text_color)
-            best_text = self.small_font.render(f"Meilleur: {self.best_score}", True, text_color)
-            self.screen.blit(score_text, (10, 10))
-            self.screen.blit(best_text, (10, 50))
+            score_text = self.hud.render(self.font, f"Score: {self.engine.score1}", text_color)
+            best_text = self.hud.render(self.small_font, f"Meilleur: {self.best_score}", text_color)
+            self.blit_ui(score_text, (10, 10))
+            self.blit_ui(best_text, (10, 50))
         
         # Niveau et temps
-        level_text = self.small_font.render(f"Niveau: {self.level}", True, text_color)
+        level_text = self.hud.render(self.small_font, f"Niveau: {self.engine.level}", text_color)
         elapsed = (pygame.time.get_ticks() - self.start_time) // 1000
-        time_text = self.small_font.render(f"Temps: {elapsed}s", True, text_color)
-        self.screen.blit(level_text, (10, 100))
-        self.screen.blit(time_text, (10, 125))
+        time_text = self.hud.render(self.small_font, f"Temps: {elapsed}s", text_color)
+        self.blit_ui(level_text, (10, 100))
+        self.blit_ui(time_text, (10, 125))
         
         # Mode survie - compte à rebours
-        if self.game_mode == MODE_SURVIVAL:
-            remaining = self.survival_timer // 60
-            survival_text = self.font.render(f"Temps restant: {remaining}s", True, RED)
+        if self.engine.game_mode == MODE_SURVIVAL:
+            remaining = self.engine.survival_timer // 60
+            survival_text = self.hud.render(self.font, f"Temps restant: {remaining}s", RED)
             survival_rect = survival_text.get_rect(center=(WIDTH//2, 50))
-            self.screen.blit(survival_text, survival_rect)
+            self.blit_ui(survival_text, survival_rect)
         
         # Indicateurs d'état
         y_offset = 150
-        if self.sprinting1 or (self.multiplayer and self.sprinting2):
-            sprint_text = self.small_font.render("SPRINT!", True, text_color)
-            self.screen.blit(sprint_text, (10, y_offset))
+        if self.sprinting1 or (self.engine.multiplayer and self.sprinting2):
+            sprint_text = self.hud.render(self.small_font, "SPRINT!", text_color)
+            self.blit_ui(sprint_text, (10, y_offset))
             y_offset += 25
             
-        if self.slow_effect:
-            slow_text = self.small_font.render("RALENTI", True, GOLD)
-            self.screen.blit(slow_text, (10, y_offset))
+        if self.engine.slow_effect:
+            slow_text = self.hud.render(self.small_font, "RALENTI", GOLD)
+            self.blit_ui(slow_text, (10, y_offset))
             y_offset += 25
             
-        if self.snake1.ghost_timer > 0 or (self.multiplayer and self.snake2.ghost_timer > 0):
-            ghost_text = self.small_font.render("MODE FANTÔME", True, CYAN)
-            self.screen.blit(ghost_text, (10, y_offset))
+        if self.engine.snake1.ghost_timer > 0 or (self.engine.multiplayer and self.engine.snake2.ghost_timer > 0):
+            ghost_text = self.hud.render(self.small_font, "MODE FANTÔME", CYAN)
+            self.blit_ui(ghost_text, (10, y_offset))
             y_offset += 25
             
-        if self.snake1.invincible_timer > 0 or (self.multiplayer and self.snake2.invincible_timer > 0):
-            invincible_text = self.small_font.render("INVINCIBLE", True, YELLOW)
-            self.screen.blit(invincible_text, (10, y_offset))
+        if self.engine.snake1.invincible_timer > 0 or (self.engine.multiplayer and self.engine.snake2.invincible_timer > 0):
+            invincible_text = self.hud.render(self.small_font, "INVINCIBLE", YELLOW)
+            self.blit_ui(invincible_text, (10, y_offset))
+            y_offset += 25
+        
+        if self.capture.recording:
+            rec_text = self.hud.render(self.small_font, "REC", RED)
+            self.blit_ui(rec_text, (10, y_offset))
             y_offset += 25
         
         # Charges de téléportation
-        if self.snake1.teleport_charges > 0:
-            teleport_text = self.small_font.render(f"Téléportations: {self.snake1.teleport_charges}", True, PINK)
-            self.screen.blit(teleport_text, (10, y_offset))
+        if self.engine.snake1.teleport_charges > 0:
+            teleport_text = self.hud.render(self.small_font, f"Téléportations: {self.engine.snake1.teleport_charges}", PINK)
+            self.blit_ui(teleport_text, (10, y_offset))
             y_offset += 25
         
+        # Légende, mode et contrôles : panneau fixe assemblé une seule fois
+        key = ('legend', self.night_mode, self.engine.game_mode, self.engine.multiplayer)
+        self.blit_ui(self.hud.panel(key, self.legend_lines), (WIDTH - 250, 10))
+        
+    def legend_lines(self):
+        text_color = WHITE if not self.night_mode else BLACK
+        lines = []
+        
         # Légende des power-ups (côté droit)
-        legend_x = WIDTH - 250
         legend_texts = [
             ("Rouge: +1 pt", RED),
             ("Bleu: +5 pts", BLUE),
@@ -1129,32 +1473,37 @@ class Game:
         for i, (text, color) in enumerate(legend_texts):
             if self.night_mode:
                 color = tuple(255 - c for c in color)
-            legend_text = self.small_font.render(text, True, color)
-            self.screen.blit(legend_text, (legend_x, 10 + i * 22))
+            lines.append((self.small_font, text, color, (0, i * 22)))
             
         # Mode de jeu
         mode_names = ["Classique", "Portails", "Obstacles", "Survie", "Coopératif"]
-        mode_text = self.small_font.render(f"Mode: {mode_names[self.game_mode]}", True, text_color)
-        self.screen.blit(mode_text, (legend_x, 200))
+        lines.append((self.small_font, f"Mode: {mode_names[self.engine.game_mode]}", text_color, (0, 190)))
         
         # Contrôles
         controls = [
             "P: Pause | N: Mode Nuit",
             "T: Téléportation | Ctrl+S: Screenshot"
         ]
-        if self.multiplayer:
+        if self.engine.multiplayer:
             controls.extend([
                 "J1: Flèches + ESPACE",
                 "J2: WASD + SHIFT"
             ])
         
         for i, control in enumerate(controls):
-            control_text = self.small_font.render(control, True, text_color)
-            self.screen.blit(control_text, (legend_x, 230 + i * 20))
+            lines.append((self.small_font, control, text_color, (0, 220 + i * 20)))
+        return lines
         
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close(self.engine)
+            self.recorder = None
+            
     def game_over(self):
-        # Arrêter l'enregistrement
-        self.recording = False
+        # Arrêter l'enregistrement et la musique
+        self.stop_recording()
+        if self.music:
+            self.music.stop()
         
         # Mettre à jour les statistiques
         self.games_played += 1
@@ -1162,12 +1511,26 @@ class Game:
         self.total_time += elapsed
         
         # Mode survie - victoire si temps écoulé
-        survival_victory = (self.game_mode == MODE_SURVIVAL and self.survival_timer <= 0)
+        survival_victory = self.engine.survival_victory()
         
-        if self.score1 > self.best_score:
-            self.best_score = self.score1
+        if self.engine.score1 > self.best_score:
+            self.best_score = self.engine.score1
             
-        self.save_game_data()
+        self.save_game_stats(elapsed)
+        
+        # Les classements seront relus à la prochaine ouverture de l'écran
+        self.leaderboards = {}
+        rank = None
+        index = self.leaderboard_index()
+        if index is not None:
+            _, mode, players, cooperative = LEADERBOARDS[index]
+            score = game_score(players, cooperative, self.engine.score1, self.engine.score2)
+            self.last_scores[index] = score
+            if self.stats:
+                try:
+                    rank = self.stats.rank(mode, players, cooperative, score)[0]
+                except StatsError:
+                    pass
         
         if not survival_victory and self.gameover_sound:
             self.gameover_sound.play()
@@ -1183,28 +1546,28 @@ class Game:
             victory_text = self.big_font.render("VICTOIRE!", True, GREEN)
             victory_rect = victory_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 100))
             self.screen.blit(victory_text, victory_rect)
-        elif self.multiplayer:
-            if self.cooperative_mode:
-                total_score = self.score1 + self.score2
+        elif self.engine.multiplayer:
+            if self.engine.cooperative_mode:
+                total_score = self.engine.score1 + self.engine.score2
                 coop_text = self.big_font.render("PARTIE TERMINÉE", True, WHITE)
                 coop_rect = coop_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 100))
                 self.screen.blit(coop_text, coop_rect)
                 score_text = self.font.render(f"Score Équipe: {total_score}", True, WHITE)
             else:
-                if self.score1 > self.score2:
+                if self.engine.score1 > self.engine.score2:
                     winner_text = self.big_font.render("JOUEUR 1 GAGNE!", True, GREEN)
-                elif self.score2 > self.score1:
+                elif self.engine.score2 > self.engine.score1:
                     winner_text = self.big_font.render("JOUEUR 2 GAGNE!", True, BLUE)
                 else:
                     winner_text = self.big_font.render("ÉGALITÉ!", True, WHITE)
                 winner_rect = winner_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 100))
                 self.screen.blit(winner_text, winner_rect)
-                score_text = self.font.render(f"J1: {self.score1} - J2: {self.score2}", True, WHITE)
+                score_text = self.font.render(f"J1: {self.engine.score1} - J2: {self.engine.score2}", True, WHITE)
         else:
             game_over_text = self.big_font.render("GAME OVER", True, WHITE)
             game_over_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 100))
             self.screen.blit(game_over_text, game_over_rect)
-            score_text = self.font.render(f"Score Final: {self.score1}", True, WHITE)
+            score_text = self.font.render(f"Score Final: {self.engine.score1}", True, WHITE)
             
         if 'score_text' in locals():
             score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))
@@ -1212,12 +1575,14 @@ class Game:
         
         # Statistiques
         stats = [
-            f"Niveau Atteint: {self.level}",
+            f"Niveau Atteint: {self.engine.level}",
             f"Temps de Jeu: {elapsed}s",
             f"Meilleur Score: {self.best_score}",
             f"Parties Jouées: {self.games_played}",
             f"Temps Total: {self.total_time//60}min"
         ]
+        if rank:
+            stats.append(f"Classement {LEADERBOARDS[index][0]}: #{rank}")
         
         for i, stat in enumerate(stats):
             stat_text = self.small_font.render(stat, True, WHITE)
@@ -1241,37 +1606,82 @@ class Game:
     def run(self):
         running = True
         while running:
-            if self.in_menu:
+            if self.replay_player:
+                if not self.handle_replay_events():
+                    break
+                if self.replay_player:
+                    with self.profiler.phase("simulation"):
+                        fps = self.update_replay()
+                    with self.profiler.phase("rendu"):
+                        self.draw_game()
+                    self.clock.tick(fps)
+                    with self.profiler.phase("affichage"):
+                        self.present()
+                    self.profiler.end_frame()
+                    continue
+                self.draw_menu()
+            elif self.in_menu:
                 if not self.handle_menu_events():
                     break
                 self.draw_menu()
             else:
-                if not self.handle_game_events():
+                with self.profiler.phase("événements"):
+                    running = self.handle_game_events()
+                if not running:
                     break
                     
-                if not self.update_game():
+                with self.profiler.phase("simulation"):
+                    alive = self.advance_game(self.frame_time)
+                if not alive:
                     if not self.game_over():
                         break
                     continue
                     
-                self.draw_game()
+                with self.profiler.phase("rendu"):
+                    self.draw_game()
                 
-                # Vitesse adaptative
-                if not self.paused:
-                    speed1 = self.get_current_speed(self.snake1, self.sprinting1)
-                    if self.multiplayer:
-                        speed2 = self.get_current_speed(self.snake2, self.sprinting2)
-                        speed = max(speed1, speed2)
-                    else:
-                        speed = speed1
-                        
-                    self.clock.tick(speed)
+                # Affichage à cadence fixe : la vitesse du snake ne règle plus
+                # que le nombre de ticks par image (voir advance_game)
+                self.frame_time = min(self.clock.tick(DISPLAY_FPS) / 1000, MAX_FRAME_TIME)
+                with self.profiler.phase("affichage"):
+                    self.present()
+                self.profiler.end_frame()
+                continue
             
             pygame.display.flip()
             
+        self.stop_recording()
+        if self.stats:
+            self.stats.close()
+        self.capture.close()
+        if self.trace_path:
+            self.save_trace()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Snake MEGA Ultimate Edition")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="graine du générateur aléatoire (parties reproductibles)")
+    parser.add_argument("--full-redraw", action="store_true",
+                        help="redessiner tout l'écran à chaque image (sans rectangles modifiés)")
+    parser.add_argument("--record-every", type=int, default=RECORD_EVERY,
+                        help="enregistrement vidéo (CTRL+R) : une image sur N")
+    parser.add_argument("--trace", metavar="FICHIER", default=None,
+                        help="enregistrer la boucle de jeu au format Chrome trace-event (JSON)")
+    parser.add_argument("--cell-size", type=int, default=CELL_SIZE,
+                        help="taille d'une case en pixels")
+    parser.add_argument("--grid", type=grid_size, default=None, metavar="LxH",
+                        help="plateau en cases, par exemple 120x80 (par défaut, la fenêtre entière)")
+    args = parser.parse_args()
+    
+    if args.cell_size < MIN_CELL_SIZE:
+        parser.error(f"--cell-size : {MIN_CELL_SIZE} pixels minimum")
+    grid_width, grid_height = args.grid or (WIDTH // args.cell_size, HEIGHT // args.cell_size)
+    if min(grid_width, grid_height) < 4:
+        parser.error("--grid : plateau de 4x4 cases minimum")
+    
+    game = Game(seed=args.seed, dirty_rendering=not args.full_redraw, record_every=args.record_every,
+                trace_path=args.trace, grid_width=grid_width, grid_height=grid_height,
+                cell_size=args.cell_size)
     game.run()
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+Format de replay binaire du Snake MEGA Ultimate.
+
+Le moteur étant déterministe (même graine + mêmes actions = même partie), un
+replay ne contient que l'en-tête de la partie et les entrées de chaque tick :
+
+    en-tête (HEADER, 46 octets) : magic, version, mode, options, graine,
+                                  taille de grille, nombre de ticks, empreinte finale
+    puis un enregistrement par tick, un octet par joueur (au moins
+    RECORD_SIZE ; la taille est dans l'en-tête) :
+        bits 0-2 : direction (0 = inchangée, 1-4 = DIRECTIONS[code - 1])
+        bit 3    : téléportation
+        bit 4    : sprint (règle la vitesse du snake, donc l'ordre des ticks)
+
+Une heure de jeu à 30 ticks/s tient dans ~200 Ko. ReplayRecorder remplit un
+tampon circulaire préalloué et un thread d'écriture le vide sur disque ;
+ReplayReader projette le fichier en mémoire (mmap) et décode les ticks à la
+demande.
+
+Toutes les KEYFRAME_INTERVAL entrées, l'état complet du moteur (getstate())
+est aussi écrit, compressé, dans un fichier voisin (chemin + KEYFRAME_SUFFIX) :
+ReplayPlayer.seek() repart de la keyframe la plus proche au lieu de rejouer la
+partie depuis le tick 0. Sans ce fichier, le replay reste lisible (plus lent à
+parcourir). Un tick n'a pas de durée fixe (vitesse des snakes, et en
+multijoueur un tick par instant du planificateur) : seek_time() se déplace en
+temps de jeu.
+"""
+import ast
+import bisect
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from snake_engine import SnakeEngine, Action, DIRECTIONS, MAX_PLAYERS
+
+MAGIC = b'SNKR'
+VERSION = 3  # 2 : une horloge par snake, sprint dans les actions ; 3 : tirage des cases libres
+HEADER = struct.Struct('<4sHBBQHHI20sH')
+RECORD_SIZE = 2  # Octets par tick au minimum (solo et deux joueurs)
+
+FLAG_MULTIPLAYER = 1
+FLAG_COOPERATIVE = 2
+
+DIRECTION_BITS = 0x07
+TELEPORT_BIT = 0x08
+SPRINT_BIT = 0x10
+
+DIRECTION_CODES = {direction: i + 1 for i, direction in enumerate(DIRECTIONS)}
+
+KEYFRAME_SUFFIX = '.keys'
+KEYFRAME_MAGIC = b'SNK3'  # Change avec la forme de getstate() : les anciennes keyframes sont ignorées
+KEYFRAME_HEADER = struct.Struct('<II')  # tick, taille compressée
+KEYFRAME_INTERVAL = 600  # Ticks : 20 s de jeu à 30 ticks/s, 75 s à 8 ticks/s
+
+
+class ReplayError(Exception):
+    pass
+
+
+def encode_input(action):
+    code = 0
+    if action is not None:
+        if action.direction is not None:
+            code = DIRECTION_CODES[action.direction]
+        if action.teleport:
+            code |= TELEPORT_BIT
+        if action.sprinting:
+            code |= SPRINT_BIT
+    return code
+
+
+def decode_input(code):
+    direction = code & DIRECTION_BITS
+    return Action(DIRECTIONS[direction - 1] if direction else None,
+                  bool(code & TELEPORT_BIT), bool(code & SPRINT_BIT))
+
+
+class ReplayRecorder:
+    def __init__(self, path, engine, buffer_ticks=4096, keyframe_interval=KEYFRAME_INTERVAL):
+        if not 0 <= engine.seed < 2**64:
+            raise ReplayError("graine hors de l'intervalle enregistrable")
+        if max(engine.width, engine.height) >= 2**16:
+            raise ReplayError("plateau trop grand pour l'en-tête du replay")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, 'wb')
+        self.flags = ((FLAG_MULTIPLAYER if engine.multiplayer else 0) |
+                      (FLAG_COOPERATIVE if engine.cooperative_mode else 0))
+        self.mode = engine.game_mode
+        self.seed = engine.seed
+        self.size = (engine.width, engine.height)
+        self.record_size = max(RECORD_SIZE, len(engine.players()))
+        self.write_header(0, bytes(20))
+
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = []  # (tick, état) en attente d'écriture
+        self.keyframe_file = open(path + KEYFRAME_SUFFIX, 'wb')
+        self.keyframe_file.write(KEYFRAME_MAGIC)
+
+        # Tampon circulaire : head = prochain octet écrit, tail = prochain octet vidé
+        self.buffer = bytearray(buffer_ticks * self.record_size)
+        self.head = 0
+        self.tail = 0
+        self.ticks = 0
+        self.closed = False
+        self.lock = threading.Condition()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def write_header(self, ticks, digest):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.mode, self.flags, self.seed,
+                                    *self.size, ticks, digest, self.record_size))
+
+    def record(self, actions):
+        record = bytes(encode_input(actions.get(player_num)) for player_num in range(1, self.record_size + 1))
+        record_size = self.record_size
+        size = len(self.buffer)
+        # Keyframe = état avant l'entrée de ce tick ; sérialisée par le thread d'écriture
+        keyframe = None
+        if self.ticks and self.ticks % self.keyframe_interval == 0:
+            keyframe = (self.ticks, self.engine.getstate())
+        with self.lock:
+            if keyframe:
+                self.keyframes.append(keyframe)
+            # Tampon plein : attendre le thread d'écriture (ne devrait jamais arriver)
+            while self.head - self.tail + record_size > size:
+                self.lock.wait()
+            start = self.head % size
+            self.buffer[start:start + record_size] = record
+            self.head += record_size
+            self.ticks += 1
+            if self.head - self.tail >= size // 2:
+                self.lock.notify_all()
+
+    def write_loop(self):
+        size = len(self.buffer)
+        while True:
+            with self.lock:
+                while self.head == self.tail and not self.keyframes and not self.closed:
+                    self.lock.wait(0.5)
+                if self.head == self.tail and not self.keyframes and self.closed:
+                    return
+                start, end = self.tail % size, self.head % size
+                if start < end:
+                    chunk = bytes(self.buffer[start:end])
+                else:
+                    chunk = bytes(self.buffer[start:]) + bytes(self.buffer[:end])
+                self.tail = self.head
+                keyframes, self.keyframes = self.keyframes, []
+                self.lock.notify_all()
+            self.file.write(chunk)
+            for tick, state in keyframes:
+                data = zlib.compress(repr(state).encode())
+                self.keyframe_file.write(KEYFRAME_HEADER.pack(tick, len(data)))
+                self.keyframe_file.write(data)
+
+    def close(self, engine=None):
+        if self.closed:
+            return
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        self.writer.join()
+
+        # L'empreinte finale permet de vérifier le replay (ou un score soumis)
+        digest = bytes.fromhex(engine.state_digest()) if engine is not None else bytes(20)
+        self.write_header(self.ticks, digest)
+        self.file.close()
+        self.keyframe_file.close()
+
+
+class ReplayReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ReplayError(f"replay tronqué : {path}")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.mode, flags, self.seed, self.width, self.height,
+         ticks, digest, self.record_size) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or not RECORD_SIZE <= self.record_size <= MAX_PLAYERS:
+            raise ReplayError(f"format de replay inconnu : {path}")
+
+        self.multiplayer = bool(flags & FLAG_MULTIPLAYER)
+        self.cooperative = bool(flags & FLAG_COOPERATIVE)
+        self.players = self.record_size if self.multiplayer else 1
+        self.digest = digest.hex() if any(digest) else None
+        # Un replay interrompu (crash) n'a pas son en-tête final : se fier à la taille
+        self.ticks = (size - HEADER.size) // self.record_size
+        self.load_keyframe_index()
+
+    def load_keyframe_index(self):
+        # Seuls les en-têtes sont lus ici, les états sont décodés à la demande
+        self.keyframe_ticks = []
+        self.keyframe_offsets = []
+        self.keyframe_data = b''
+        try:
+            with open(self.path + KEYFRAME_SUFFIX, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        if data[:len(KEYFRAME_MAGIC)] != KEYFRAME_MAGIC:
+            return
+        offset = len(KEYFRAME_MAGIC)
+        while offset + KEYFRAME_HEADER.size <= len(data):
+            tick, length = KEYFRAME_HEADER.unpack_from(data, offset)
+            offset += KEYFRAME_HEADER.size
+            if offset + length > len(data) or tick > self.ticks:
+                break  # Dernière keyframe tronquée
+            self.keyframe_ticks.append(tick)
+            self.keyframe_offsets.append((offset, length))
+            offset += length
+        self.keyframe_data = data
+
+    def keyframe(self, tick):
+        # Keyframe la plus proche avant tick : (tick de la keyframe, état) ou (0, None)
+        i = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        if i < 0:
+            return 0, None
+        offset, length = self.keyframe_offsets[i]
+        data = zlib.decompress(self.keyframe_data[offset:offset + length])
+        return self.keyframe_ticks[i], ast.literal_eval(data.decode())
+
+    def __len__(self):
+        return self.ticks
+
+    def actions(self, tick):
+        if not 0 <= tick < self.ticks:
+            raise IndexError(tick)
+        offset = HEADER.size + tick * self.record_size
+        return {player_num: decode_input(self.data[offset + player_num - 1])
+                for player_num in range(1, self.record_size + 1)}
+
+    def close(self):
+        self.data.close()
+
+
+class ReplayPlayer:
+    def __init__(self, path):
+        self.reader = ReplayReader(path)
+        self.engine = None
+        self.tick = 0
+        self.alive = True
+        self.seek(0)
+
+    def __len__(self):
+        return len(self.reader)
+
+    def new_engine(self):
+        reader = self.reader
+        return SnakeEngine(reader.mode, reader.multiplayer, reader.cooperative, reader.seed,
+                           reader.width, reader.height, reader.players)
+
+    @property
+    def finished(self):
+        return not self.alive or self.tick >= len(self.reader)
+
+    def step(self):
+        self.alive = self.engine.step(self.reader.actions(self.tick))
+        self.tick += 1
+
+    def advance(self, count):
+        while count > 0 and not self.finished:
+            self.step()
+            count -= 1
+
+    def seek(self, tick):
+        tick = max(0, min(tick, len(self.reader)))
+        # Repartir de la keyframe la plus proche, sauf si avancer depuis la
+        # position actuelle coûte moins cher
+        keyframe_tick, state = self.reader.keyframe(tick)
+        if self.engine is None or tick < self.tick or keyframe_tick > self.tick:
+            self.engine = self.new_engine()
+            if state is not None:
+                self.engine.setstate(state)
+            self.tick = keyframe_tick
+            self.alive = True
+        self.advance(tick - self.tick)
+        self.engine.events = []
+
+    def seek_time(self, time):
+        # Dernier tick joué au plus tard à time (unités TIME_UNIT du moteur) :
+        # recule de keyframe en keyframe jusqu'avant time, puis avance
+        while self.tick > 0 and self.engine.scheduler.time > time:
+            keyframe_tick, state = self.reader.keyframe(self.tick - 1)
+            self.seek(keyframe_tick)
+        while not self.finished and self.engine.next_time() <= time:
+            self.step()
+        self.engine.events = []
+
+    def close(self):
+        self.reader.close()
@@ -4,6 +4,10 @@ import sys
 import json
 import os
 import math
+import argparse
+from free_cells import FreeCellIndex
+from hud_cache import Hud
+from synth import ToneCache
 
 # Initialisation
 pygame.init()
@@ -43,11 +47,11 @@ MODE_PORTAL = 1
 MODE_OBSTACLES = 2
 
 class Particle:
-    def __init__(self, x, y, color):
+    def __init__(self, x, y, color, rng=random):
         self.x = x
         self.y = y
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
+        self.vx = rng.uniform(-2, 2)
+        self.vy = rng.uniform(-2, 2)
         self.color = color
         self.life = 30
         self.max_life = 30
@@ -64,18 +68,19 @@ class Particle:
             pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), 3)
 
 class Obstacle:
-    def __init__(self, x, y, moving=False):
+    def __init__(self, x, y, moving=False, rng=random):
         self.x = x
         self.y = y
         self.moving = moving
-        self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+        self.rng = rng
+        self.direction = rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
         self.move_timer = 0
         
     def update(self):
         if self.moving:
             self.move_timer += 1
             if self.move_timer > 60:  # Changer de direction toutes les secondes
-                self.direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+                self.direction = self.rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
                 self.move_timer = 0
                 
             new_x = self.x + self.direction[0]
@@ -115,7 +120,7 @@ class PowerUp:
         return points[self.type]
 
 class Snake:
-    def __init__(self, color=GREEN, start_pos=None):
+    def __init__(self, color=GREEN, start_pos=None, cells=None):
         if start_pos is None:
             start_pos = (GRID_WIDTH//2, GRID_HEIGHT//2)
         self.body = [start_pos]
@@ -124,21 +129,33 @@ class Snake:
         self.ghost_timer = 0
         self.speed_boost_timer = 0
         
+        # Index des cases libres partagé avec la partie (optionnel)
+        self.cells = cells
+        if cells is not None:
+            cells.occupy(start_pos)
+        
     def move(self):
         head = (self.body[0][0] + self.direction[0], self.body[0][1] + self.direction[1])
         self.body.insert(0, head)
+        if self.cells is not None:
+            self.cells.occupy(head)
         
     def grow(self):
         pass
         
+    def pop_tail(self):
+        tail = self.body.pop()
+        if self.cells is not None:
+            self.cells.release(tail)
+        
     def shrink(self):
         if len(self.body) > 1:
-            self.body.pop()
+            self.pop_tail()
             
     def apply_shrink(self):
         for _ in range(3):
             if len(self.body) > 1:
-                self.body.pop()
+                self.pop_tail()
         
     def check_collision(self, obstacles=None, portal_mode=False):
         head = self.body[0]
@@ -154,8 +171,12 @@ class Snake:
                 new_head[1] = GRID_HEIGHT - 1
             elif head[1] >= GRID_HEIGHT:
                 new_head[1] = 0
-            self.body[0] = tuple(new_head)
-            head = self.body[0]
+            new_head = tuple(new_head)
+            if self.cells is not None:
+                self.cells.release(head)
+                self.cells.occupy(new_head)
+            self.body[0] = new_head
+            head = new_head
         else:
             # Collision avec les bords
             if head[0] < 0 or head[0] >= GRID_WIDTH or head[1] < 0 or head[1] >= GRID_HEIGHT:
@@ -174,15 +195,19 @@ class Snake:
         return False
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Snake Ultimate Edition")
         self.clock = pygame.time.Clock()
         
         # État du jeu
+        # Avec une graine fixe, chaque partie se rejoue à l'identique
+        self.seed = seed
+        self.new_rngs()
         self.game_mode = MODE_CLASSIC
         self.multiplayer = False
-        self.snake1 = Snake(GREEN)
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+        self.snake1 = Snake(GREEN, cells=self.free_cells)
         self.snake2 = Snake(BLUE, (GRID_WIDTH//4, GRID_HEIGHT//2))
         
         self.foods = []
@@ -200,6 +225,8 @@ class Game:
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
         self.big_font = pygame.font.Font(None, 48)
+        # Textes du HUD mémorisés et panneaux fixes
+        self.hud = Hud()
         
         # Effets et timers
         self.sprinting1 = False
@@ -230,41 +257,24 @@ class Game:
             {"bg": (20, 20, 20), "grid": (40, 40, 40)}
         ]
         
+        # Sons synthétisés, mémorisés sur disque entre deux lancements
+        self.tones = ToneCache()
         self.create_sounds()
         self.create_background_pattern()
         
     def create_sounds(self):
         try:
-            self.eat_sound = pygame.mixer.Sound(buffer=self.generate_tone(800, 0.1))
-            self.powerup_sound = pygame.mixer.Sound(buffer=self.generate_tone(1200, 0.2))
-            self.gameover_sound = pygame.mixer.Sound(buffer=self.generate_tone(200, 0.5))
-            self.level_up_sound = pygame.mixer.Sound(buffer=self.generate_chord([440, 554, 659], 0.3))
+            self.eat_sound = self.tones.sound([800], 0.1, 2048)
+            self.powerup_sound = self.tones.sound([1200], 0.2, 2048)
+            self.gameover_sound = self.tones.sound([200], 0.5, 2048)
+            self.level_up_sound = self.tones.sound([440, 554, 659], 0.3, 1024)
+            self.tones.save()
         except:
             self.eat_sound = None
             self.powerup_sound = None
             self.gameover_sound = None
             self.level_up_sound = None
     
-    def generate_tone(self, frequency, duration):
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = []
-        for i in range(frames):
-            wave = 2048 * math.sin(frequency * 2 * math.pi * i / sample_rate)
-            arr.append([int(wave), int(wave)])
-        return pygame.sndarray.array(arr)
-        
-    def generate_chord(self, frequencies, duration):
-        sample_rate = 22050
-        frames = int(duration * sample_rate)
-        arr = []
-        for i in range(frames):
-            wave = 0
-            for freq in frequencies:
-                wave += 1024 * math.sin(freq * 2 * math.pi * i / sample_rate)
-            arr.append([int(wave), int(wave)])
-        return pygame.sndarray.array(arr)
-        
     def create_background_pattern(self):
         self.bg_surface = pygame.Surface((WIDTH, HEIGHT))
         self.bg_surface.fill(self.themes[self.theme]["bg"])
@@ -303,35 +313,23 @@ class Game:
         self.obstacles = []
         for _ in range(count):
             while True:
-                x = random.randint(5, GRID_WIDTH-5)
-                y = random.randint(5, GRID_HEIGHT-5)
+                x = self.rng.randint(5, GRID_WIDTH-5)
+                y = self.rng.randint(5, GRID_HEIGHT-5)
                 if (x, y) not in self.snake1.body and (not self.multiplayer or (x, y) not in self.snake2.body):
-                    moving = random.random() < 0.3  # 30% chance d'obstacle mobile
-                    self.obstacles.append(Obstacle(x, y, moving))
+                    moving = self.rng.random() < 0.3  # 30% chance d'obstacle mobile
+                    self.obstacles.append(Obstacle(x, y, moving, self.rng))
+                    self.free_cells.occupy((x, y))
                     break
                     
     def maintain_foods(self):
         target_count = 15 if self.multiplayer else 10
         while len(self.foods) < target_count:
-            occupied = set(self.snake1.body)
-            if self.multiplayer:
-                occupied |= set(self.snake2.body)
-            occupied |= set([f.pos for f in self.foods])
-            occupied |= set([(o.x, o.y) for o in self.obstacles])
-            
-            free_positions = []
-            for x in range(GRID_WIDTH):
-                for y in range(GRID_HEIGHT):
-                    if (x, y) not in occupied:
-                        free_positions.append((x, y))
-            
-            if not free_positions:
+            pos = self.free_cells.random_free(self.rng)
+            if pos is None:
                 break
-                
-            pos = random.choice(free_positions)
             
             # Probabilités étendues
-            rand = random.random()
+            rand = self.rng.random()
             if rand < 0.5:  # 50% fruits normaux
                 fruit_type = FRUIT_NORMAL
             elif rand < 0.65:  # 15% fruits bonus
@@ -346,6 +344,7 @@ class Game:
                 fruit_type = FRUIT_SPEED
                 
             self.foods.append(PowerUp(pos, fruit_type))
+            self.free_cells.occupy(pos)
             
     def handle_menu_events(self):
         for event in pygame.event.get():
@@ -372,15 +371,24 @@ class Game:
                     self.create_background_pattern()
         return True
         
+    def new_rngs(self):
+        # Un flux pour le gameplay, un autre pour les particules : les effets
+        # visuels ne décalent jamais les tirages du jeu
+        seed = self.seed if self.seed is not None else random.randrange(2**32)
+        self.rng = random.Random(seed)
+        self.fx_rng = random.Random(seed + 1)
+        
     def start_game(self, mode, multiplayer):
         self.game_mode = mode
         self.multiplayer = multiplayer
         self.in_menu = False
         
         # Réinitialiser le jeu
-        self.snake1 = Snake(GREEN)
+        self.new_rngs()
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+        self.snake1 = Snake(GREEN, cells=self.free_cells)
         if multiplayer:
-            self.snake2 = Snake(BLUE, (GRID_WIDTH//4, GRID_HEIGHT//2))
+            self.snake2 = Snake(BLUE, (GRID_WIDTH//4, GRID_HEIGHT//2), self.free_cells)
         
         self.foods = []
         self.obstacles = []
@@ -448,6 +456,7 @@ class Game:
             if head == food.pos:
                 snake.grow()
                 self.foods.remove(food)
+                self.free_cells.release(food.pos)
                 points = food.get_points()
                 
                 if player_num == 1:
@@ -460,7 +469,8 @@ class Game:
                     self.particles.append(Particle(
                         head[0] * CELL_SIZE + CELL_SIZE//2,
                         head[1] * CELL_SIZE + CELL_SIZE//2,
-                        food.get_color()
+                        food.get_color(),
+                        self.fx_rng
                     ))
                 
                 # Effets spéciaux
@@ -517,7 +527,11 @@ class Game:
     def update_game(self):
         # Mettre à jour les obstacles mobiles
         for obstacle in self.obstacles:
+            old_pos = (obstacle.x, obstacle.y)
             obstacle.update()
+            if (obstacle.x, obstacle.y) != old_pos:
+                self.free_cells.release(old_pos)
+                self.free_cells.occupy((obstacle.x, obstacle.y))
             
         # Maintenir la nourriture
         self.maintain_foods()
@@ -684,42 +698,48 @@ class Game:
     def draw_game_ui(self):
         # Scores
         if self.multiplayer:
-            score1_text = self.font.render(f"Joueur 1: {self.score1}", True, GREEN)
-            score2_text = self.font.render(f"Joueur 2: {self.score2}", True, BLUE)
+            score1_text = self.hud.render(self.font, f"Joueur 1: {self.score1}", GREEN)
+            score2_text = self.hud.render(self.font, f"Joueur 2: {self.score2}", BLUE)
             self.screen.blit(score1_text, (10, 10))
             self.screen.blit(score2_text, (10, 50))
         else:
-            score_text = self.font.render(f"Score: {self.score1}", True, WHITE)
-            best_text = self.small_font.render(f"Meilleur: {self.best_score}", True, WHITE)
+            score_text = self.hud.render(self.font, f"Score: {self.score1}", WHITE)
+            best_text = self.hud.render(self.small_font, f"Meilleur: {self.best_score}", WHITE)
             self.screen.blit(score_text, (10, 10))
             self.screen.blit(best_text, (10, 50))
         
         # Niveau et temps
-        level_text = self.small_font.render(f"Niveau: {self.level}", True, WHITE)
+        level_text = self.hud.render(self.small_font, f"Niveau: {self.level}", WHITE)
         elapsed = (pygame.time.get_ticks() - self.start_time) // 1000
-        time_text = self.small_font.render(f"Temps: {elapsed}s", True, WHITE)
+        time_text = self.hud.render(self.small_font, f"Temps: {elapsed}s", WHITE)
         self.screen.blit(level_text, (10, 75))
         self.screen.blit(time_text, (10, 100))
         
         # Indicateurs d'état
         y_offset = 130
         if self.sprinting1 or (self.multiplayer and self.sprinting2):
-            sprint_text = self.small_font.render("SPRINT!", True, WHITE)
+            sprint_text = self.hud.render(self.small_font, "SPRINT!", WHITE)
             self.screen.blit(sprint_text, (10, y_offset))
             y_offset += 25
             
         if self.slow_effect:
-            slow_text = self.small_font.render("RALENTI", True, GOLD)
+            slow_text = self.hud.render(self.small_font, "RALENTI", GOLD)
             self.screen.blit(slow_text, (10, y_offset))
             y_offset += 25
             
         if self.snake1.ghost_timer > 0 or (self.multiplayer and self.snake2.ghost_timer > 0):
-            ghost_text = self.small_font.render("MODE FANTÔME", True, CYAN)
+            ghost_text = self.hud.render(self.small_font, "MODE FANTÔME", CYAN)
             self.screen.blit(ghost_text, (10, y_offset))
             y_offset += 25
         
+        # Légende, mode et contrôles : panneau fixe assemblé une seule fois
+        key = ('legend', self.game_mode, self.multiplayer)
+        self.screen.blit(self.hud.panel(key, self.legend_lines), (WIDTH - 220, 10))
+        
+    def legend_lines(self):
+        lines = []
+        
         # Légende des power-ups
-        legend_x = WIDTH - 220
         legend_texts = [
             ("Rouge: +1 pt", RED),
             ("Bleu: +5 pts", BLUE),
@@ -730,13 +750,11 @@ class Game:
         ]
         
         for i, (text, color) in enumerate(legend_texts):
-            legend_text = self.small_font.render(text, True, color)
-            self.screen.blit(legend_text, (legend_x, 10 + i * 25))
+            lines.append((self.small_font, text, color, (0, i * 25)))
             
         # Mode de jeu
         mode_names = ["Classique", "Portails", "Obstacles"]
-        mode_text = self.small_font.render(f"Mode: {mode_names[self.game_mode]}", True, WHITE)
-        self.screen.blit(mode_text, (legend_x, 200))
+        lines.append((self.small_font, f"Mode: {mode_names[self.game_mode]}", WHITE, (0, 190)))
         
         # Contrôles
         if self.multiplayer:
@@ -745,8 +763,8 @@ class Game:
                 "J2: WASD + SHIFT"
             ]
             for i, control in enumerate(controls):
-                control_text = self.small_font.render(control, True, WHITE)
-                self.screen.blit(control_text, (legend_x, 230 + i * 20))
+                lines.append((self.small_font, control, WHITE, (0, 220 + i * 20)))
+        return lines
         
     def game_over(self):
         # Mettre à jour les statistiques
@@ -851,5 +869,10 @@ class Game:
         sys.exit()
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Snake Ultimate Edition")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="graine du générateur aléatoire (parties reproductibles)")
+    args = parser.parse_args()
+    
+    game = Game(seed=args.seed)
     game.run()
\ No newline at end of file
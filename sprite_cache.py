@@ -0,0 +1,38 @@
+"""
+Cache LRU de surfaces pré-rendues (tuiles de snake, fruits, obstacles...).
+
+Chaque tuile est dessinée une seule fois par clé puis réutilisée : une case
+du plateau coûte alors un seul blit au lieu de plusieurs pygame.draw. La clé
+doit contenir tout ce qui change l'apparence (type, couleur, phase
+d'animation, mode nuit...). Au-delà de maxsize, les tuiles les moins
+récemment utilisées sont oubliées.
+"""
+from collections import OrderedDict
+
+
+class SpriteCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, key, render, *args):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = render(*args)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.maxsize:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
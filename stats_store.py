@@ -0,0 +1,249 @@
+"""
+Historique des parties et statistiques du Snake MEGA Ultimate (SQLite).
+
+Chaque partie terminée est une ligne de la table games : mode, nombre de
+joueurs, scores, niveau, durée, ticks et fruits mangés par type. La base est
+en mode WAL et n'est lue qu'une fois, au démarrage (StatsStore.summary). Les
+écritures passent par un thread dédié qui regroupe tout ce qui attend dans
+une seule transaction : une partie est enregistrée entièrement ou pas du tout,
+sans bloquer le jeu.
+
+Les classements (un par mode et nombre de joueurs) reposent sur un index
+(mode, joueurs, coopératif, score) pour les meilleurs scores et sur la table
+score_counts, tenue à jour par un trigger, qui compte les parties par score :
+le rang d'un score se calcule en sommant quelques centaines de lignes au
+plus, quel que soit le nombre de parties enregistrées.
+
+Au premier lancement, les totaux de l'ancien game_data.json (meilleur score,
+parties jouées, temps total) et les réglages sont repris dans la table
+settings ; le fichier JSON lui-même n'est pas modifié.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DB_FILE = "game_stats.db"
+LEGACY_FILE = "game_data.json"
+BATCH_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    mode INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    cooperative INTEGER NOT NULL,
+    score1 INTEGER NOT NULL,
+    score2 INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    seed INTEGER,
+    fruits TEXT NOT NULL,
+    score INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS score_counts (
+    mode INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    cooperative INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (mode, players, cooperative, score)
+) WITHOUT ROWID;
+"""
+
+# Créés après la mise à niveau des bases sans colonne score
+INDEXES = """
+CREATE INDEX IF NOT EXISTS games_leaderboard ON games (mode, players, cooperative, score DESC);
+CREATE TRIGGER IF NOT EXISTS games_count AFTER INSERT ON games
+BEGIN
+    INSERT OR IGNORE INTO score_counts VALUES (NEW.mode, NEW.players, NEW.cooperative, NEW.score, 0);
+    UPDATE score_counts SET games = games + 1
+        WHERE mode = NEW.mode AND players = NEW.players AND cooperative = NEW.cooperative AND score = NEW.score;
+END;
+"""
+
+GAME_COLUMNS = ('played_at', 'mode', 'players', 'cooperative', 'score1', 'score2',
+                'level', 'duration', 'ticks', 'seed', 'fruits', 'score')
+INSERT_GAME = (f"INSERT INTO games ({', '.join(GAME_COLUMNS)}) "
+               f"VALUES ({', '.join('?' * len(GAME_COLUMNS))})")
+INSERT_SETTING = "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)"
+
+
+class StatsError(Exception):
+    pass
+
+
+def game_score(players, cooperative, score1, score2):
+    # Score retenu au classement : score d'équipe en coopératif, du vainqueur en duel
+    if players == 1:
+        return score1
+    return score1 + score2 if cooperative else max(score1, score2)
+
+
+def connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class StatsStore:
+    def __init__(self, path=DB_FILE, legacy_path=LEGACY_FILE):
+        self.path = path
+        self.reader = None  # Connexion de lecture des classements, ouverte au besoin
+        try:
+            connection = connect(path)
+            try:
+                with connection:
+                    connection.executescript(SCHEMA)
+                    self.upgrade(connection)
+                    connection.executescript(INDEXES)
+                    self.migrate(connection, legacy_path)
+                self.summary = self.load_summary(connection)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            raise StatsError(f"base de statistiques illisible : {e}")
+
+        self.queue = queue.Queue()
+        # Parties soumises mais pas encore validées ; le verrou couvre chaque
+        # transaction d'écriture pour qu'une lecture compte chaque partie une fois
+        self.pending = []
+        self.lock = threading.Lock()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def upgrade(self, connection):
+        # Bases créées avant les classements : ajouter et calculer la colonne score
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(games)")]
+        if 'score' in columns:
+            return
+        connection.execute("ALTER TABLE games ADD COLUMN score INTEGER NOT NULL DEFAULT 0")
+        connection.execute("""UPDATE games SET score = CASE
+            WHEN players = 1 THEN score1
+            WHEN cooperative THEN score1 + score2
+            ELSE max(score1, score2) END""")
+        connection.execute("""INSERT INTO score_counts
+            SELECT mode, players, cooperative, score, COUNT(*) FROM games
+            GROUP BY mode, players, cooperative, score""")
+
+    def migrate(self, connection, legacy_path):
+        # Une seule fois : reprendre les totaux et réglages de game_data.json
+        if connection.execute("SELECT 1 FROM settings WHERE key = 'migrated'").fetchone():
+            return
+        data = {}
+        try:
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r') as f:
+                    data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        rows = [('legacy_' + key, json.dumps(data.get(key, 0)))
+                for key in ('best_score', 'games_played', 'total_time')]
+        rows += [(key, json.dumps(data[key])) for key in ('volume', 'show_trails', 'night_mode') if key in data]
+        rows.append(('migrated', json.dumps(time.time())))
+        connection.executemany(INSERT_SETTING, rows)
+
+    def load_summary(self, connection):
+        settings = {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM settings")}
+        games, total_time, best_score = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(duration), 0), COALESCE(MAX(score1), 0) FROM games").fetchone()
+        return {
+            'best_score': max(best_score, settings.get('legacy_best_score', 0)),
+            'games_played': games + settings.get('legacy_games_played', 0),
+            'total_time': total_time + settings.get('legacy_total_time', 0),
+            'settings': settings
+        }
+
+    def record_game(self, mode, players, cooperative, score1, score2, level, duration, ticks,
+                    seed=None, fruits=()):
+        # Renvoie tout de suite ; la ligne est écrite par le thread d'écriture
+        row = (time.time(), mode, players, int(cooperative), score1, score2, level, duration,
+               ticks, seed, json.dumps(list(fruits)), game_score(players, cooperative, score1, score2))
+        with self.lock:
+            self.pending.append(row)
+        self.queue.put(('game', row))
+
+    def save_settings(self, settings):
+        for key, value in settings.items():
+            self.queue.put(('setting', (key, json.dumps(value))))
+
+    def query(self, sql, params):
+        try:
+            if self.reader is None:
+                self.reader = connect(self.path)
+            return self.reader.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            raise StatsError(f"classement illisible : {e}")
+
+    def pending_games(self, mode, players, cooperative):
+        # Appelé sous self.lock : parties du classement encore dans la file
+        return [row for row in self.pending if row[1:4] == (mode, players, int(cooperative))]
+
+    def top_scores(self, mode, players, cooperative, limit=10):
+        # [(score, date, niveau, durée)], du meilleur au moins bon
+        with self.lock:
+            rows = self.query("""SELECT score, played_at, level, duration FROM games
+                WHERE mode = ? AND players = ? AND cooperative = ?
+                ORDER BY score DESC LIMIT ?""", (mode, players, int(cooperative), limit))
+            pending = self.pending_games(mode, players, cooperative)
+        rows += [(row[11], row[0], row[6], row[7]) for row in pending]
+        return sorted(rows, key=lambda row: row[0], reverse=True)[:limit]
+
+    def rank(self, mode, players, cooperative, score):
+        # (rang du score, parties classées) ; les ex aequo partagent le rang
+        with self.lock:
+            (better, total), = self.query("""SELECT
+                COALESCE(SUM(CASE WHEN score > ? THEN games END), 0), COALESCE(SUM(games), 0)
+                FROM score_counts WHERE mode = ? AND players = ? AND cooperative = ?""",
+                (score, mode, players, int(cooperative)))
+            pending = self.pending_games(mode, players, cooperative)
+        better += sum(1 for row in pending if row[11] > score)
+        return better + 1, total + len(pending)
+
+    def write_loop(self):
+        connection = None
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            games = [row for kind, row in filter(None, batch) if kind == 'game']
+            settings = [row for kind, row in filter(None, batch) if kind == 'setting']
+            if not games and not settings:
+                continue
+            with self.lock:
+                try:
+                    if connection is None:
+                        connection = connect(self.path)
+                    # Une transaction par lot : validée en entier ou annulée
+                    with connection:
+                        connection.executemany(INSERT_GAME, games)
+                        connection.executemany(INSERT_SETTING, settings)
+                except sqlite3.Error as e:
+                    print(f"Statistiques non enregistrées: {e}")
+                # Écrites ou perdues, ces parties ne sont plus en attente
+                for row in games:
+                    self.pending.remove(row)
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        # Attend que tout ce qui a été soumis soit écrit
+        self.queue.put(None)
+        self.writer.join()
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
@@ -0,0 +1,109 @@
+"""
+Synthèse des sons en calcul vectoriel NumPy, avec cache sur disque.
+
+Un son est une somme de sinusoïdes (une fréquence pour un ton, plusieurs pour
+un accord) calculée d'un bloc sur tous les échantillons, au format du mixer
+(fréquence d'échantillonnage, nombre de canaux, 16 bits signés). Les
+échantillons sont mémorisés par (fréquences, durée, amplitude, fréquence
+d'échantillonnage, canaux) et enregistrés dans CACHE_FILE : les lancements
+suivants chargent les sons sans les recalculer. MusicLoop assemble une
+partition entière en un buffer joué en boucle par le mixer.
+"""
+import os
+
+import numpy as np
+import pygame
+
+CACHE_FILE = "tone_cache.npz"
+
+
+def synthesize(frequencies, duration, amplitude, sample_rate, channels=2):
+    # amplitude s'applique à chaque fréquence, les sinusoïdes s'additionnent
+    phase = np.arange(int(duration * sample_rate)) * (2 * np.pi / sample_rate)
+    wave = np.zeros(len(phase))
+    for frequency in frequencies:
+        wave += amplitude * np.sin(frequency * phase)
+    samples = np.clip(np.trunc(wave), -32768, 32767).astype(np.int16)
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return samples
+
+
+class ToneCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.tones = {}
+        self.modified = False
+        self.load()
+
+    def __len__(self):
+        return len(self.tones)
+
+    def load(self):
+        # Fichier absent ou illisible : on repart d'un cache vide
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                self.tones = {key: data[key] for key in data.files}
+        except (OSError, ValueError):
+            self.tones = {}
+
+    def save(self):
+        if not self.modified:
+            return
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                np.savez(f, **self.tones)
+            os.replace(temp_path, self.path)
+            self.modified = False
+        except OSError:
+            pass
+
+    def samples(self, frequencies, duration, amplitude):
+        sample_rate, _, channels = pygame.mixer.get_init() or (22050, -16, 2)
+        key = repr((tuple(frequencies), duration, amplitude, sample_rate, channels))
+        samples = self.tones.get(key)
+        if samples is None:
+            samples = self.tones[key] = synthesize(frequencies, duration, amplitude, sample_rate, channels)
+            self.modified = True
+        return samples
+
+    def sound(self, frequencies, duration, amplitude):
+        return pygame.mixer.Sound(buffer=self.samples(frequencies, duration, amplitude))
+
+
+class MusicLoop:
+    # Partition pré-rendue en un seul buffer, jouée en boucle sur un canal
+    # réservé : aucune synthèse pendant la partie, le mixer s'occupe de tout
+    def __init__(self, tones, notes, note_duration, period, amplitude, channel_id=0):
+        sample_rate = (pygame.mixer.get_init() or (22050,))[0]
+        step = int(period * sample_rate)
+        parts = [tones.samples([note], note_duration, amplitude) for note in notes]
+        samples = np.zeros((step * len(notes),) + parts[0].shape[1:], dtype=np.int16)
+        for i, part in enumerate(parts):
+            part = part[:step]
+            samples[i * step:i * step + len(part)] = part
+        self.sound = pygame.mixer.Sound(buffer=samples)
+        pygame.mixer.set_reserved(channel_id + 1)
+        self.channel = pygame.mixer.Channel(channel_id)
+        self.paused = False
+
+    def set_volume(self, volume):
+        self.sound.set_volume(volume)
+
+    def play(self):
+        # Sans effet si la boucle tourne déjà
+        if self.paused:
+            self.channel.unpause()
+            self.paused = False
+        elif not self.channel.get_busy():
+            self.channel.play(self.sound, loops=-1)
+
+    def pause(self):
+        if self.channel.get_busy() and not self.paused:
+            self.channel.pause()
+            self.paused = True
+
+    def stop(self):
+        self.channel.stop()
+        self.paused = False
@@ -0,0 +1,122 @@
+"""
+Traînées des snakes : un anneau de taille fixe par snake et un calque persistant.
+
+Chaque snake garde ses traînées dans un anneau de Trail.max_life cases (une
+entrée par tick du moteur, la plus ancienne est écrasée), au lieu d'une liste
+d'objets parcourue et retaillée à chaque tick. Les traînées sont peintes une
+seule fois, à pleine couleur, sur un calque où seules les cases vivantes
+s'estompent (BLEND_MULT) à chaque tick ; une case n'est effacée du calque qu'à
+son expiration. Le coût suit la longueur des traînées, pas la durée de la
+partie ni la taille du calque.
+
+Le calque couvre la vue de la caméra : set_origin() le fait défiler avec elle
+et repeint, à leur âge, les traînées vivantes des bandes découvertes.
+"""
+import pygame
+
+FADE = 220  # Facteur d'estompage par tick, sur 256
+
+
+class Trail:
+    max_life = 20
+
+    def __init__(self):
+        self.cells = [None] * self.max_life
+        self.frame = 0
+        self.color = None
+
+    def __iter__(self):
+        return (pos for pos in self.cells if pos is not None)
+
+    def __contains__(self, pos):
+        return pos in self.cells
+
+    def ages(self):
+        # (âge en ticks, case) des cases vivantes
+        for slot, pos in enumerate(self.cells):
+            if pos is not None:
+                yield (self.frame - slot) % self.max_life, pos
+
+    def advance(self):
+        # Passe au tick suivant ; renvoie la case qui expire (ou None)
+        self.frame += 1
+        slot = self.frame % self.max_life
+        expired = self.cells[slot]
+        self.cells[slot] = None
+        return expired
+
+    def add(self, pos):
+        # Renvoie la case écrasée si une traînée a déjà été posée à ce tick
+        slot = self.frame % self.max_life
+        replaced = self.cells[slot]
+        self.cells[slot] = pos
+        return replaced
+
+
+class TrailLayer:
+    def __init__(self, size, cell_size, inset=5):
+        self.cell_size = cell_size
+        self.inset = inset
+        self.surface = pygame.Surface(size)
+        self.surface.set_colorkey((0, 0, 0))
+        self.trails = {}
+        self.origin = (0, 0)  # Case affichée dans le coin du calque
+
+    def clear(self):
+        self.trails = {}
+        self.surface.fill((0, 0, 0))
+
+    def cell_rect(self, pos):
+        size = self.cell_size - 2 * self.inset
+        x, y = pos[0] - self.origin[0], pos[1] - self.origin[1]
+        return pygame.Rect(x * self.cell_size + self.inset, y * self.cell_size + self.inset, size, size)
+
+    def set_origin(self, origin):
+        # La caméra a bougé : décaler le calque, effacer les bandes découvertes
+        # et y repeindre les traînées vivantes, estompées selon leur âge
+        dx = (self.origin[0] - origin[0]) * self.cell_size
+        dy = (self.origin[1] - origin[1]) * self.cell_size
+        self.origin = origin
+        if not dx and not dy:
+            return
+        self.surface.scroll(dx, dy)
+        width, height = self.surface.get_size()
+        strips = []
+        if dx:
+            strips.append(pygame.Rect(0 if dx > 0 else width + dx, 0, abs(dx), height))
+        if dy:
+            strips.append(pygame.Rect(0, 0 if dy > 0 else height + dy, width, abs(dy)))
+        for strip in strips:
+            self.surface.fill((0, 0, 0), strip)
+        # Les plus anciennes d'abord : une case repassée garde la plus récente
+        cells = sorted((age, pos, trail.color) for trail in self.trails.values() for age, pos in trail.ages())
+        for age, pos, color in reversed(cells):
+            rect = self.cell_rect(pos)
+            if rect.collidelist(strips) != -1:
+                self.surface.fill(color, rect)
+                for _ in range(age):
+                    self.surface.fill((FADE, FADE, FADE), rect, pygame.BLEND_MULT)
+
+    def cells(self):
+        return {pos for trail in self.trails.values() for pos in trail}
+
+    def add(self, key, pos, color):
+        trail = self.trails.get(key)
+        if trail is None:
+            trail = self.trails[key] = Trail()
+        trail.color = color
+        self.erase(trail.add(pos))
+        self.surface.fill(color, self.cell_rect(pos))
+
+    def erase(self, pos):
+        # Une case encore vivante dans un anneau (repassage) reste peinte
+        if pos is not None and not any(pos in trail for trail in self.trails.values()):
+            self.surface.fill((0, 0, 0), self.cell_rect(pos))
+
+    def update(self):
+        for trail in self.trails.values():
+            self.erase(trail.advance())
+        # Case par case : un rectangle englobant couvrirait tout le calque dès
+        # qu'une traînée passe un portail d'un bord à l'autre
+        for pos in self.cells():
+            self.surface.fill((FADE, FADE, FADE), self.cell_rect(pos), pygame.BLEND_MULT)